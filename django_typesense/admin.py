@@ -1,21 +1,58 @@
 import logging
 
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.templatetags import admin_list
 from django.contrib.auth.admin import csrf_protect_m
+from django.core.exceptions import PermissionDenied
 from django.db.models import QuerySet
 from django.forms import forms
-from django.http import JsonResponse
+from django.http import HttpResponseRedirect, JsonResponse
+from django.urls import path
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
 
+from django_typesense.exceptions import TooManyResultsError
 from django_typesense.mixins import TypesenseModelMixin
-from django_typesense.utils import typesense_search, export_documents
+from django_typesense.utils import (
+    TYPESENSE_MAX_HITS_PER_PAGE,
+    get_projection_parameters,
+    iter_export_documents,
+    iter_search_hits,
+    typesense_search,
+)
 from django_typesense.paginator import TypesenseSearchPaginator
 
 logger = logging.getLogger(__name__)
-TYPESENSE_MAX_HITS_PER_PAGE = 250
+
+
+def get_search_parameters(
+    model_admin, search_term: str, page_num: int, filter_by: str, sort_by: str, list_per_page: int = None
+) -> dict:
+    if list_per_page is None:
+        list_per_page = model_admin.list_per_page
+    list_per_page = min(list_per_page, TYPESENSE_MAX_HITS_PER_PAGE)
+
+    return {
+        "collection": model_admin.model.collection_class.schema_name,
+        "q": search_term or "*",
+        "query_by": model_admin.model.collection_class.query_by_fields,
+        "page": page_num,
+        "per_page": list_per_page,
+        "filter_by": filter_by,
+        "sort_by": sort_by,
+    }
 
 
 class TypesenseSearchAdminMixin(admin.ModelAdmin):
     typesense_search_fields = []
+    # The fields of the documents returned to the changelist, worked out from `list_display` when None
+    typesense_include_fields = None
+    typesense_highlight = False
+    # The years of the `date_hierarchy` drilldown, from 1970 to next year when None
+    typesense_date_hierarchy_years = None
+    # The most search results an action on all of them can apply to
+    typesense_action_max_results = 10000
 
     def get_typesense_search_fields(self, request):
         """
@@ -37,7 +74,12 @@ class TypesenseSearchAdminMixin(admin.ModelAdmin):
         """
         The 'change list' admin view for this model.
         """
-        template_response = super().changelist_view(request, extra_context)
+        try:
+            template_response = super().changelist_view(request, extra_context)
+        except TooManyResultsError as error:
+            # raised before the action runs when "select all" matches too many search results
+            self.message_user(request, str(error), messages.ERROR)
+            return HttpResponseRedirect(request.get_full_path())
 
         is_ajax = request.META.get("HTTP_X_REQUESTED_WITH") == "XMLHttpRequest"
         if is_ajax:
@@ -46,6 +88,76 @@ class TypesenseSearchAdminMixin(admin.ModelAdmin):
 
         return template_response
 
+    def get_typesense_include_fields(self, request):
+        """
+        Get the fields of the documents needed by the changelist. When `typesense_include_fields` isn't set, these
+        are the `list_display` fields if they are all fields of the collection.
+
+        Args:
+            request: the HttpRequest
+
+        Returns:
+            A list of field names, or None to return the whole documents
+        """
+        if self.typesense_include_fields is not None:
+            return list(self.typesense_include_fields)
+
+        fields = self.model.collection_class.get_fields()
+        list_display = [name for name in self.get_list_display(request) if name != "action_checkbox"]
+        # callables and model or admin attributes may need any field
+        if not all(isinstance(name, str) and name in fields for name in list_display):
+            return None
+
+        return list_display
+
+    def get_typesense_projection(self, request) -> dict:
+        """
+        Get the search parameters that trim the hits to what the changelist shows
+
+        Args:
+            request: the HttpRequest
+
+        Returns:
+            The typesense search parameters
+        """
+        return get_projection_parameters(
+            self.get_typesense_include_fields(request), highlight=self.typesense_highlight
+        )
+
+    def get_urls(self):
+        info = self.opts.app_label, self.opts.model_name
+        return [
+            path(
+                "typesense-search/",
+                self.admin_site.admin_view(self.typesense_search_view),
+                name="%s_%s_typesense_search" % info,
+            ),
+            *super().get_urls(),
+        ]
+
+    def typesense_search_view(self, request):
+        """
+        The live search endpoint of the changelist. Returns only the rows of the results, rendered like those of
+        the changelist, and their counts as JSON.
+        """
+        if not self.has_view_or_change_permission(request):
+            raise PermissionDenied
+
+        try:
+            changelist = self.get_changelist_instance(request)
+        except IncorrectLookupParameters as error:
+            return JsonResponse(data={"error": str(error)}, status=400)
+
+        changelist.formset = None
+        rows = [format_html("<tr>{}</tr>", mark_safe("".join(row))) for row in admin_list.results(changelist)]
+        return JsonResponse(
+            data={
+                "rows": rows,
+                "result_count": changelist.result_count,
+                "full_result_count": changelist.full_result_count,
+            }
+        )
+
     def get_sortable_by(self, request):
         """
         Get sortable fields; these are fields that sort is defaulted or set to True.
@@ -73,11 +185,28 @@ class TypesenseSearchAdminMixin(admin.ModelAdmin):
             A list of the typesense results
         """
 
-        return typesense_search(
-            collection_name=self.model.collection_class.schema_name,
-            q="*",
-            query_by=self.model.collection_class.query_by_fields,
-        )
+        parameters = self.get_results_search_parameters(request)
+        parameters.pop("per_page", None)
+        return typesense_search(collection_name=parameters.pop("collection"), **parameters)
+
+    def get_results_search_parameters(self, request) -> dict:
+        """
+        Get the parameters of the search counting all the documents, made by the changelist with its other searches
+        when `show_full_result_count` is enabled and the count isn't cached. `get_results` makes it with hits.
+
+        Args:
+            request: the HttpRequest
+
+        Returns:
+            The typesense search parameters, including the `collection`
+        """
+
+        return {
+            "collection": self.model.collection_class.schema_name,
+            "q": "*",
+            "query_by": self.model.collection_class.query_by_fields,
+            "per_page": 0,
+        }
 
     def get_changelist(self, request, **kwargs):
         """
@@ -123,36 +252,88 @@ class TypesenseSearchAdminMixin(admin.ModelAdmin):
         Returns:
             A list of typesense results
         """
-        if list_per_page is None:
-            list_per_page = self.list_per_page
-        list_per_page = min(list_per_page, TYPESENSE_MAX_HITS_PER_PAGE)
-
-        results = typesense_search(
-            collection_name=self.model.collection_class.schema_name,
-            q=search_term or "*",
-            query_by=self.model.collection_class.query_by_fields,
-            page=page_num,
-            per_page=list_per_page,
-            filter_by=filter_by,
-            sort_by=sort_by,
+        parameters = get_search_parameters(
+            self, search_term, page_num, filter_by, sort_by, list_per_page
         )
+        results = typesense_search(collection_name=parameters.pop("collection"), **parameters)
         return results
 
-    def get_search_results(self, request, queryset, search_term):
-        if not request.POST.get("action"):
-            may_have_duplicates = False
-            results = self.get_typesense_search_results(request, search_term)
-            ids = [result["document"]["id"] for result in results["hits"]]
-            queryset = queryset.filter(id__in=ids)
+    def get_typesense_search_parameters(
+            self,
+            request,
+            search_term: str,
+            page_num: int = 1,
+            filter_by: str = "",
+            sort_by: str = "",
+            list_per_page: int = None
+    ) -> dict:
+        """
+        Get the parameters of the search made by the changelist, with its other searches. The hits are trimmed
+        to the fields it shows, see `get_typesense_projection`
+
+        Returns:
+            The typesense search parameters, including the `collection`
+        """
+        return {
+            **get_search_parameters(self, search_term, page_num, filter_by, sort_by, list_per_page),
+            **self.get_typesense_projection(request),
+        }
+
+    def iter_typesense_ids(self, request, search_term: str = "", filter_by: str = ""):
+        """
+        Stream the primary keys of all the documents matching the search, not just those of a page. Without a
+        search term they are read from a filtered export, otherwise with a cursor if the collection has a
+        `cursor_field`, or page by page.
+
+        Args:
+            request: the HttpRequest
+            search_term: The search term provided in the search form
+            filter_by: The filtering parameters
+
+        Returns:
+            An iterator over the primary keys
+        """
+        collection_class = self.model.collection_class
+        pk_field = self.model._meta.pk
+
+        if not search_term or search_term == "*":
+            documents = iter_export_documents(
+                collection_class.schema_name, filter_by=filter_by or None, include_fields=["id"]
+            )
         else:
-            # id_dict_list = export_documents(
-            #     self.model.collection_class.schema_name, include_fields=["id"]
-            # )
-            # queryset = queryset.filter(
-            #     id__in=[id_dict["id"] for id_dict in id_dict_list]
-            # )
-            queryset, may_have_duplicates = super().get_search_results(
-                request, queryset, search_term
+            search_parameters = {
+                "q": search_term,
+                "query_by": collection_class.query_by_fields,
+                "filter_by": filter_by,
+                "include_fields": "id",
+                **get_projection_parameters(highlight=False),
+            }
+            if collection_class.cursor_field:
+                hits = iter_search_hits(collection_class, **search_parameters)
+            else:
+                hits = self._iter_search_pages(collection_class.schema_name, search_parameters)
+            documents = (hit["document"] for hit in hits)
+
+        for document in documents:
+            yield pk_field.to_python(document["id"])
+
+    def _iter_search_pages(self, collection_name, search_parameters: dict):
+        page = 1
+        while True:
+            results = typesense_search(
+                collection_name, **search_parameters, page=page, per_page=TYPESENSE_MAX_HITS_PER_PAGE
             )
+            yield from results["hits"]
 
-        return queryset, may_have_duplicates
+            if (
+                len(results["hits"]) < TYPESENSE_MAX_HITS_PER_PAGE
+                or page * TYPESENSE_MAX_HITS_PER_PAGE >= results["found"]
+            ):
+                return
+            page += 1
+
+    def get_search_results(self, request, queryset, search_term):
+        # the rows of actions on every match are read by the changelist, see `get_action_queryset`
+        results = self.get_typesense_search_results(request, search_term)
+        ids = [result["document"]["id"] for result in results["hits"]]
+        return queryset.filter(id__in=ids), False
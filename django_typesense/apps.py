@@ -1,4 +1,4 @@
-from django.apps import AppConfig
+from django.apps import AppConfig, apps
 
 
 class DjangoTypesenseConfig(AppConfig):
@@ -6,4 +6,8 @@ class DjangoTypesenseConfig(AppConfig):
     name = "django_typesense"
 
     def ready(self):
-        import django_typesense.signals
+        from django_typesense.registry import registry
+        from django_typesense.signals import connect_signals
+
+        registry.populate(apps.get_models())
+        connect_signals(registry)
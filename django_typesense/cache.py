@@ -0,0 +1,164 @@
+import hashlib
+import inspect
+import json
+import logging
+import pickle
+import threading
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+
+from django_typesense.singleflight import singleflight
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "django_typesense"
+
+
+def normalize_parameters(search_parameters) -> str:
+    """
+    Returns:
+        A string that is the same for equal search parameters
+    """
+    return json.dumps(search_parameters, sort_keys=True, default=str)
+
+
+class SearchCache:
+    """
+    Caches search results in a Django cache, configured with the `TYPESENSE_CACHE` setting e.g.
+
+        TYPESENSE_CACHE = {"alias": "default", "timeout": 60, "max_entry_size": 1024 * 1024}
+
+    Entries are keyed by the collection, its version and the normalized search parameters. Every write to a
+    collection bumps its version once it is done, so results cached before a write are never read after it.
+    Counts are cached the same way, see `get_count`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def config(self) -> dict:
+        return getattr(settings, "TYPESENSE_CACHE", None) or {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.config)
+
+    @property
+    def count_timeout(self) -> int:
+        return getattr(settings, "TYPESENSE_COUNT_CACHE_TIMEOUT", 0)
+
+    @property
+    def cache(self):
+        return caches[self.config.get("alias", "default")]
+
+    @property
+    def stats(self) -> dict:
+        """
+        Returns:
+            The number of hits and misses of this process
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = 0
+
+    def get_version(self, schema_name: str) -> int:
+        return self.cache.get(f"{_KEY_PREFIX}:version:{schema_name}", 0)
+
+    def invalidate(self, schema_name: str):
+        """
+        Bump the version of the collection, making its cached results unreachable
+        """
+        singleflight.forget(schema_name)
+        if not (self.enabled or self.count_timeout):
+            return
+
+        key = f"{_KEY_PREFIX}:version:{schema_name}"
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            # the version must outlive the results
+            if not self.cache.add(key, 1, timeout=None):
+                self.cache.incr(key)
+
+    def make_key(self, schema_name: str, search_parameters: dict, version: int, kind: str = "search") -> str:
+        digest = hashlib.sha1(normalize_parameters(search_parameters).encode()).hexdigest()
+        return f"{_KEY_PREFIX}:{kind}:{schema_name}:{version}:{digest}"
+
+    def get(self, schema_name: str, search_parameters: dict):
+        """
+        Returns:
+            A tuple of the cached results, None on a miss, and the key to cache the results under
+        """
+        key = self.make_key(schema_name, search_parameters, self.get_version(schema_name))
+        results = self.cache.get(key)
+
+        with self._lock:
+            if results is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        return results, key
+
+    def get_count(self, schema_name: str, search_parameters: dict):
+        """
+        Counts, such as the total of the admin changelist, are cached for `TYPESENSE_COUNT_CACHE_TIMEOUT` seconds
+        when it is set, even if `TYPESENSE_CACHE` isn't. Writes invalidate them like results.
+
+        Returns:
+            A tuple of the cached number of hits, None on a miss, and the key to cache it under
+        """
+        if not self.count_timeout:
+            return None, None
+
+        key = self.make_key(schema_name, search_parameters, self.get_version(schema_name), kind="count")
+        return self.cache.get(key), key
+
+    def set_count(self, key: str, count: int):
+        if key is not None:
+            self.cache.set(key, count, timeout=self.count_timeout)
+
+    def set(self, key: str, results: dict):
+        max_entry_size = self.config.get("max_entry_size")
+        if max_entry_size and len(pickle.dumps(results)) > max_entry_size:
+            logger.debug(f"Not caching {key}, the results are larger than {max_entry_size} bytes")
+            return
+
+        self.cache.set(key, results, timeout=self.config.get("timeout", 60))
+
+
+search_cache = SearchCache()
+
+
+def invalidates_search_cache(method):
+    """
+    Invalidate the cached results of the collection once the decorated collection method is done
+    """
+
+    if inspect.iscoroutinefunction(method):
+
+        @wraps(method)
+        async def async_wrapper(self, *args, **kwargs):
+            try:
+                return await method(self, *args, **kwargs)
+            finally:
+                search_cache.invalidate(self.schema_name)
+
+        return async_wrapper
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            search_cache.invalidate(self.schema_name)
+
+    return wrapper
@@ -1,23 +1,47 @@
+import calendar
 import logging
+import warnings
+from datetime import date, datetime, timedelta
+from itertools import islice
 
 from dateutil.parser import parse
 
 from django import forms
 from django.contrib import messages
 from django.contrib.admin.exceptions import DisallowedModelAdminToField
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
 from django.contrib.admin.options import (
     IS_POPUP_VAR,
     TO_FIELD_VAR,
     IncorrectLookupParameters,
 )
+from django.conf import settings
 from django.contrib.admin.views.main import ChangeList
-from django.core.exceptions import ImproperlyConfigured, SuspiciousOperation
+from django.core.exceptions import (
+    EmptyResultSet,
+    ImproperlyConfigured,
+    SuspiciousOperation,
+)
 from django.core.paginator import InvalidPage
 from django.db.models import OrderBy, OuterRef, Exists
+from django.utils.timezone import make_aware
 from django.utils.translation import gettext
 
-from django_typesense.fields import TYPESENSE_DATETIME_FIELDS
-from django_typesense.utils import get_unix_timestamp
+from django_typesense.admin import TypesenseSearchAdminMixin
+from django_typesense.cache import search_cache
+from django_typesense.exceptions import TooManyResultsError, UnsupportedFilterError
+from django_typesense.fields import (
+    TYPESENSE_DATETIME_FIELDS,
+    TypesenseDateField,
+    TypesenseDateTimeField,
+)
+from django_typesense.filters import TypesenseFacetListFilter
+from django_typesense.query import compile_filter_by
+from django_typesense.utils import (
+    TYPESENSE_MAX_HITS_PER_PAGE,
+    get_unix_timestamp,
+    typesense_multi_search,
+)
 
 # Changelist settings
 ALL_VAR = "all"
@@ -37,7 +61,6 @@ IGNORED_PARAMS = (
 )
 
 logger = logging.getLogger(__name__)
-TYPESENSE_MAX_HITS_PER_PAGE = 250
 
 
 class ChangeListSearchForm(forms.Form):
@@ -49,6 +72,25 @@ class ChangeListSearchForm(forms.Form):
         }
 
 
+class DateHierarchyDates:
+    """
+    Stands in for the changelist queryset in the `date_hierarchy` template tag, the dates of the drilldown are
+    those of the range facets with hits
+    """
+
+    def __init__(self, dates):
+        self._dates = list(dates)
+
+    def aggregate(self, **kwargs):
+        # the drilldown starts at the years
+        return {name: None for name in kwargs}
+
+    def dates(self, field_name, kind, order="ASC"):
+        return self._dates if order == "ASC" else self._dates[::-1]
+
+    datetimes = dates
+
+
 class TypesenseChangeList(ChangeList):
     search_form_class = ChangeListSearchForm
 
@@ -74,8 +116,9 @@ class TypesenseChangeList(ChangeList):
         self.lookup_opts = self.opts
         self.root_queryset = model_admin.get_queryset(request)
 
-        # TYPESENSE
-        self.root_results = model_admin.get_results(request)
+        # TYPESENSE, fetched with the filtered results
+        self.root_results = None
+        self.typesense_filter_by = ""
 
         self.list_display = list_display
         self.list_display_links = list_display_links
@@ -117,6 +160,8 @@ class TypesenseChangeList(ChangeList):
             )
         self.to_field = to_field
         self.params = dict(request.GET.items())
+        # Django 5 reads the filters from the lists of values
+        self.filter_params = dict(request.GET.lists())
         if PAGE_VAR in self.params:
             del self.params[PAGE_VAR]
         if ERROR_FLAG in self.params:
@@ -236,9 +281,10 @@ class TypesenseChangeList(ChangeList):
                 field_name = param
                 order = "asc"
 
-            # Temporarily left out: Could not find a field named `id` in the schema for sorting
+            # typesense can't sort on the string `id`, its sortable copy is used if there is one
             if field_name in ["pk", "id"]:
-                # sort_dict['id'] = order
+                if cursor_field := self.model.collection_class.cursor_field:
+                    sort_dict[cursor_field] = order
                 continue
 
             if not fields.get(field_name):
@@ -337,6 +383,27 @@ class TypesenseChangeList(ChangeList):
 
         return search_filters_dict
 
+    def get_compiled_filter(self, key: str, value) -> str:
+        """
+        Compile an `__in` or `__range` lookup parameter, these take several comma separated values
+
+        Returns:
+            The filter_by expression, empty if the lookup can't be expressed in typesense
+        """
+        if isinstance(value, str):
+            value = value.split(",")
+        elif value and isinstance(value[-1], (list, tuple)):
+            # Django 5 keeps every value given for the parameter
+            value = value[-1]
+
+        try:
+            return compile_filter_by(self.model.collection_class, **{key: value})
+        except (UnsupportedFilterError, EmptyResultSet, ValueError) as er:
+            logger.debug(
+                f"Searching with parameter `{key}={value}` produced error: {er}"
+            )
+            return ""
+
     def get_typesense_results(self, request):
         """
         This should do what Changelist.get_queryset does
@@ -377,7 +444,18 @@ class TypesenseChangeList(ChangeList):
                 used_parameters = getattr(filter_spec, "used_parameters")
                 remaining_lookup_params.update(used_parameters)
 
+        date_hierarchy_filter = self.get_date_hierarchy_filter(remaining_lookup_params)
+        compiled_filters = [date_hierarchy_filter] if date_hierarchy_filter else []
         for k, v in remaining_lookup_params.items():
+            if self.date_hierarchy and k in (f"{self.date_hierarchy}__gte", f"{self.date_hierarchy}__lt"):
+                continue
+
+            if k.rpartition("__")[2] in ("in", "range"):
+                compiled_filter = self.get_compiled_filter(k, v)
+                if compiled_filter:
+                    compiled_filters.append(compiled_filter)
+                continue
+
             try:
                 field_name, _ = k.split("__", maxsplit=1)
             except ValueError:
@@ -387,9 +465,13 @@ class TypesenseChangeList(ChangeList):
             search_filters = self.get_search_filters(field_name, {k: v})
             filters_dict.update(search_filters)
 
-        filter_by = " && ".join(
-            [f"{key}:{value}" for key, value in filters_dict.items()]
-        )
+        def get_filter_by(exclude=None):
+            return " && ".join(
+                [f"{key}:{value}" for key, value in filters_dict.items() if key != exclude]
+                + compiled_filters
+            )
+
+        filter_by = self.typesense_filter_by = get_filter_by()
 
         # Set ordering.
         ordering = self.get_typesense_ordering(request)
@@ -397,14 +479,62 @@ class TypesenseChangeList(ChangeList):
 
         # Apply django_typesense search results
         query = self.query or "*"
-        results = self.model_admin.get_typesense_search_results(
-            request,
-            query,
-            self.page_num,
-            filter_by=filter_by,
-            sort_by=sort_by,
-            list_per_page=self.list_per_page,
-        )
+        # All the searches of the page are made in a single request
+        searches = [
+            self.model_admin.get_typesense_search_parameters(
+                request,
+                query,
+                self.page_num,
+                filter_by=filter_by,
+                sort_by=sort_by,
+                list_per_page=self.list_per_page,
+            )
+        ]
+        facet_searches = self.get_facet_searches(searches[0], get_filter_by)
+        searches.extend(facet_searches.values())
+        date_ranges = self.add_date_hierarchy_facet(searches[0])
+
+        # The total is only counted when it's shown and isn't cached
+        full_result_count = count_key = None
+        if self.model_admin.show_full_result_count:
+            root_parameters = self.model_admin.get_results_search_parameters(request)
+            full_result_count, count_key = search_cache.get_count(
+                root_parameters["collection"],
+                {key: value for key, value in root_parameters.items() if key != "collection"},
+            )
+            if full_result_count is None:
+                searches.append(root_parameters)
+
+        if self.overrides_typesense_search_results():
+            # The override still makes the search of the page, without the facets and the projection
+            warnings.warn(
+                f"{type(self.model_admin).__name__}.get_typesense_search_results() is deprecated and isn't used "
+                f"with the other searches of the changelist, override get_typesense_search_parameters() instead.",
+                DeprecationWarning,
+            )
+            results = self.model_admin.get_typesense_search_results(
+                request,
+                query,
+                self.page_num,
+                filter_by=filter_by,
+                sort_by=sort_by,
+                list_per_page=self.list_per_page,
+            )
+            other_results = typesense_multi_search(searches[1:])
+        else:
+            results, *other_results = typesense_multi_search(searches)
+        facet_results = other_results[: len(facet_searches)]
+        root_results = other_results[len(facet_searches) :]
+        self.set_facet_counts(results, dict(zip(facet_searches, facet_results)))
+        if self.date_hierarchy:
+            self.queryset = self.get_date_hierarchy_dates(results, date_ranges)
+
+        if root_results:
+            full_result_count = root_results[0]["found"]
+            search_cache.set_count(count_key, full_result_count)
+
+        if full_result_count is not None:
+            self.root_results = {"found": full_result_count, "hits": []}
 
         # Set query string for clearing all filters.
         self.clear_all_filters_qs = self.get_query_string(
@@ -414,7 +544,258 @@ class TypesenseChangeList(ChangeList):
 
         return results
 
+    def overrides_typesense_search_results(self) -> bool:
+        """
+        Returns:
+            Whether the model admin overrides `get_typesense_search_results`, which made the search of the page
+            before the searches were batched
+        """
+        return (
+            type(self.model_admin).get_typesense_search_results
+            is not TypesenseSearchAdminMixin.get_typesense_search_results
+        )
+
+    def get_date_hierarchy_field(self):
+        """
+        Returns:
+            The collection field of the `date_hierarchy`, None if there isn't one
+
+        Raises:
+            ImproperlyConfigured: the field isn't a date or datetime facet field of the collection
+        """
+        if not self.date_hierarchy:
+            return None
+
+        collection_class = self.model.collection_class
+        field = collection_class.get_fields().get(self.date_hierarchy)
+        if not isinstance(field, (TypesenseDateField, TypesenseDateTimeField)) or not field.facet:
+            raise ImproperlyConfigured(
+                f"The date_hierarchy `{self.date_hierarchy}` must be a date or datetime facet field of "
+                f"{collection_class.__name__}"
+            )
+        return field
+
+    def get_date_hierarchy_timestamp(self, field, day: date) -> int:
+        if isinstance(field, TypesenseDateField):
+            return get_unix_timestamp(day)
+
+        start = datetime(day.year, day.month, day.day)
+        return get_unix_timestamp(make_aware(start) if settings.USE_TZ else start)
+
+    def get_date_hierarchy_filter(self, lookup_params: dict) -> str:
+        """
+        Get the range of the selected year, month or day, which django turns into `__gte` and `__lt` parameters
+
+        Returns:
+            The filter_by expression, empty if no date is selected
+        """
+        field = self.get_date_hierarchy_field()
+        if field is None:
+            return ""
+
+        bounds = {}
+        for lookup in ("gte", "lt"):
+            value = lookup_params.get(f"{self.date_hierarchy}__{lookup}")
+            if isinstance(value, list):
+                value = value[-1]
+            if value is not None:
+                bounds[lookup] = self.get_date_hierarchy_timestamp(field, value.date())
+
+        return " && ".join(
+            f"{field.name}:{operator}{bounds[lookup]}"
+            for lookup, operator in (("gte", ">="), ("lt", "<"))
+            if lookup in bounds
+        )
+
+    def get_date_hierarchy_ranges(self) -> list:
+        """
+        Get the dates the drilldown can show: the days of the selected month, the months of the selected year or
+        the years of `typesense_date_hierarchy_years` on the admin (1970 to next year by default)
+
+        Returns:
+            A list of the labels, first days and days following the last of each range
+        """
+        year = self.params.get(f"{self.date_hierarchy}__year")
+        month = self.params.get(f"{self.date_hierarchy}__month")
+        if self.params.get(f"{self.date_hierarchy}__day"):
+            return []
+
+        try:
+            if month and year:
+                year, month = int(year), int(month)
+                days = range(1, calendar.monthrange(year, month)[1] + 1)
+                starts = [date(year, month, day) for day in days]
+                ends = [start + timedelta(days=1) for start in starts]
+            elif year:
+                year = int(year)
+                starts = [date(year, month, 1) for month in range(1, 13)]
+                ends = starts[1:] + [date(year + 1, 1, 1)]
+            else:
+                years = self.model_admin.typesense_date_hierarchy_years or range(1970, date.today().year + 2)
+                starts = [date(year, 1, 1) for year in years]
+                ends = [date(year + 1, 1, 1) for year in years]
+        except ValueError as e:
+            raise IncorrectLookupParameters(e) from e
+
+        return [(f"d{start:%Y%m%d}", start, end) for start, end in zip(starts, ends)]
+
+    def add_date_hierarchy_facet(self, search_parameters: dict) -> list:
+        """
+        Count the hits of each date the drilldown can show with range facets on the timestamps
+
+        Returns:
+            The ranges of `get_date_hierarchy_ranges`
+        """
+        field = self.get_date_hierarchy_field()
+        if field is None:
+            return []
+
+        date_ranges = self.get_date_hierarchy_ranges()
+        if not date_ranges:
+            return []
+
+        ranges = ", ".join(
+            f"{label}:[{self.get_date_hierarchy_timestamp(field, start)}, "
+            f"{self.get_date_hierarchy_timestamp(field, end)}]"
+            for label, start, end in date_ranges
+        )
+        facet_by = [search_parameters.get("facet_by"), f"{field.name}({ranges})"]
+        search_parameters["facet_by"] = ",".join(filter(None, facet_by))
+        search_parameters["max_facet_values"] = max(
+            search_parameters.get("max_facet_values", 0), len(date_ranges)
+        )
+        return date_ranges
+
+    def get_date_hierarchy_dates(self, results: dict, date_ranges: list) -> DateHierarchyDates:
+        counts = {}
+        for facet in results.get("facet_counts", []):
+            if facet["field_name"] == self.date_hierarchy:
+                counts = {count["value"]: count["count"] for count in facet["counts"]}
+
+        return DateHierarchyDates(start for label, start, _ in date_ranges if counts.get(label))
+
+    def get_facet_specs(self) -> list:
+        return [
+            filter_spec
+            for filter_spec in self.filter_specs
+            if isinstance(filter_spec, TypesenseFacetListFilter)
+        ]
+
+    def get_facet_searches(self, search_parameters: dict, get_filter_by) -> dict:
+        """
+        Add the facets of the facet list filters to the search of the page. The facets of the filters in use are
+        counted by their own search, without their own value in `filter_by`.
+
+        Args:
+            search_parameters: the parameters of the search of the page, updated with the facets not in use
+            get_filter_by: returns the `filter_by` of the page without the filters of the field it is given
+
+        Returns:
+            A dictionary of the filters in use to the parameters of their facet search
+        """
+        facet_specs = self.get_facet_specs()
+        if not facet_specs:
+            return {}
+
+        unused_specs = [filter_spec for filter_spec in facet_specs if filter_spec.value() is None]
+        if unused_specs:
+            search_parameters["facet_by"] = ",".join(filter_spec.field_name for filter_spec in unused_specs)
+            search_parameters["max_facet_values"] = max(
+                filter_spec.max_facet_values for filter_spec in unused_specs
+            )
+
+        facet_searches = {}
+        for filter_spec in facet_specs:
+            if filter_spec.value() is None:
+                continue
+
+            facet_search = {
+                **search_parameters,
+                "filter_by": get_filter_by(exclude=filter_spec.field_name),
+                "facet_by": filter_spec.field_name,
+                "max_facet_values": filter_spec.max_facet_values,
+                "page": 1,
+                "per_page": 0,
+            }
+            facet_searches[filter_spec] = facet_search
+
+        return facet_searches
+
+    def set_facet_counts(self, results: dict, facet_results: dict):
+        """
+        Set the choices of the facet list filters from the facet counts of the searches
+        """
+        facet_counts = {
+            facet["field_name"]: facet["counts"] for facet in results.get("facet_counts", [])
+        }
+        for filter_spec in self.get_facet_specs():
+            if filter_spec in facet_results:
+                counts = {
+                    facet["field_name"]: facet["counts"]
+                    for facet in facet_results[filter_spec].get("facet_counts", [])
+                }
+            else:
+                counts = facet_counts
+            filter_spec.set_facet_counts(counts.get(filter_spec.field_name, []))
+
+    def get_action_queryset(self, request):
+        """
+        Get the rows an admin action applies to. The rows picked one by one are selected by django, the rows of
+        "select all" are those matching the typesense search of the changelist.
+
+        Returns:
+            A queryset, or None if the request isn't an admin action
+        """
+        if request.method != "POST" or not (
+            request.POST.get("action") or request.POST.getlist(ACTION_CHECKBOX_NAME)
+        ):
+            return None
+
+        queryset = self.root_queryset
+        select_across = forms.BooleanField(required=False).to_python(request.POST.get("select_across"))
+        # without a search or a filter, every row matches
+        if select_across and (self.query or self.typesense_filter_by):
+            queryset = queryset.filter(pk__in=self.get_action_pks(request))
+
+        return queryset.order_by(*self.get_ordering(request, queryset))
+
+    def get_action_pks(self, request) -> set:
+        """
+        Read the primary keys of the rows matching the typesense search, up to the `typesense_action_max_results`
+        of the admin so that the query of the action stays bounded.
+
+        Returns:
+            The primary keys
+
+        Raises:
+            TooManyResultsError: if more rows match, the admin aborts the action
+        """
+        max_results = self.model_admin.typesense_action_max_results
+        pks = iter(self.model_admin.iter_typesense_ids(request, self.query, self.typesense_filter_by))
+        try:
+            selected = set()
+            # the ids are streamed in chunks, the stream is left as soon as the limit is exceeded
+            while chunk := list(islice(pks, TYPESENSE_MAX_HITS_PER_PAGE)):
+                selected.update(chunk)
+                if len(selected) > max_results:
+                    raise TooManyResultsError(
+                        gettext(
+                            "Actions apply to at most %(max_results)s search results. Narrow down the search or "
+                            "the filters, no items have been changed."
+                        )
+                        % {"max_results": max_results}
+                    )
+        finally:
+            if hasattr(pks, "close"):
+                pks.close()
+
+        return selected
+
     def get_queryset(self, request):
+        action_queryset = self.get_action_queryset(request)
+        if action_queryset is not None:
+            return action_queryset
+
         # this is needed for admin actions that call cl.get_queryset
         # exporting is the currently possible way of getting records from typesense without pagination
         # Typesense team will work on a flag to disable pagination, until then, we need a way to get this to work.
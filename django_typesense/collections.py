@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import asyncio
 import logging
+from functools import lru_cache
+from itertools import islice
 from operator import methodcaller
 from typing import Dict, Iterable, List, Union
 
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ImproperlyConfigured
 from django.db.models import QuerySet
 from django.utils.functional import cached_property
 
@@ -14,8 +19,22 @@ except ImportError:
 
 from typesense.exceptions import ObjectAlreadyExists, ObjectNotFound
 
-from django_typesense.fields import TypesenseCharField, TypesenseField
-from django_typesense.typesense_client import client
+from django_typesense.cache import invalidates_search_cache
+from django_typesense.debounce import debouncer
+from django_typesense.fields import (
+    TYPESENSE_DATETIME_FIELDS,
+    TypesenseArrayField,
+    TypesenseCharField,
+    TypesenseField,
+)
+from django_typesense.registry import registry
+from django_typesense.typesense_client import client, get_async_client
+from django_typesense.utils import (
+    get_ids_filter,
+    get_projection_parameters,
+    iter_pk_chunks,
+    map_chunks,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -56,6 +75,84 @@ class Synonym:
         }
 
 
+def _rebuild_result(collection_class, document: dict):
+    return collection_class.get_result_class()(document)
+
+
+class TypesenseResult:
+    """
+    A read-only search result hydrated straight from a typesense document. Field values are converted with
+    the field's `to_python` the first time they are accessed.
+    """
+
+    __slots__ = ("_document", "_values")
+    _fields: Dict[str, TypesenseField] = {}
+    _collection_class = None
+
+    def __init__(self, document: dict):
+        object.__setattr__(self, "_document", document)
+        object.__setattr__(self, "_values", {})
+
+    def __getattr__(self, name):
+        if name in TypesenseResult.__slots__:
+            raise AttributeError(name)
+
+        try:
+            return self._values[name]
+        except KeyError:
+            pass
+
+        try:
+            field = self._fields[name]
+        except KeyError:
+            raise AttributeError(
+                f"'{self.__class__.__name__}' object has no attribute '{name}'"
+            ) from None
+
+        value = self._document.get(name)
+        if value is not None:
+            value = field.to_python(value)
+
+        self._values[name] = value
+        return value
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"'{self.__class__.__name__}' object is read-only")
+
+    def __copy__(self):
+        return self.__class__(self._document)
+
+    def __reduce__(self):
+        # The result classes are built per collection and can't be looked up by name
+        return _rebuild_result, (self._collection_class, self._document)
+
+    def __eq__(self, other):
+        return isinstance(other, self.__class__) and self.pk == other.pk
+
+    def __hash__(self):
+        return hash((self.__class__, self.pk))
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}: {self.pk}>"
+
+    @property
+    def pk(self):
+        """
+        The id converted to the type of the primary key of the indexed model
+        """
+        model = registry.get_model(self._collection_class)
+        if model is None:
+            return self.id
+        return model._meta.pk.to_python(self._document["id"])
+
+    @property
+    def document(self) -> dict:
+        """
+        The raw typesense document
+        """
+        return self._document
+
+
 class TypesenseCollectionMeta(type):
     def __new__(cls, name, bases, namespace):
         namespace["schema_name"] = namespace.get("schema_name") or name.lower()
@@ -69,6 +166,14 @@ class TypesenseCollection(metaclass=TypesenseCollectionMeta):
     token_separators: list = []
     symbols_to_index: list = []
     synonyms: List[Synonym] = []
+    # Writes that only touch these fields are collapsed per document within the debounce window.
+    # Either a list of field names using `debounce_window` or a dictionary of field names to windows in seconds
+    debounce_fields: Union[List[str], Dict[str, float]] = []
+    debounce_window: float = 0
+    # A sortable integer field holding a unique copy of the id, see `get_cursor_field`
+    cursor_field: str = ""
+    # Named sets of fields to return from searches, see `get_projection`
+    projections: Dict[str, dict] = {}
 
     def __init__(
         self,
@@ -80,7 +185,8 @@ class TypesenseCollection(metaclass=TypesenseCollectionMeta):
         assert (
             self.query_by_fields
         ), "`query_by_fields` must be specified in the collection definition"
-        assert not all([obj, data]), "`obj` and `data` cannot be provided together"
+        # querysets are not evaluated here, they may be serialized in another thread
+        assert not (data and obj is not None), "`obj` and `data` cannot be provided together"
 
         self.update_fields = update_fields
         self._meta = self._get_metadata()
@@ -200,6 +306,169 @@ class TypesenseCollection(metaclass=TypesenseCollectionMeta):
         fields = cls.get_fields()
         return fields[name]
 
+    @classmethod
+    def get_projection(cls, name: str) -> dict:
+        """
+        Get the search parameters of one of the `projections` of the collection. Each projection takes the
+        arguments of `get_projection_parameters` e.g.
+
+            projections = {"list": {"include_fields": ["title", "genre_name"], "highlight": False}}
+
+        Args:
+            name: the name of the projection
+
+        Returns:
+            The typesense search parameters
+        """
+        try:
+            projection = cls.projections[name]
+        except KeyError:
+            raise ValueError(f"{cls.__name__} has no `{name}` projection") from None
+
+        unknown_fields = {
+            *projection.get("include_fields", ()), *projection.get("exclude_fields", ())
+        }.difference(cls.get_fields())
+        if unknown_fields:
+            raise ValueError(
+                f"The `{name}` projection of {cls.__name__} has unknown fields: {', '.join(sorted(unknown_fields))}"
+            )
+
+        return get_projection_parameters(**projection)
+
+    @classmethod
+    def get_cursor_field(cls) -> str:
+        """
+        Get the field used to walk the hits of a search beyond the page limit. Typesense can't sort on the string
+        `id` so the collection must define a sortable integer copy of it e.g.
+
+            sort_id = TypesenseBigIntegerField(sort=True, value="pk")
+            cursor_field = "sort_id"
+
+        Returns:
+            The name of the cursor field
+
+        Raises:
+            ImproperlyConfigured: `cursor_field` isn't set or isn't a sortable integer field
+        """
+        if not cls.cursor_field:
+            raise ImproperlyConfigured(
+                f"{cls.__name__} must define a `cursor_field` to be paginated with a cursor"
+            )
+
+        field = cls.get_fields().get(cls.cursor_field)
+        if field is None or not field.sort or field.field_type not in ("int32", "int64"):
+            raise ImproperlyConfigured(
+                f"The `cursor_field` of {cls.__name__}, `{cls.cursor_field}`, must be a sortable integer field"
+            )
+
+        return cls.cursor_field
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def get_result_class(cls) -> type:
+        """
+        Returns:
+            The TypesenseResult subclass for the documents of this collection
+        """
+        return type(
+            f"{cls.__name__}Result",
+            (TypesenseResult,),
+            {
+                "__slots__": (),
+                "_fields": cls.get_fields(),
+                "_collection_class": cls,
+                "__module__": cls.__module__,
+            },
+        )
+
+    @classmethod
+    def get_results(cls, search_results: dict) -> List[TypesenseResult]:
+        """
+        Hydrate the hits of a typesense search response without touching the database
+
+        Args:
+            search_results: the typesense search response
+
+        Returns:
+            A list of TypesenseResult
+        """
+        result_class = cls.get_result_class()
+        return [result_class(hit["document"]) for hit in search_results["hits"]]
+
+    @classmethod
+    def aggregate(
+        cls, facets: Iterable[str] = (), filter_by: str = "", max_facet_values: int = 10, **search_parameters
+    ) -> dict:
+        """
+        Count and aggregate the matching documents in a single search instead of scanning the table
+
+        Args:
+            facets: the names of the fields to aggregate, they must be declared with `facet=True`
+            filter_by: the typesense filter of the documents to aggregate
+            max_facet_values: the maximum number of values counted per field
+            **search_parameters: any other typesense search parameters e.g. `q`
+
+        Returns:
+            A dictionary like Django's `aggregate` i.e. `count` and for each field `FIELD__counts`, the number of
+            documents per value, and for numeric fields `FIELD__min`, `FIELD__max`, `FIELD__avg` and `FIELD__sum`
+        """
+        fields = cls.get_fields()
+        facets = list(facets)
+        for field_name in facets:
+            if field_name not in fields:
+                raise ValueError(f"`{field_name}` is not a field of {cls.__name__}")
+            if not fields[field_name].facet:
+                raise ValueError(f"`{field_name}` must be declared with facet=True to be aggregated")
+
+        search_parameters = {
+            "q": "*",
+            "query_by": cls.query_by_fields,
+            **search_parameters,
+            "per_page": 0,
+        }
+        if filter_by:
+            search_parameters["filter_by"] = filter_by
+        if facets:
+            search_parameters["facet_by"] = ",".join(facets)
+            search_parameters["max_facet_values"] = max_facet_values
+
+        results = client.collections[cls.schema_name].documents.search(search_parameters)
+
+        aggregates = {"count": results["found"]}
+        for facet_counts in results.get("facet_counts", []):
+            field = fields[facet_counts["field_name"]]
+            aggregates[f"{field.name}__counts"] = {
+                cls._parse_facet_value(field, count["value"]): count["count"]
+                for count in facet_counts["counts"]
+            }
+
+            stats = facet_counts.get("stats") or {}
+            for stat in ("min", "max"):
+                if stat in stats:
+                    aggregates[f"{field.name}__{stat}"] = cls._parse_facet_value(field, stats[stat])
+            for stat in ("avg", "sum"):
+                if stat in stats:
+                    aggregates[f"{field.name}__{stat}"] = stats[stat]
+
+        return aggregates
+
+    @staticmethod
+    def _parse_facet_value(field: TypesenseField, value):
+        """
+        Facet values and stats are strings or floats regardless of the field type
+        """
+        if isinstance(field, TypesenseArrayField):
+            field = field.base_field
+
+        if field.field_type == "bool":
+            return value in (True, "true")
+        if field.field_type in ("int32", "int64"):
+            value = int(float(value))
+            return field.to_python(value) if isinstance(field, tuple(TYPESENSE_DATETIME_FIELDS)) else value
+        if field.field_type == "float":
+            return float(value)
+        return value
+
     @classmethod
     def get_django_lookup(cls, field, value, exception: Exception) -> dict:
         """
@@ -277,6 +546,7 @@ class TypesenseCollection(metaclass=TypesenseCollectionMeta):
         except ObjectAlreadyExists:
             pass
 
+    @invalidates_search_cache
     def update_typesense_collection(self):
         """
         Update the schema of an existing collection
@@ -322,6 +592,7 @@ class TypesenseCollection(metaclass=TypesenseCollectionMeta):
         logger.debug(f"Updating schema changes in {self.schema_name}")
         return client.collections[self.schema_name].update(schema_changes)
 
+    @invalidates_search_cache
     def drop_typesense_collection(self):
         """
         Drops a typesense collection from the typesense server
@@ -334,28 +605,234 @@ class TypesenseCollection(metaclass=TypesenseCollectionMeta):
         """
         return client.collections[self.schema_name].retrieve()
 
-    def delete(self):
-        if not self.data:
+    def get_document_ids(self, batch_size: int = 1024):
+        """
+        Yields the ids of the documents without serializing the objects. The primary keys of querysets
+        are streamed in chunks.
+        """
+        if self._data:
+            yield from (document["id"] for document in self._data)
             return
 
-        delete_params = {
-            "filter_by": f"id: {[obj['id'] for obj in self.data]}".replace("'", "")
-        }
+        if self.obj is None:
+            return
 
-        try:
-            return client.collections[self.schema_name].documents.delete(delete_params)
-        except ObjectNotFound:
-            pass
+        id_field = self.fields["id"]
+        if not self.many:
+            yield id_field.value(self.obj)
+            return
+
+        if isinstance(self.obj, QuerySet):
+            pk = self.obj.model._meta.pk
+            if id_field._value in {"pk", pk.name, pk.attname}:
+                for pks in iter_pk_chunks(self.obj, batch_size):
+                    yield from map(str, pks)
+                return
+
+            objs = self.obj.iterator(chunk_size=batch_size)
+        else:
+            objs = self.obj
+
+        for obj in objs:
+            yield id_field.value(obj)
+
+    @invalidates_search_cache
+    def delete(self, batch_size: int = 1024, num_threads: int = 1, filter_by: str = None):
+        """
+        Delete the documents in chunks of `batch_size` ids, optionally using several threads
 
+        Args:
+            batch_size: the number of ids per request
+            num_threads: the number of requests made concurrently
+            filter_by: delete the documents matching this filter in a single request instead
+
+        Returns:
+            A dictionary with the number of deleted documents
+        """
+        if filter_by:
+            # the matching documents held back by the debouncer are unknown, they are written first so that the
+            # delete removes them
+            debouncer.flush(self.schema_name)
+            try:
+                return client.collections[self.schema_name].documents.delete(
+                    {"filter_by": filter_by, "batch_size": batch_size}
+                )
+            except ObjectNotFound:
+                return {"num_deleted": 0}
+
+        def delete_chunk(document_ids):
+            # pending writes would recreate the documents
+            debouncer.pop(self.schema_name, document_ids)
+            try:
+                response = client.collections[self.schema_name].documents.delete(
+                    {"filter_by": get_ids_filter(document_ids)}
+                )
+            except ObjectNotFound:
+                return 0
+
+            return response["num_deleted"]
+
+        num_deleted = map_chunks(
+            delete_chunk, self.get_document_ids(batch_size), batch_size, num_threads
+        )
+        return {"num_deleted": sum(num_deleted)}
+
+    @classmethod
+    def get_debounce_window(cls, field_names) -> float:
+        """
+        Returns:
+            The number of seconds writes to these fields can be held back, 0 if they can't be debounced
+        """
+        if isinstance(cls.debounce_fields, dict):
+            windows = cls.debounce_fields
+        else:
+            windows = {field_name: cls.debounce_window for field_name in cls.debounce_fields}
+
+        field_names = set(field_names).difference({"id"})
+        if not field_names or not field_names.issubset(windows):
+            return 0
+
+        return min(windows[field_name] for field_name in field_names)
+
+    @invalidates_search_cache
     def update(self, action_mode: str = "emplace"):
         if not self.data:
             return
 
+        if self._debounce():
+            return
+
         if len(self.data) == 1:
             return self._update_single_document(self.data[0])
         else:
             return self._update_multiple_documents(action_mode)
 
+    @invalidates_search_cache
+    async def aupdate(self, action_mode: str = "emplace"):
+        """
+        Asyncio version of `update`. The objects are serialized in a worker thread since they may hit the database.
+        """
+        data = await sync_to_async(getattr)(self, "data")
+        if not data or self._debounce():
+            return
+
+        documents = get_async_client().collections[self.schema_name].documents
+        if len(data) == 1:
+            document = data[0]
+            document_id = document.pop("id")
+            try:
+                return await documents[document_id].update(document)
+            except ObjectNotFound:
+                self.update_fields = []
+                # we don't want the cached data
+                return await documents.upsert((await sync_to_async(self.get_data)())[0])
+
+        try:
+            return await documents.import_(data, {"action": action_mode})
+        except ObjectNotFound:
+            return await documents.import_(
+                await sync_to_async(self.get_data)(), {"action": action_mode}
+            )
+
+    @invalidates_search_cache
+    async def adelete(self, batch_size: int = 1024, concurrency: int = 1, filter_by: str = None):
+        """
+        Asyncio version of `delete`, up to `concurrency` chunks of ids are deleted at once
+
+        Returns:
+            A dictionary with the number of deleted documents
+        """
+        documents = get_async_client().collections[self.schema_name].documents
+        if filter_by:
+            await sync_to_async(debouncer.flush)(self.schema_name)
+            try:
+                return await documents.delete({"filter_by": filter_by, "batch_size": batch_size})
+            except ObjectNotFound:
+                return {"num_deleted": 0}
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def delete_chunk(document_ids):
+            debouncer.pop(self.schema_name, document_ids)
+            try:
+                response = await documents.delete({"filter_by": get_ids_filter(document_ids)})
+            except ObjectNotFound:
+                return 0
+            finally:
+                semaphore.release()
+
+            return response["num_deleted"]
+
+        # The ids may be streamed from the database
+        document_ids = self.get_document_ids(batch_size)
+        get_chunk = sync_to_async(lambda: list(islice(document_ids, batch_size)))
+
+        tasks = []
+        try:
+            while True:
+                await semaphore.acquire()
+                chunk = await get_chunk()
+                if not chunk:
+                    semaphore.release()
+                    break
+                tasks.append(asyncio.create_task(delete_chunk(chunk)))
+
+            num_deleted = await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        return {"num_deleted": sum(num_deleted)}
+
+    def _debounce(self) -> bool:
+        """
+        Hold back the documents if they only touch debounced fields, otherwise merge the pending values of the
+        documents into them since they are older than this write
+
+        Returns:
+            Whether the documents were held back
+        """
+        if not self.debounce_fields:
+            return False
+
+        window = min(self.get_debounce_window(document) for document in self.data)
+        if window > 0:
+            debouncer.add(self.schema_name, self.data, window)
+            return True
+
+        pending = debouncer.pop(self.schema_name, [document["id"] for document in self.data])
+        for document in self.data:
+            if pending_document := pending.get(document["id"]):
+                pending_document.update(document)
+                document.update(pending_document)
+
+        return False
+
+    @invalidates_search_cache
+    def upsert(self):
+        """
+        Create or fully replace the documents in a single request
+        """
+        if not self.data:
+            return
+
+        if len(self.data) == 1:
+            return client.collections[self.schema_name].documents.upsert(self.data[0])
+
+        return self._update_multiple_documents("upsert")
+
+    @invalidates_search_cache
+    def import_documents(self, action_mode: str = "emplace"):
+        """
+        Write all the documents in a single import request with the given action
+        """
+        if not self.data:
+            return
+
+        return client.collections[self.schema_name].documents.import_(
+            self.data, {"action": action_mode}
+        )
+
     def _update_single_document(self, document):
         document_id = document.pop("id")
 
@@ -383,6 +860,7 @@ class TypesenseCollection(metaclass=TypesenseCollectionMeta):
                 self.get_data(), {"action": action_mode}
             )
 
+    @invalidates_search_cache
     def create_or_update_synonyms(self):
         current_synonyms = {}
         for synonym in self.get_synonyms().get("synonyms", []):
@@ -425,6 +903,7 @@ class TypesenseCollection(metaclass=TypesenseCollectionMeta):
         """Retrieve a single synonym by name"""
         return client.collections[self.schema_name].synonyms[synonym_name].retrieve()
 
+    @invalidates_search_cache
     def delete_synonym(self, synonym_name):
         """Delete the synonym with the given name associated with this collection"""
         return client.collections[self.schema_name].synonyms[synonym_name].delete()
@@ -0,0 +1,116 @@
+import atexit
+import logging
+import os
+import threading
+import time
+
+from typesense.exceptions import TypesenseClientError
+
+from django_typesense.cache import search_cache
+from django_typesense.typesense_client import client
+
+logger = logging.getLogger(__name__)
+
+
+class Debouncer:
+    """
+    Collapses repeated partial updates of the same document into one write.
+
+    Documents are held per collection until the shortest window of the pending writes elapses and
+    are then sent in a single import. Writes to a document that is already pending are merged into
+    it so that only the final state is sent.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """
+        Drop the pending documents without writing them. Called in forked processes, which inherit the pending
+        documents of their parent but not its timer threads.
+        """
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._deadlines = {}
+        self._timers = {}
+
+    def add(self, schema_name: str, documents: list, window: float):
+        """
+        Queue the partial `documents` to be written to the collection within `window` seconds
+        """
+        deadline = time.monotonic() + window
+
+        with self._lock:
+            pending = self._pending.setdefault(schema_name, {})
+            for document in documents:
+                pending.setdefault(document["id"], {}).update(document)
+
+            current_deadline = self._deadlines.get(schema_name)
+            if current_deadline is not None and current_deadline <= deadline:
+                return
+
+            if timer := self._timers.get(schema_name):
+                timer.cancel()
+
+            timer = threading.Timer(window, self.flush, args=(schema_name,))
+            timer.daemon = True
+            self._deadlines[schema_name] = deadline
+            self._timers[schema_name] = timer
+            timer.start()
+
+    def pop(self, schema_name: str, document_ids) -> dict:
+        """
+        Remove and return the pending documents with the given ids, these are about to be written
+        """
+        with self._lock:
+            pending = self._pending.get(schema_name)
+            if not pending:
+                return {}
+
+            return {
+                document_id: pending.pop(document_id)
+                for document_id in document_ids
+                if document_id in pending
+            }
+
+    def flush(self, schema_name: str = None):
+        """
+        Write the pending documents of the collection, or of every collection if none is provided
+        """
+        schema_names = [schema_name] if schema_name else list(self._pending)
+
+        for name in schema_names:
+            with self._lock:
+                documents = list(self._pending.pop(name, {}).values())
+                self._deadlines.pop(name, None)
+                if timer := self._timers.pop(name, None):
+                    timer.cancel()
+
+            if not documents:
+                continue
+
+            try:
+                responses = client.collections[name].documents.import_(
+                    documents, {"action": "emplace"}
+                )
+            except TypesenseClientError as error:
+                logger.error(
+                    f"Could not write {len(documents)} debounced documents to {name}\nError: {error}"
+                )
+            else:
+                failure_responses = [response for response in responses or [] if not response["success"]]
+                if failure_responses:
+                    logger.error(
+                        f"Could not write {len(failure_responses)} debounced documents to {name}: {failure_responses}"
+                    )
+                else:
+                    logger.debug(f"Wrote {len(documents)} debounced documents to {name}")
+            finally:
+                search_cache.invalidate(name)
+
+
+debouncer = Debouncer()
+atexit.register(debouncer.flush)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=debouncer.reset)
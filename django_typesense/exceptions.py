@@ -4,3 +4,11 @@ class BatchUpdateError(Exception):
 
 class UnorderedQuerySetError(Exception):
     pass
+
+
+class UnsupportedFilterError(Exception):
+    pass
+
+
+class TooManyResultsError(Exception):
+    pass
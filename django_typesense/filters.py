@@ -0,0 +1,141 @@
+from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.core.exceptions import FieldError, ImproperlyConfigured
+from django.utils.translation import gettext_lazy as _
+
+from django_typesense.exceptions import UnsupportedFilterError
+from django_typesense.query import FilterCompiler
+
+
+class TypesenseFacetListFilter(admin.SimpleListFilter):
+    """
+    A list filter whose choices are the facet values of a collection field, with their counts. The facet counts are
+    requested by the changelist with the results of the page so that rendering the filter doesn't query the database.
+    The field must be defined with `facet=True` e.g.
+
+        list_filter = [TypesenseFacetListFilter.for_field("genre_name", title="genre")]
+
+    The counts of a filter in use ignore its own value, so that its other choices remain available.
+    """
+
+    field_name = None
+    max_facet_values = 20
+
+    def __init__(self, request, params, model, model_admin):
+        if self.field_name is None:
+            raise ImproperlyConfigured(
+                f"The list filter '{self.__class__.__name__}' does not specify a 'field_name'."
+            )
+
+        self.collection_class = model.get_collection_class()
+        try:
+            self.field = self.collection_class.get_field(self.field_name)
+        except KeyError:
+            raise ImproperlyConfigured(
+                f"{self.collection_class.__name__} has no field named `{self.field_name}`"
+            ) from None
+
+        if not self.field.facet:
+            raise ImproperlyConfigured(
+                f"`{self.field_name}` must be a facet field of {self.collection_class.__name__} to filter by it"
+            )
+
+        if self.parameter_name is None:
+            self.parameter_name = self.field_name
+        if self.title is None:
+            self.title = self.field_name.replace("_", " ")
+
+        self.facet_counts = []
+        super().__init__(request, params, model, model_admin)
+
+    @classmethod
+    def for_field(cls, field_name: str, title: str = None, max_facet_values: int = None) -> type:
+        """
+        Returns:
+            A TypesenseFacetListFilter subclass for the collection field `field_name`
+        """
+        attrs = {"field_name": field_name, "title": title}
+        if max_facet_values is not None:
+            attrs["max_facet_values"] = max_facet_values
+        return type(f"{field_name.title().replace('_', '')}FacetListFilter", (cls,), attrs)
+
+    def lookups(self, request, model_admin):
+        # the choices are only known once the changelist has searched, see `set_facet_counts`
+        return []
+
+    def has_output(self):
+        return True
+
+    def set_facet_counts(self, facet_counts: list):
+        """
+        Set the choices from the `counts` of the facet of the field in a typesense search response
+        """
+        self.facet_counts = [(count["value"], count["count"]) for count in facet_counts]
+        self.lookup_choices = [(value, self.get_display(value)) for value, _ in self.facet_counts]
+
+    def get_display(self, value: str):
+        """
+        Returns:
+            The text shown for the facet value `value`
+        """
+        value = self.collection_class._parse_facet_value(self.field, value)
+        if isinstance(value, bool):
+            return _("Yes") if value else _("No")
+        return str(value)
+
+    def get_value(self):
+        """
+        Returns:
+            The selected value parsed for the field
+
+        Raises:
+            IncorrectLookupParameters: if the value doesn't suit the field, the admin then redirects with `?e=1`
+        """
+        try:
+            return self.collection_class._parse_facet_value(self.field, self.value())
+        except (TypeError, ValueError) as e:
+            raise IncorrectLookupParameters(e) from e
+
+    @property
+    def filter_by(self) -> dict:
+        # This is used by typesense
+        if self.value() is None:
+            return {}
+
+        try:
+            value = FilterCompiler(self.collection_class).format_value(self.field, self.get_value())
+        except UnsupportedFilterError as e:
+            raise IncorrectLookupParameters(e) from e
+        return {self.field_name: f"={value}"}
+
+    def queryset(self, request, queryset):
+        # This is used when the rows are read from the database e.g. by admin actions
+        if self.value() is None:
+            return queryset
+
+        value = self.get_value()
+        lookup = self.field._value.replace(".", "__")
+        try:
+            return queryset.filter(**{lookup: value})
+        except (FieldError, ValueError) as e:
+            return queryset.filter(**self.collection_class.get_django_lookup(self.field_name, value, e))
+
+    def choices(self, changelist):
+        yield {
+            "selected": self.value() is None,
+            "query_string": changelist.get_query_string(remove=[self.parameter_name]),
+            "display": _("All"),
+        }
+
+        counts = dict(self.facet_counts)
+        lookup_choices = list(self.lookup_choices)
+        # the selected value is kept when it has no hits anymore
+        if self.value() is not None and self.value() not in counts:
+            lookup_choices.append((self.value(), self.get_display(self.value())))
+
+        for lookup, title in lookup_choices:
+            yield {
+                "selected": self.value() == str(lookup),
+                "query_string": changelist.get_query_string({self.parameter_name: lookup}),
+                "display": f"{title} ({counts.get(lookup, 0)})",
+            }
@@ -1,7 +1,8 @@
 import sys
 
 from django.core.management import BaseCommand
-from django.apps import apps
+
+from django_typesense.registry import registry
 
 
 class Command(BaseCommand):
@@ -16,11 +17,7 @@ class Command(BaseCommand):
         )
 
     def handle(self, *collection_names, **options):
-        collections = {}
-        for model_data in apps.all_models.values():
-            for model in model_data.values():
-                if hasattr(model, 'collection_class'):
-                    collections[model.collection_class.schema_name] = model.collection_class
+        collections = registry.collections
 
         collections_for_action = []
         # Make sure the collection name(s) they asked for exists
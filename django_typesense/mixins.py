@@ -1,35 +1,234 @@
-from django.db import models
+import copy
+import logging
+from contextvars import ContextVar
+from functools import lru_cache, partial
+from types import SimpleNamespace
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import models, transaction
+from typesense.exceptions import TypesenseClientError
+
+from django_typesense.query import compile_queryset_filter_by
+from django_typesense.utils import iter_pk_chunks, map_chunks
+
+logger = logging.getLogger(__name__)
+
+# The primary keys of the rows, per model, whose documents were deleted by `TypesenseQuerySet.delete`
+bulk_deleted_pks = ContextVar("bulk_deleted_pks", default={})
 
 
 class TypesenseQuerySet(models.QuerySet):
+    # The number of rows updated or deleted in Typesense per request
+    typesense_batch_size = 1024
+    # The number of threads deleting from Typesense
+    typesense_num_threads = 1
+
     def delete(self):
         assert issubclass(self.model, TypesenseModelMixin), (
             f"Model `{self.model}` must inherit `TypesenseMixin` to use the TypesenseQueryset Manager"
         )
         collection = self.model.get_collection(self, many=True)
-        collection.delete()
-        return super().delete()
+        # Filters typesense can evaluate spare streaming the ids out of the database
+        filter_by = compile_queryset_filter_by(self, collection.__class__)
+        # Read before the documents are deleted, django reads the rows again to send the signals
+        pks = set(self.values_list("pk", flat=True))
+        collection.delete(
+            self.typesense_batch_size, self.typesense_num_threads, filter_by=filter_by
+        )
+
+        # The pre_delete receiver must not delete these documents one by one, the rows deleted by cascade are
+        # still handled by it
+        deleted_pks = bulk_deleted_pks.get()
+        token = bulk_deleted_pks.set({**deleted_pks, self.model: deleted_pks.get(self.model, set()) | pks})
+        try:
+            return super().delete()
+        finally:
+            bulk_deleted_pks.reset(token)
 
     def update(self, **kwargs):
         assert issubclass(self.model, TypesenseModelMixin), (
             f"Model `{self.model}` must inherit `TypesenseMixin` to use the TypesenseQueryset Manager"
         )
-        obj_ids = list(self.values_list('id', flat=True))
-        update_result = super().update(**kwargs)
-        queryset = self.model.objects.filter(id__in=obj_ids)
-        collection = self.model.get_collection(queryset, many=True, update_fields=kwargs.keys())
-        collection.update()
+        if kwargs:
+            update_fields = self._get_typesense_update_fields(kwargs)
+            if not update_fields:
+                # None of the indexed fields change
+                return super().update(**kwargs)
+
+            literal_values = self._get_typesense_literal_values(kwargs, update_fields)
+        else:
+            # Refresh the full documents
+            update_fields, literal_values = None, None
+
+        update_result = 0
+        with transaction.atomic(using=self.db, savepoint=False):
+            for pks in iter_pk_chunks(self, self.typesense_batch_size):
+                if kwargs:
+                    update_result += self.model._base_manager.using(self.db).filter(pk__in=pks).update(**kwargs)
+
+                # Typesense is written once the rows are committed so that a failed request can't leave the
+                # documents of the previous chunks ahead of a rolled back database, nor hold the row locks
+                transaction.on_commit(
+                    partial(self._update_typesense_documents, pks, update_fields, literal_values),
+                    using=self.db,
+                )
+
+        return update_result
+
+    def _update_typesense_documents(self, pks: list, update_fields: set = None, literal_values: dict = None):
+        """
+        Write the updated rows with primary keys `pks` to Typesense
+        """
+        collection_class = self.model.get_collection_class()
+        if literal_values is not None:
+            # The new values are known, no need to read the rows back
+            data = [{"id": str(pk), **literal_values} for pk in pks]
+            collection = collection_class(data=data)
+        else:
+            queryset = self.model._base_manager.using(self.db).filter(pk__in=pks)
+            collection = collection_class(queryset, many=True, update_fields=update_fields)
+
+        try:
+            collection.update()
+        except TypesenseClientError as error:
+            logger.error(f"Could not update {len(pks)} {self.model.__name__} records\nError: {error}")
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+
+        # conflicting rows may already be indexed
+        conflicts = kwargs.get("ignore_conflicts") or kwargs.get("update_conflicts")
+        self._index_objects(objs, "upsert" if conflicts else "create")
+        return objs
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = tuple(objs)
+        # Django runs an update per batch, these must not be synced again
+        queryset = models.QuerySet(self.model, query=self.query.chain(), using=self._db)
+        update_result = queryset.bulk_update(objs, fields, *args, **kwargs)
+
+        update_fields = self._get_typesense_update_fields(dict.fromkeys(fields))
+        if update_fields:
+            self._index_objects(objs, "emplace", update_fields)
+
         return update_result
 
+    def _index_objects(self, objs, action_mode: str, update_fields: set = None):
+        """
+        Index the objects once the transaction is committed using one import request per batch
+        """
+        # Objects are only assigned primary keys on backends that return them
+        objs = [obj for obj in objs if obj.pk is not None]
+        if not objs:
+            return
+
+        collection_class = self.model.get_collection_class()
+
+        def index_batch(batch):
+            collection = collection_class(batch, many=True, update_fields=update_fields)
+            responses = collection.import_documents(action_mode) or []
+            failure_responses = [response for response in responses if not response["success"]]
+            if failure_responses:
+                logger.error(
+                    f"Could not index {len(failure_responses)} {self.model.__name__} records: {failure_responses}"
+                )
+
+        transaction.on_commit(
+            lambda: map_chunks(index_batch, objs, self.typesense_batch_size),
+            using=self.db,
+        )
+
+    def typesense(self, **search_parameters):
+        """
+        Search the model's collection. The rows of the hits are loaded from this queryset in the typesense
+        rank order, filtering should be done with `filter_by`.
+
+        Returns:
+            A lazy and sliceable TypesenseSearchQuerySet
+        """
+        from django_typesense.search import TypesenseSearchQuerySet
+
+        return TypesenseSearchQuerySet(self.model, queryset=self, **search_parameters)
+
+    def _get_typesense_update_fields(self, values: dict) -> set:
+        """
+        Returns:
+            The names of the collection fields affected by updating the model fields in `values`
+        """
+        sources = self.model.get_typesense_field_sources()
+        attnames = set()
+        for field_name in values:
+            try:
+                attnames.add(self.model._meta.get_field(field_name).attname)
+            except FieldDoesNotExist:
+                attnames.add(field_name)
+
+        update_fields = {
+            field_name
+            for field_name, attname in sources.items()
+            if field_name in values or (attname is not None and attname in attnames)
+        }
+        if not update_fields:
+            return update_fields
 
-class TypesenseManager(models.Manager):
-    def get_queryset(self):
-        return TypesenseQuerySet(self.model, using=self._db)
+        # Fields computed from properties or methods may depend on any of the updated values
+        return update_fields | {field_name for field_name, attname in sources.items() if attname is None}
+
+    def _get_typesense_literal_values(self, values: dict, update_fields: set):
+        """
+        Returns:
+            The document values of `update_fields` if they can be derived from literal update values
+            without reading the rows, otherwise None
+        """
+        fields = self.model.get_collection_class().get_fields()
+        sources = {}
+
+        for field_name, value in values.items():
+            if hasattr(value, "resolve_expression"):
+                return None
+
+            try:
+                model_field = self.model._meta.get_field(field_name)
+            except FieldDoesNotExist:
+                return None
+
+            try:
+                # The documents are built from the values the rows will hold e.g. a date rather than its string
+                if model_field.is_relation:
+                    value = model_field.target_field.to_python(getattr(value, "pk", value))
+                else:
+                    value = model_field.to_python(value)
+            except ValidationError:
+                return None
+
+            if model_field.is_relation:
+                sources[model_field.attname] = value
+            else:
+                sources[model_field.name] = value
+                sources[model_field.attname] = value
+
+        source_obj = SimpleNamespace(**sources)
+        literal_values = {}
+        for field_name in update_fields:
+            field = fields[field_name]
+            # Only values read straight off the updated fields can be derived
+            if field._value not in sources:
+                return None
+            literal_values[field_name] = field.value(source_obj)
+
+        return literal_values
+
+
+class TypesenseManager(models.Manager.from_queryset(TypesenseQuerySet)):
+    pass
 
 
 class TypesenseModelMixin(models.Model):
     collection_class = None
-    objects = TypesenseQuerySet.as_manager()
+    # Opt-in: snapshot the indexed source values on load so that saves without `update_fields`
+    # only send the collection fields that changed.
+    typesense_track_changes = False
+    objects = TypesenseManager()
 
     class Meta:
         abstract = True
@@ -56,3 +255,109 @@ class TypesenseModelMixin(models.Model):
         collection_class = cls.get_collection_class()
         return collection_class(*args, **kwargs)
 
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if cls.typesense_track_changes:
+            instance.reset_typesense_snapshot()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        if self.typesense_track_changes:
+            self.reset_typesense_snapshot(fields)
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def get_typesense_field_sources(cls) -> dict:
+        """
+        Map each collection field name to the attname of the concrete model field it is read from.
+
+        Fields whose value comes from a property, a method or a many-to-many relation map to `None`
+        since the model values they depend on cannot be known.
+        """
+        sources = {}
+        for field_name, field in cls.get_collection_class().get_fields().items():
+            source = field._value.split(".", maxsplit=1)[0]
+            if source == "pk":
+                sources[field_name] = cls._meta.pk.attname
+                continue
+
+            try:
+                model_field = cls._meta.get_field(source)
+            except FieldDoesNotExist:
+                model_field = next(
+                    (f for f in cls._meta.concrete_fields if f.attname == source), None
+                )
+
+            if model_field is None or not model_field.concrete or model_field.many_to_many:
+                sources[field_name] = None
+            else:
+                sources[field_name] = model_field.attname
+
+        return sources
+
+    def _get_typesense_source_values(self, attnames=None) -> dict:
+        if attnames is None:
+            attnames = set(filter(None, self.get_typesense_field_sources().values()))
+
+        # Deferred fields are left out so that taking a snapshot never hits the database
+        return {
+            attname: self.__dict__[attname]
+            for attname in attnames
+            if attname in self.__dict__
+        }
+
+    def reset_typesense_snapshot(self, fields=None):
+        """
+        Snapshot the current indexed source values. If `fields` is provided, only those model fields
+        are refreshed, e.g. after `save(update_fields=...)`.
+        """
+        # Values are copied so that in place changes e.g. to a list or a JSON value are detected
+        if fields is None:
+            self._typesense_snapshot = copy.deepcopy(self._get_typesense_source_values())
+            return
+
+        attnames = set()
+        for field_name in fields:
+            try:
+                attnames.add(self._meta.get_field(field_name).attname)
+            except FieldDoesNotExist:
+                continue
+
+        snapshot = getattr(self, "_typesense_snapshot", None) or {}
+        snapshot.update(
+            copy.deepcopy(
+                self._get_typesense_source_values(
+                    attnames.intersection(self.get_typesense_field_sources().values())
+                )
+            )
+        )
+        self._typesense_snapshot = snapshot
+
+    def get_typesense_changed_fields(self):
+        """
+        Return the names of the collection fields whose source values changed since the snapshot was
+        taken or `None` when changes are not being tracked for this instance.
+
+        Fields computed from properties or methods are included whenever any tracked value changed.
+        """
+        snapshot = getattr(self, "_typesense_snapshot", None)
+        if snapshot is None:
+            return None
+
+        current_values = self._get_typesense_source_values()
+        changed_attnames = {
+            attname
+            for attname, value in current_values.items()
+            if attname not in snapshot or snapshot[attname] != value
+        }
+        if not changed_attnames:
+            return set()
+
+        return {
+            field_name
+            for field_name, attname in self.get_typesense_field_sources().items()
+            if attname is None or attname in changed_attnames
+        }
@@ -1,7 +1,12 @@
+import collections.abc
 import copy
+from math import ceil
 
-from django.core.paginator import Paginator
+from django.core.paginator import InvalidPage, PageNotAnInteger, Paginator
 from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+
+from django_typesense.utils import TYPESENSE_MAX_HITS_PER_PAGE, get_cursor_parameters
 
 
 class TypesenseSearchPaginator(Paginator):
@@ -57,3 +62,147 @@ class TypesenseSearchPaginator(Paginator):
     def count(self):
         """Return the total number of objects, across all pages."""
         return self.object_list["found"]
+
+
+class CursorPage(collections.abc.Sequence):
+    """
+    A page of a `TypesenseCursorPaginator`. Besides the cursors, it has the `number`, `start_index` and `end_index` of
+    Django's `Page`, computed from the position of the page, which costs a count of the hits for pages that aren't
+    the first one. Pages are linked with the cursors, there is no `next_page_number` or `previous_page_number`.
+    """
+
+    def __init__(self, object_list, paginator, next_cursor=None, previous_cursor=None, found=None, reverse=False):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        # the number of hits following the cursor, or preceding it when paginating backwards
+        self.found = found
+        self.reverse = reverse
+
+    def __repr__(self):
+        return f"<Page after {self.previous_cursor} before {self.next_cursor}>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @cached_property
+    def offset(self):
+        """Return the number of objects preceding the page."""
+        if self.reverse:
+            return self.found - len(self)
+        if not self.has_previous():
+            return 0
+        return self.paginator.count - self.found
+
+    @property
+    def number(self):
+        return self.offset // self.paginator.per_page + 1
+
+    def start_index(self):
+        """Return the 1-based index of the first object on this page, or 0 if the page is empty."""
+        if not self.object_list:
+            return 0
+        return self.offset + 1
+
+    def end_index(self):
+        """Return the 1-based index of the last object on this page."""
+        return self.offset + len(self)
+
+
+class TypesenseCursorPaginator:
+    """
+    Paginates a `TypesenseSearchQuerySet` with a cursor on the collection's `cursor_field` instead of page numbers,
+    so that deep pages are as fast as the first one. Pages are requested with the `next_cursor` or the
+    `previous_cursor` of the current page e.g.
+
+        paginator = TypesenseCursorPaginator(Song.objects.typesense(q="love"), 50)
+        page = paginator.get_page(after=request.GET.get("after"), before=request.GET.get("before"))
+
+    The paginator has the `count`, `num_pages` and `page_range` of Django's `Paginator` but pages are requested with
+    cursors rather than page numbers.
+    """
+
+    def __init__(self, object_list, per_page):
+        self.object_list = object_list
+        self.per_page = min(int(per_page), TYPESENSE_MAX_HITS_PER_PAGE)
+        self.collection_class = object_list.collection_class
+
+    @cached_property
+    def count(self):
+        """Return the total number of objects, across all pages."""
+        return self.object_list.count()
+
+    @cached_property
+    def num_pages(self):
+        """Return the total number of pages."""
+        return max(ceil(self.count / self.per_page), 1)
+
+    @property
+    def page_range(self):
+        """
+        Return a 1-based range of pages for iterating through within a template for loop. The pages are requested
+        with cursors, the range is only meant for display.
+        """
+        return range(1, self.num_pages + 1)
+
+    def validate_cursor(self, cursor):
+        if cursor is None:
+            return None
+
+        try:
+            return int(cursor)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(_("That cursor is not an integer"))
+
+    def get_page(self, after=None, before=None):
+        """
+        Return a valid page, the first one if the cursors are invalid
+        """
+        try:
+            return self.page(after, before)
+        except InvalidPage:
+            return self.page()
+
+    def page(self, after=None, before=None):
+        """
+        Return the page of the objects following `after`, or preceding `before`
+        """
+        after, before = self.validate_cursor(after), self.validate_cursor(before)
+        reverse = before is not None
+        cursor_field = self.collection_class.get_cursor_field()
+
+        parameters = get_cursor_parameters(
+            self.collection_class,
+            self.object_list.search_parameters,
+            before if reverse else after,
+            reverse=reverse,
+        )
+        results = self.object_list.search(**{**parameters, "page": 1, "per_page": self.per_page})
+        hits = results["hits"][::-1] if reverse else results["hits"]
+
+        # with a cursor, typesense only counts the hits following it
+        has_more = results["found"] > len(hits)
+        has_next = (not reverse and has_more) or (reverse and bool(hits))
+        has_previous = (reverse and has_more) or (not reverse and after is not None)
+
+        return CursorPage(
+            self.object_list._get_objects(hits),
+            self,
+            next_cursor=hits[-1]["document"][cursor_field] if has_next else None,
+            previous_cursor=hits[0]["document"][cursor_field] if has_previous and hits else None,
+            found=results["found"],
+            reverse=reverse,
+        )
@@ -0,0 +1,249 @@
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from django.core.exceptions import EmptyResultSet
+from django.db.models import Model, Q
+from django.db.models.expressions import Col
+from django.db.models.lookups import Lookup
+from django.db.models.sql.where import AND, OR, WhereNode
+
+from django_typesense.exceptions import UnsupportedFilterError
+from django_typesense.fields import TypesenseArrayField
+from django_typesense.utils import get_unix_timestamp
+
+COMPARISON_OPERATORS = {
+    "exact": "=",
+    "gt": ">",
+    "gte": ">=",
+    "lt": "<",
+    "lte": "<=",
+}
+NEGATED_OPERATORS = {
+    "=": "!=",
+    ">": "<=",
+    ">=": "<",
+    "<": ">=",
+    "<=": ">",
+}
+SUPPORTED_LOOKUPS = {*COMPARISON_OPERATORS, "in", "range"}
+NUMERIC_TYPES = {"int32", "int64", "float"}
+
+
+class FilterCompiler:
+    """
+    Compiles Django style lookups and `Q` objects into a typesense `filter_by` expression using the field types of
+    the collection. Negations are pushed down to the lookups since typesense can't negate groups.
+
+    Supported lookups are `exact`, `gt`, `gte`, `lt`, `lte`, `in` and `range`.
+    """
+
+    def __init__(self, collection_class):
+        self.collection_class = collection_class
+        self.fields = collection_class.get_fields()
+
+    def compile(self, *args, **kwargs) -> str:
+        """
+        Compile the lookups into a filter_by expression
+
+        Args:
+            *args: Q objects
+            **kwargs: lookups on the collection fields e.g. `number_of_views__gte=10`
+
+        Returns:
+            The filter_by expression, an empty string if there is nothing to filter by
+
+        Raises:
+            UnsupportedFilterError: if a field or lookup can't be expressed in typesense
+            EmptyResultSet: if the filter can't match any document e.g. `id__in=[]`
+        """
+        return self.compile_node(Q(*args, **kwargs))
+
+    def compile_node(self, node: Q, negated: bool = False) -> str:
+        negated = negated != node.negated
+        if node.connector not in (AND, OR):
+            raise UnsupportedFilterError(f"The {node.connector} connector is not supported")
+
+        # De Morgan's laws
+        connector = node.connector
+        if negated:
+            connector = OR if connector == AND else AND
+
+        expressions = []
+        for child in node.children:
+            try:
+                if isinstance(child, Q):
+                    expression = self.compile_node(child, negated)
+                else:
+                    expression = self.compile_lookup(*child, negated=negated)
+            except EmptyResultSet:
+                if connector == AND:
+                    raise
+                continue
+
+            if expression:
+                expressions.append(expression)
+            elif connector == OR:
+                # One of the alternatives matches everything
+                return ""
+
+        if not expressions and connector == OR and node.children:
+            raise EmptyResultSet
+
+        return self.combine(expressions, connector)
+
+    @staticmethod
+    def combine(expressions: list, connector: str = AND) -> str:
+        if len(expressions) == 1:
+            return expressions[0]
+
+        joined = (" && " if connector == AND else " || ").join(expressions)
+        return f"({joined})" if joined else ""
+
+    def compile_lookup(self, key: str, value, negated: bool = False) -> str:
+        field_name, _, lookup = key.rpartition("__")
+        if lookup not in SUPPORTED_LOOKUPS and lookup.isidentifier() and field_name:
+            raise UnsupportedFilterError(f"The `{lookup}` lookup is not supported")
+        if not field_name or lookup not in SUPPORTED_LOOKUPS:
+            field_name, lookup = key, "exact"
+
+        if field_name == "pk":
+            field_name = "id"
+
+        try:
+            field = self.fields[field_name]
+        except KeyError:
+            raise UnsupportedFilterError(
+                f"`{field_name}` is not a field of {self.collection_class.__name__}"
+            ) from None
+
+        if not field.index:
+            raise UnsupportedFilterError(f"`{field_name}` is not indexed and can't be filtered by")
+
+        if lookup == "in":
+            values = [self.format_value(field, _value) for _value in value]
+            if not values:
+                if negated:
+                    return ""
+                raise EmptyResultSet
+            operator = "!=" if negated else "="
+            return f"{field_name}:{operator}[{','.join(values)}]"
+
+        if lookup == "range":
+            self.check_numeric(field, lookup)
+            low, high = (self.format_value(field, _value) for _value in value)
+            if negated:
+                return f"({field_name}:<{low} || {field_name}:>{high})"
+            return f"{field_name}:[{low}..{high}]"
+
+        operator = COMPARISON_OPERATORS[lookup]
+        if operator != "=":
+            self.check_numeric(field, lookup)
+        if negated:
+            operator = NEGATED_OPERATORS[operator]
+
+        return f"{field_name}:{operator}{self.format_value(field, value)}"
+
+    def check_numeric(self, field, lookup):
+        if self.get_base_field(field).field_type not in NUMERIC_TYPES:
+            raise UnsupportedFilterError(
+                f"The `{lookup}` lookup is only supported on numeric fields, `{field.name}` is a {field.field_type}"
+            )
+
+    @staticmethod
+    def get_base_field(field):
+        return field.base_field if isinstance(field, TypesenseArrayField) else field
+
+    def format_value(self, field, value) -> str:
+        if isinstance(value, Model):
+            value = value.pk
+
+        if value is None:
+            raise UnsupportedFilterError(f"Filtering `{field.name}` by null is not supported")
+
+        if field.name == "id":
+            return str(value)
+
+        field_type = self.get_base_field(field).field_type
+        if isinstance(value, (date, datetime, time)):
+            return str(get_unix_timestamp(value))
+
+        if field_type == "bool":
+            if isinstance(value, str):
+                value = value.lower() in ("1", "true", "yes", "y")
+            return "true" if value else "false"
+
+        if field_type in NUMERIC_TYPES:
+            if not isinstance(value, (int, float, Decimal)):
+                try:
+                    value = float(value) if field_type == "float" else int(value)
+                except (TypeError, ValueError):
+                    raise UnsupportedFilterError(
+                        f"`{field.name}` expects a number but got {value!r}"
+                    ) from None
+            return str(value)
+
+        value = str(value)
+        if "`" in value:
+            raise UnsupportedFilterError("Backticks can't be escaped in typesense filters")
+        return f"`{value}`"
+
+
+def compile_filter_by(collection_class, *args, **kwargs) -> str:
+    """
+    Compile Django style lookups and `Q` objects on the collection fields into a typesense `filter_by` expression.
+    See `FilterCompiler`.
+    """
+    return FilterCompiler(collection_class).compile(*args, **kwargs)
+
+
+def compile_queryset_filter_by(queryset, collection_class=None):
+    """
+    Translate the filters of a queryset into a `filter_by` expression. Only lookups on fields of the model that
+    are indexed as is can be translated i.e. no joins, expressions or subqueries. Fields in the `debounce_fields` of
+    the collection can't be translated either since their indexed values may lag the database.
+
+    Returns:
+        The filter_by expression or None if the filters can't be translated
+    """
+    query = queryset.query
+    if query.is_sliced or query.combinator or query.distinct:
+        return None
+
+    # Trimmed joins stay in the alias map with no references
+    if sum(1 for count in query.alias_refcount.values() if count) > 1:
+        return None
+
+    collection_class = collection_class or queryset.model.get_collection_class()
+    fields = collection_class.get_fields()
+    compiler = FilterCompiler(collection_class)
+
+    def get_field_name(target):
+        sources = {target.attname, "pk"} if target.primary_key else {target.attname}
+        if not target.is_relation:
+            sources.add(target.name)
+
+        for field_name, field in fields.items():
+            if field._value in sources:
+                return field_name
+
+    def to_q(node):
+        if not isinstance(node, WhereNode):
+            if not isinstance(node, Lookup) or not isinstance(node.lhs, Col):
+                raise UnsupportedFilterError(node)
+            if node.lhs.alias != query.base_table:
+                raise UnsupportedFilterError(node)
+            if hasattr(node.rhs, "resolve_expression"):
+                raise UnsupportedFilterError(node)
+
+            field_name = get_field_name(node.lhs.target)
+            if field_name is None or field_name in collection_class.debounce_fields:
+                raise UnsupportedFilterError(node)
+            return Q(**{f"{field_name}__{node.lookup_name}": node.rhs})
+
+        q = Q(*map(to_q, node.children), _connector=node.connector)
+        return ~q if node.negated else q
+
+    try:
+        return compiler.compile_node(to_q(query.where))
+    except (UnsupportedFilterError, EmptyResultSet):
+        return None
@@ -0,0 +1,86 @@
+from typing import Dict
+
+
+class TypesenseRegistry:
+    """
+    Keeps track of the indexed models and their collections. It is populated once the apps are ready.
+    """
+
+    def __init__(self):
+        self._collection_classes = {}
+
+    def __contains__(self, model) -> bool:
+        return model in self._collection_classes
+
+    def register(self, model):
+        """
+        Register an indexed model i.e. a `TypesenseModelMixin` subclass
+        """
+        self._collection_classes[model] = model.get_collection_class()
+
+    def populate(self, models):
+        """
+        Register all the indexed models among `models`
+        """
+        from django_typesense.mixins import TypesenseModelMixin
+
+        for model in models:
+            if issubclass(model, TypesenseModelMixin):
+                self.register(model)
+
+    @property
+    def models(self) -> list:
+        """
+        Returns:
+            The indexed models
+        """
+        return list(self._collection_classes)
+
+    @property
+    def collections(self) -> Dict[str, type]:
+        """
+        Returns:
+            A dictionary of the schema names to the collection classes
+        """
+        return {
+            collection_class.schema_name: collection_class
+            for collection_class in self._collection_classes.values()
+        }
+
+    def get_collection_class(self, model):
+        """
+        Returns:
+            The collection class of the model or None if the model isn't indexed
+        """
+        return self._collection_classes.get(model)
+
+    def get_model(self, collection_class):
+        """
+        Returns:
+            The model indexed in the collection or None if no registered model uses it
+        """
+        for model, _collection_class in self._collection_classes.items():
+            if _collection_class is collection_class:
+                return model
+        return None
+
+    def get_through_models(self) -> set:
+        """
+        Returns:
+            The intermediate models of many-to-many relations involving an indexed model
+        """
+        through_models = set()
+        for model in self._collection_classes:
+            for field in model._meta.get_fields(include_hidden=True):
+                if not field.many_to_many:
+                    continue
+
+                if field.concrete:
+                    through_models.add(field.remote_field.through)
+                else:
+                    through_models.add(field.through)
+
+        return through_models
+
+
+registry = TypesenseRegistry()
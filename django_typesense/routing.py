@@ -0,0 +1,320 @@
+import concurrent.futures
+import logging
+import os
+import threading
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from typesense import exceptions
+
+logger = logging.getLogger(__name__)
+
+@lru_cache(maxsize=None)
+def get_node_errors() -> tuple:
+    """
+    Returns:
+        The errors that say something about the health of the node, see typesense's ApiCall. The transport errors
+        are those of httpx or requests depending on the installed typesense client
+    """
+    errors = (
+        exceptions.HTTPStatus0Error,
+        exceptions.ServerError,
+        exceptions.ServiceUnavailable,
+        exceptions.Timeout,
+    )
+    try:
+        import httpx
+    except ImportError:
+        pass
+    else:
+        errors += (httpx.TransportError,)
+
+    try:
+        import requests
+    except ImportError:
+        pass
+    else:
+        errors += (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+    return errors
+
+
+def is_node_error(error: Exception) -> bool:
+    if not isinstance(error, get_node_errors()):
+        return False
+
+    try:
+        import httpx
+    except ImportError:
+        return True
+
+    # raised when the client's own pool is exhausted, the node is fine
+    return not isinstance(error, httpx.PoolTimeout)
+
+
+class NodeStats:
+    def __init__(self, node: dict):
+        self.node = node
+        self.ewma = None
+        self.requests = 0
+        self.errors = 0
+        self.hedges_won = 0
+        self.unhealthy_until = 0
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.unhealthy_until
+
+    def as_dict(self) -> dict:
+        return {
+            "ewma_ms": None if self.ewma is None else round(self.ewma * 1000, 3),
+            "requests": self.requests,
+            "errors": self.errors,
+            "hedges_won": self.hedges_won,
+            "healthy": self.healthy,
+        }
+
+
+class SearchRouter:
+    """
+    Routes read requests to the node with the lowest moving average latency among the healthy nodes of
+    `TYPESENSE["nodes"]`. Configured with the `TYPESENSE_ROUTING` setting e.g.
+
+        TYPESENSE_ROUTING = {"ewma_alpha": 0.3, "hedge_after_seconds": 0.05, "max_workers": 16}
+
+    A node that fails is skipped for `TYPESENSE["healthcheck_interval_seconds"]` (60 by default) and the request is
+    retried on the next node. With `hedge_after_seconds`, requests are made from a pool of `max_workers` threads and
+    a request that hasn't completed after that delay is also sent to the next node. The first successful response
+    is used and the other one is ignored. Requests never wait for a thread of the pool: when every thread is busy
+    the request is made on the calling thread and isn't hedged.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    @property
+    def config(self) -> dict:
+        return getattr(settings, "TYPESENSE_ROUTING", None) or {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.config) and len(settings.TYPESENSE.get("nodes", [])) > 1
+
+    @property
+    def stats(self) -> dict:
+        """
+        Returns:
+            The number of hedged requests and the latency, requests, errors and won hedges of each node
+        """
+        with self._lock:
+            return {
+                "hedged": self.hedged,
+                "nodes": {name: node.as_dict() for name, node in self.nodes.items()},
+            }
+
+    def reset(self):
+        """
+        Drop the clients, the pool and the stats. Called in forked processes, the lock is replaced since it may have
+        been held by another thread of the parent.
+        """
+        self._lock = threading.Lock()
+        self._clients = None
+        self._executor = None
+        self._busy_workers = 0
+        self.nodes = {}
+        self.hedged = 0
+
+    def get_clients(self) -> dict:
+        """
+        Returns:
+            A typesense client per node, they share the connection pool of the process
+        """
+        if self._clients is not None:
+            return self._clients
+
+        import typesense
+
+        from django_typesense.typesense_client import get_http_client
+
+        http_client = get_http_client()
+        clients = {}
+        for node in settings.TYPESENSE["nodes"]:
+            if isinstance(node, str):
+                name = node
+            else:
+                name = f"{node['protocol']}://{node['host']}:{node['port']}{node.get('path', '')}"
+
+            config = {**settings.TYPESENSE, "nodes": [node], "num_retries": 0}
+            config.pop("nearest_node", None)
+            if http_client is None:
+                clients[name] = typesense.Client(config)
+            else:
+                clients[name] = typesense.Client(config, http_client=http_client)
+
+        with self._lock:
+            if self._clients is None:
+                self._clients = clients
+                self.nodes = {name: NodeStats(node) for name, node in zip(clients, settings.TYPESENSE["nodes"])}
+
+        return self._clients
+
+    def get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=self.config.get("max_workers", 16),
+                        thread_name_prefix="typesense-hedge",
+                    )
+        return self._executor
+
+    def get_ranked_nodes(self) -> list:
+        """
+        Returns:
+            The node names, healthy first, then by increasing latency. Nodes without any request yet come first
+            so that their latency is measured
+        """
+        self.get_clients()
+        with self._lock:
+            nodes = list(self.nodes.items())
+
+        nodes.sort(key=lambda item: (not item[1].healthy, item[1].ewma or 0))
+        return [name for name, _ in nodes]
+
+    def record(self, name: str, started: float, error: Exception = None):
+        elapsed = time.monotonic() - started
+        alpha = self.config.get("ewma_alpha", 0.3)
+
+        with self._lock:
+            node = self.nodes[name]
+            node.requests += 1
+            if error is not None:
+                node.errors += 1
+                interval = settings.TYPESENSE.get("healthcheck_interval_seconds", 60)
+                node.unhealthy_until = time.monotonic() + interval
+                return
+
+            node.ewma = elapsed if node.ewma is None else alpha * elapsed + (1 - alpha) * node.ewma
+
+    def _call_node(self, name: str, func):
+        started = time.monotonic()
+        try:
+            result = func(self._clients[name])
+        except Exception as error:
+            self.record(name, started, error if is_node_error(error) else None)
+            raise
+
+        self.record(name, started)
+        return result
+
+    def call(self, func):
+        """
+        Call `func` with the client of the best node, falling back to the next nodes if it fails
+
+        Args:
+            func: makes the request with the typesense client it is given
+        """
+        self.get_clients()
+        nodes = self.get_ranked_nodes()
+        hedge_after = self.config.get("hedge_after_seconds")
+
+        if hedge_after is None:
+            return self._failover(nodes, func)
+
+        return self._hedged_call(nodes, func, hedge_after)
+
+    def _failover(self, nodes: list, func, last_error: Exception = None):
+        for index, name in enumerate(nodes):
+            try:
+                return self._call_node(name, func)
+            except Exception as error:
+                if not is_node_error(error) or index == len(nodes) - 1:
+                    raise
+                last_error = error
+                logger.debug(f"Typesense node {name} failed, retrying on {nodes[index + 1]}: {error}")
+
+        if last_error is not None:
+            raise last_error
+
+    def _run_node(self, name: str, func):
+        try:
+            return self._call_node(name, func)
+        finally:
+            with self._lock:
+                self._busy_workers -= 1
+
+    def _submit(self, name: str, func):
+        """
+        Returns:
+            The future of the request to the node, or None if every thread of the pool is busy
+        """
+        executor = self.get_executor()
+        with self._lock:
+            # a request that waits for a worker would only add to its latency
+            if self._busy_workers >= self.config.get("max_workers", 16):
+                return None
+            self._busy_workers += 1
+
+        return executor.submit(self._run_node, name, func)
+
+    def _hedged_call(self, nodes: list, func, hedge_after: float):
+        if len(nodes) == 1:
+            return self._failover(nodes, func)
+
+        primary = self._submit(nodes[0], func)
+        if primary is None:
+            return self._failover(nodes, func)
+
+        futures = {primary: nodes[0]}
+        done, _ = concurrent.futures.wait(futures, timeout=hedge_after)
+        if not done:
+            hedge = self._submit(nodes[1], func)
+            if hedge is not None:
+                futures[hedge] = nodes[1]
+                with self._lock:
+                    self.hedged += 1
+                logger.debug(f"Hedging typesense request to {nodes[1]} after {hedge_after}s")
+
+        last_error = None
+        pending = set(futures)
+        while pending:
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as error:
+                    if not is_node_error(error):
+                        raise
+                    last_error = error
+                    continue
+
+                # the other request still completes in the pool and records the latency of its node
+                if future is not primary:
+                    with self._lock:
+                        self.nodes[futures[future]].hedges_won += 1
+                    logger.debug(f"Hedged typesense request answered by {futures[future]}")
+                return result
+
+        remaining = [name for name in nodes if name not in futures.values()]
+        if not remaining:
+            raise last_error
+        return self._failover(remaining, func, last_error)
+
+
+router = SearchRouter()
+
+
+def route(func):
+    """
+    Call `func` with the client of the best node when routing is enabled, otherwise with the client of the process
+    """
+    if router.enabled:
+        return router.call(func)
+
+    from django_typesense.typesense_client import client
+
+    return func(client)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=router.reset)
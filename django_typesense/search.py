@@ -0,0 +1,229 @@
+from itertools import islice
+
+from django.core.exceptions import EmptyResultSet
+
+from django_typesense.query import compile_filter_by
+from django_typesense.utils import (
+    TYPESENSE_MAX_HITS_PER_PAGE,
+    iter_search_hits,
+    typesense_search,
+)
+
+
+class TypesenseSearchQuerySet:
+    """
+    A lazy search on a model's collection. Slicing maps to the typesense `page` and `per_page` parameters and
+    the database rows of the hits are loaded in a single query and returned in the typesense rank order.
+    """
+
+    def __init__(self, model, queryset=None, **search_parameters):
+        self.model = model
+        self.collection_class = model.get_collection_class()
+        # Only used to load the rows of the hits
+        self.queryset = model._default_manager.all() if queryset is None else queryset
+        self.search_parameters = {
+            "q": "*",
+            "query_by": self.collection_class.query_by_fields,
+            **search_parameters,
+        }
+        self.low_mark = 0
+        self.high_mark = None
+        self._as_results = False
+        self._found = None
+        self._result_cache = None
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {self.search_parameters}>"
+
+    def __len__(self):
+        return len(self._fetch_all())
+
+    def __iter__(self):
+        return iter(self._fetch_all())
+
+    def __bool__(self):
+        return bool(self._fetch_all())
+
+    def __getitem__(self, k):
+        if not isinstance(k, (int, slice)):
+            raise TypeError(
+                f"{self.__class__.__name__} indices must be integers or slices, not {type(k).__name__}."
+            )
+
+        if (isinstance(k, int) and k < 0) or (
+            isinstance(k, slice) and ((k.start or 0) < 0 or (k.stop or 0) < 0)
+        ):
+            raise ValueError("Negative indexing is not supported.")
+
+        if self._result_cache is not None:
+            return self._result_cache[k]
+
+        if isinstance(k, slice):
+            if k.step is not None:
+                raise ValueError("Slicing with a step is not supported.")
+
+            clone = self._clone()
+            clone._set_limits(k.start, k.stop)
+            return clone
+
+        clone = self._clone()
+        clone._set_limits(k, k + 1)
+        return clone._fetch_all()[0]
+
+    def _clone(self, **search_parameters):
+        clone = self.__class__(
+            self.model,
+            queryset=self.queryset,
+            **{**self.search_parameters, **search_parameters},
+        )
+        clone.low_mark, clone.high_mark = self.low_mark, self.high_mark
+        clone._as_results = self._as_results
+        return clone
+
+    def _set_limits(self, low=None, high=None):
+        if high is not None:
+            if self.high_mark is not None:
+                self.high_mark = min(self.high_mark, self.low_mark + high)
+            else:
+                self.high_mark = self.low_mark + high
+        if low is not None:
+            if self.high_mark is not None:
+                self.low_mark = min(self.high_mark, self.low_mark + low)
+            else:
+                self.low_mark = self.low_mark + low
+
+    def _chain_queryset(self, method_name, *args):
+        clone = self._clone()
+        clone.queryset = getattr(self.queryset, method_name)(*args)
+        return clone
+
+    def results(self):
+        """
+        Return read-only TypesenseResult objects hydrated from the typesense documents instead of loading the
+        rows from the database
+        """
+        clone = self._clone()
+        clone._as_results = True
+        return clone
+
+    def filter(self, *args, **kwargs):
+        """
+        Narrow the search with Django style lookups and `Q` objects on the collection fields, see
+        `django_typesense.query.FilterCompiler`. They are ANDed with the current `filter_by`.
+        """
+        try:
+            filter_by = compile_filter_by(self.collection_class, *args, **kwargs)
+        except EmptyResultSet:
+            return self.none()
+
+        if not filter_by:
+            return self._clone()
+
+        if current_filter_by := self.search_parameters.get("filter_by"):
+            filter_by = f"({current_filter_by}) && {filter_by}"
+        return self._clone(filter_by=filter_by)
+
+    def none(self):
+        clone = self._clone()
+        clone._set_limits(0, 0)
+        return clone
+
+    def only(self, *fields):
+        return self._chain_queryset("only", *fields)
+
+    def defer(self, *fields):
+        return self._chain_queryset("defer", *fields)
+
+    def select_related(self, *fields):
+        return self._chain_queryset("select_related", *fields)
+
+    def prefetch_related(self, *lookups):
+        return self._chain_queryset("prefetch_related", *lookups)
+
+    def search(self, **search_parameters) -> dict:
+        """
+        Perform the search on the collection with the given parameters added
+        """
+        return typesense_search(
+            self.collection_class.schema_name,
+            **{**self.search_parameters, **search_parameters},
+        )
+
+    def count(self) -> int:
+        """
+        The number of hits, as reported by typesense in `found`
+        """
+        if self._result_cache is not None:
+            return len(self._result_cache)
+
+        if self.high_mark is not None and self.high_mark <= self.low_mark:
+            return 0
+
+        if self._found is None:
+            self._found = self.search(per_page=0)["found"]
+
+        found = self._found if self.high_mark is None else min(self._found, self.high_mark)
+        return max(found - self.low_mark, 0)
+
+    def exists(self) -> bool:
+        return self.count() > 0
+
+    def get_hits(self) -> list:
+        """
+        Returns:
+            The typesense hits within the limits, fetching as few pages as possible
+        """
+        if self.high_mark is None:
+            per_page = TYPESENSE_MAX_HITS_PER_PAGE
+        else:
+            per_page = min(self.high_mark - self.low_mark, TYPESENSE_MAX_HITS_PER_PAGE)
+            if per_page <= 0:
+                return []
+
+        page, skip = divmod(self.low_mark, per_page)
+        page += 1
+        hits = []
+
+        while True:
+            results = self.search(page=page, per_page=per_page)
+            self._found = results["found"]
+            page_hits = results["hits"][skip:]
+            skip = 0
+            hits.extend(page_hits)
+
+            if self.high_mark is not None and self.low_mark + len(hits) >= self.high_mark:
+                return hits[: self.high_mark - self.low_mark]
+
+            if len(results["hits"]) < per_page or page * per_page >= self._found:
+                return hits
+
+            page += 1
+
+    def iterator(self, chunk_size: int = TYPESENSE_MAX_HITS_PER_PAGE):
+        """
+        Walk every hit of the search with a cursor on the collection's `cursor_field`, in the order of that field.
+        The rows of each chunk of hits are loaded in a single query and nothing is cached.
+        """
+        if self.low_mark or self.high_mark is not None:
+            raise TypeError("Cannot iterate a sliced search with a cursor.")
+
+        hits = iter_search_hits(self.collection_class, chunk_size, **self.search_parameters)
+        while chunk := list(islice(hits, chunk_size)):
+            yield from self._get_objects(chunk)
+
+    def _fetch_all(self) -> list:
+        if self._result_cache is None:
+            self._result_cache = self._get_objects(self.get_hits())
+        return self._result_cache
+
+    def _get_objects(self, hits) -> list:
+        if self._as_results:
+            return self.collection_class.get_results({"hits": hits})
+        return self._load_objects(hits)
+
+    def _load_objects(self, hits) -> list:
+        pk_field = self.model._meta.pk
+        pks = [pk_field.to_python(hit["document"]["id"]) for hit in hits]
+        objects = self.queryset.in_bulk(pks)
+        # Hits whose rows no longer exist are skipped
+        return [objects[pk] for pk in pks if pk in objects]
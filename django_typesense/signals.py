@@ -1,36 +1,77 @@
 from django.db import transaction
 from django.db.models.signals import m2m_changed, post_save, pre_delete
-from django.dispatch import receiver
 
-from django_typesense.mixins import TypesenseModelMixin
+from django_typesense.mixins import bulk_deleted_pks
+from django_typesense.registry import registry
 
 
-@receiver(post_save)
-def post_save_typesense_models(sender, instance, **kwargs):
-    if not issubclass(sender, TypesenseModelMixin):
-        return
+def connect_signals(typesense_registry):
+    """
+    Connect the receivers to the indexed models only so that other models don't pay for them
+    """
+    for model in typesense_registry.models:
+        post_save.connect(post_save_typesense_models, sender=model)
+        pre_delete.connect(pre_delete_typesense_models, sender=model)
+
+    for through_model in typesense_registry.get_through_models():
+        m2m_changed.connect(m2m_changed_typesense_models, sender=through_model)
 
-    transaction.on_commit(
-        sender.get_collection(instance, update_fields=kwargs.get('update_fields', [])).update
-    )
+
+def post_save_typesense_models(sender, instance, created=False, update_fields=None, **kwargs):
+    if created:
+        # New records have no document yet, write the full document in a single request
+        collection = sender.get_collection(instance)
+        transaction.on_commit(collection.upsert)
+    else:
+        changed_fields = None if update_fields else instance.get_typesense_changed_fields()
+        if changed_fields is None:
+            collection = sender.get_collection(instance, update_fields=update_fields or [])
+            transaction.on_commit(collection.update)
+        elif changed_fields:
+            collection = sender.get_collection(instance, update_fields=changed_fields)
+            transaction.on_commit(collection.update)
+
+    if sender.typesense_track_changes:
+        # Only the saved fields were persisted, any other changes are still pending
+        instance.reset_typesense_snapshot(None if created else update_fields)
 
 
-@receiver(pre_delete)
 def pre_delete_typesense_models(sender, instance, **kwargs):
-    if not issubclass(sender, TypesenseModelMixin):
+    if instance.pk in bulk_deleted_pks.get().get(sender, ()):
         return
 
     sender.get_collection(instance).delete()
 
 
-@receiver(m2m_changed)
-def m2m_changed_typesense_models(instance, model, action, **kwargs):
+def m2m_changed_typesense_models(sender, instance, model, action, reverse=False, pk_set=None, **kwargs):
+    if action == "pre_clear" and model in registry:
+        # the related rows are unknown once the relation is cleared
+        instance._typesense_cleared_pks = get_related_pks(sender, instance, model, reverse)
+
     if action in ["post_add", "post_remove", "post_clear"]:
-        if isinstance(instance, TypesenseModelMixin):
+        if instance.__class__ in registry:
             instance_class = instance.__class__
             instance_class.get_collection(instance).update()
 
-        if issubclass(model, TypesenseModelMixin):
-            pk_set = list(kwargs.get("pk_set"))
-            obj = model.objects.filter(pk__in=pk_set)
+        if action == "post_clear":
+            pk_set = instance.__dict__.pop("_typesense_cleared_pks", None)
+
+        if model in registry and pk_set:
+            obj = model.objects.filter(pk__in=list(pk_set))
             model.get_collection(obj=obj, many=True).update()
+
+
+def get_related_pks(through_model, instance, model, reverse: bool) -> set:
+    """
+    Returns:
+        The primary keys of the `model` rows related to `instance` through `through_model`
+    """
+    field_model = model if reverse else instance.__class__
+    field = next(
+        field for field in field_model._meta.many_to_many if field.remote_field.through is through_model
+    )
+    source, target = field.m2m_field_name(), field.m2m_reverse_field_name()
+    if reverse:
+        source, target = target, source
+
+    return set(through_model._default_manager.filter(**{source: instance.pk}).values_list(target, flat=True))
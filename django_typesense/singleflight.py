@@ -0,0 +1,93 @@
+import copy
+import threading
+
+from django.conf import settings
+
+
+class _Call:
+    def __init__(self, schema_names):
+        self.schema_names = set(schema_names)
+        self.done = threading.Event()
+        self.waiters = 0
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent searches of the process: the first caller makes the request and the callers
+    that arrive while it is in flight wait for its results. Each of them gets its own copy of the results.
+
+    Writes to a collection make the searches in flight on it unreachable, so callers arriving after a write never
+    share a request made before it. Enabled unless `TYPESENSE_SINGLEFLIGHT` is False.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.coalesced = 0
+
+    @property
+    def enabled(self) -> bool:
+        return getattr(settings, "TYPESENSE_SINGLEFLIGHT", True)
+
+    def do(self, key, schema_names, func):
+        """
+        Call `func` unless an identical call is in flight, in which case wait for its result
+
+        Args:
+            key: identifies identical calls
+            schema_names: the collections the call reads from
+            func: makes the call
+        """
+        if not self.enabled:
+            return func()
+
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call(schema_names)
+                leader = True
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            result = func()
+        except BaseException as error:
+            call.error = error
+            raise
+        else:
+            with self._lock:
+                self._remove(key, call)
+            # no waiters can join once the call is removed, the copy is never handed out
+            if call.waiters:
+                call.result = copy.deepcopy(result)
+            return result
+        finally:
+            with self._lock:
+                self._remove(key, call)
+            call.done.set()
+
+    def forget(self, schema_name: str):
+        """
+        Make the calls in flight on the collection unreachable, new callers make their own call
+        """
+        with self._lock:
+            for key, call in list(self._calls.items()):
+                if schema_name in call.schema_names:
+                    del self._calls[key]
+
+    def _remove(self, key, call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+
+singleflight = SingleFlight()
@@ -1,38 +1,58 @@
 (function($) {
     $(document).ready(function () {
-        let ajax_call = function (endpoint, request_parameters) {
-            $.getJSON(endpoint, request_parameters)
-                .done(response => {
-                    changelist_form.fadeTo('fast', 0.5).promise().then(() => {
-                        let newChangelistHTML = '<h2>Click Search to complete</h2>' + $(response['html']).find('#changelist-form').html()
-                        changelist_form.html(newChangelistHTML);
-                        changelist_form.fadeTo('fast', 1);
-                    })
+        const searchbar = $("#searchbar");
+        const result_list = $("#result_list tbody");
+        const delay_by_in_ms = 250;
+        // the live search endpoint returns only the rows of the results
+        const endpoint = window.location.origin + window.location.pathname + "typesense-search/";
+        let scheduled_function = false;
+        let controller = null;
+
+        if (!result_list.length) {
+            // nothing to update in place, the search form is submitted as usual
+            return;
+        }
+
+        let live_search = function (search_value) {
+            if (controller) {
+                // only the response to the latest input is shown
+                controller.abort();
+            }
+            controller = new AbortController();
+
+            const request_parameters = new URLSearchParams(window.location.search);
+            request_parameters.set("q", search_value);
+            request_parameters.delete("p");
+
+            fetch(endpoint + "?" + request_parameters.toString(), {
+                signal: controller.signal,
+                headers: {"Accept": "application/json"},
+                credentials: "same-origin",
+            })
+                .then(response => {
+                    if (!response.ok) {
+                        throw new Error(response.status + " " + response.statusText);
+                    }
+                    return response.json();
+                })
+                .then(data => {
+                    result_list.html(data["rows"].join(""));
+                    $(".paginator").text(data["result_count"] + " results, click Search to complete");
                 })
-                .fail(function( jqxhr, textStatus, error ) {
-                    const err = textStatus + ", " + error;
-                    console.log( "Request Failed: " + err );
-                    changelist_form.html('Sorry. An error occurred on our end.');
+                .catch(error => {
+                    if (error.name !== "AbortError") {
+                        console.log("Request Failed: " + error);
+                    }
                 });
         };
 
-        const searchbar = $("#searchbar");
-        const changelist_form = $('#changelist-form');
-        const delay_by_in_ms = 0;
-        const endpoint = window.location.origin + window.location.pathname
-        let scheduled_function = false;
-
         searchbar.on('input', function () {
             const search_value = $(this).val().trim();
-            const search_parameters = {q:search_value};
-            const urlParams = new URLSearchParams(window.location.search);
-            const request_parameters = Object.assign(search_parameters, urlParams);
 
-            changelist_form.html('<h1>Searching...</h1>');
             if (scheduled_function) {
                 clearTimeout(scheduled_function);
             }
-            scheduled_function = setTimeout(ajax_call, delay_by_in_ms, endpoint, request_parameters);
-        })
+            scheduled_function = setTimeout(live_search, delay_by_in_ms, search_value);
+        });
     });
 })(django.jQuery);
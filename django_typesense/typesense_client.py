@@ -1,6 +1,269 @@
-import typesense
-
+import asyncio
+import inspect
+import logging
+import os
+import threading
+import weakref
 
 from django.conf import settings
 
-client = typesense.Client(settings.TYPESENSE)
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_local = threading.local()
+_client = None
+_client_override = None
+_http_client = None
+_async_clients = weakref.WeakKeyDictionary()
+_async_client_override = None
+
+
+def get_pool_limits():
+    """
+    Returns:
+        The connection pool limits from the `TYPESENSE` setting, see `create_http_client`
+    """
+    import httpx
+    from typesense.configuration import Configuration
+
+    config = Configuration(settings.TYPESENSE)
+    return httpx.Limits(
+        max_connections=config.max_connections,
+        max_keepalive_connections=settings.TYPESENSE.get(
+            "max_keepalive_connections", config.max_connections
+        ),
+        keepalive_expiry=settings.TYPESENSE.get("keepalive_expiry_seconds", 5.0),
+    )
+
+
+def create_http_client():
+    """
+    Build the pooled HTTP client shared by the typesense clients of the process from the `TYPESENSE` setting.
+
+    The typesense defaults are used for `max_connections`, `pool_timeout_seconds` and `connection_timeout_seconds`.
+    Every connection is kept alive unless `max_keepalive_connections` is set, so that parallel bulk runs don't
+    reconnect between batches, and idle connections are closed after `keepalive_expiry_seconds` (5 by default).
+    Failed connection attempts are retried `connect_retries` times (0 by default), request level retries are
+    configured with typesense's `num_retries` and `retry_interval_seconds`.
+    """
+    import httpx
+    from typesense.configuration import Configuration
+
+    config = Configuration(settings.TYPESENSE)
+    return httpx.Client(
+        timeout=httpx.Timeout(
+            config.connection_timeout_seconds, pool=config.pool_timeout_seconds
+        ),
+        transport=httpx.HTTPTransport(
+            verify=config.verify,
+            limits=get_pool_limits(),
+            retries=settings.TYPESENSE.get("connect_retries", 0),
+        ),
+    )
+
+
+def get_http_client():
+    """
+    Returns:
+        The pooled HTTP client of the process, or None if the installed typesense client doesn't take one
+    """
+    global _http_client
+
+    import typesense
+
+    if "http_client" not in inspect.signature(typesense.Client).parameters:
+        return None
+
+    if _http_client is None:
+        with _lock:
+            if _http_client is None:
+                _http_client = create_http_client()
+
+    return _http_client
+
+
+def create_client():
+    """
+    Build a new typesense client from the `TYPESENSE` setting
+    """
+    import typesense
+
+    http_client = get_http_client()
+    if http_client is None:
+        return typesense.Client(settings.TYPESENSE)
+
+    return typesense.Client(settings.TYPESENSE, http_client=http_client)
+
+
+def get_client():
+    """
+    Returns:
+        The typesense client of the current process, or of the current thread if `TYPESENSE_CLIENT_PER_THREAD`
+        is enabled. It is created on first use.
+    """
+    global _client
+
+    if _client_override is not None:
+        return _client_override
+
+    if getattr(settings, "TYPESENSE_CLIENT_PER_THREAD", False):
+        try:
+            return _local.client
+        except AttributeError:
+            _local.client = create_client()
+            return _local.client
+
+    if _client is None:
+        client = create_client()
+        with _lock:
+            if _client is None:
+                _client = client
+
+    return _client
+
+
+def create_async_http_client():
+    """
+    Build a new asyncio HTTP client, with its own connection pool, from the `TYPESENSE` setting
+    """
+    import httpx
+    from typesense.configuration import Configuration
+
+    config = Configuration(settings.TYPESENSE)
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(
+            config.connection_timeout_seconds, pool=config.pool_timeout_seconds
+        ),
+        transport=httpx.AsyncHTTPTransport(
+            verify=config.verify,
+            limits=get_pool_limits(),
+            retries=settings.TYPESENSE.get("connect_retries", 0),
+        ),
+    )
+
+
+def create_async_client(http_client=None):
+    """
+    Build a new asyncio typesense client from the `TYPESENSE` setting
+
+    Args:
+        http_client: the HTTP client to make the requests with, a new one is created if not given. The caller
+            is responsible for closing it.
+    """
+    import typesense
+
+    if http_client is None:
+        http_client = create_async_http_client()
+    return typesense.AsyncClient(settings.TYPESENSE, http_client=http_client)
+
+
+def close_with_loop(loop, http_client):
+    """
+    Close `http_client` when `loop` is closed e.g. at the end of `asyncio.run` or `async_to_sync`, so that the
+    connections of short-lived loops aren't leaked
+    """
+    close = loop.close
+
+    def close_loop():
+        if not loop.is_closed() and not loop.is_running():
+            try:
+                loop.run_until_complete(http_client.aclose())
+            except Exception:
+                logger.exception("Failed to close the typesense connections of the event loop")
+        close()
+
+    try:
+        loop.close = close_loop
+    except AttributeError:
+        # e.g. uvloop loops, the connections are dropped with the loop
+        pass
+
+
+def get_async_client():
+    """
+    Returns:
+        The asyncio typesense client of the running event loop. Connections can't be shared between event loops
+        so each loop gets its own client, created on first use and closed with the loop.
+    """
+    if _async_client_override is not None:
+        return _async_client_override
+
+    loop = asyncio.get_running_loop()
+    try:
+        return _async_clients[loop]
+    except KeyError:
+        http_client = create_async_http_client()
+        _async_clients[loop] = async_client = create_async_client(http_client)
+        close_with_loop(loop, http_client)
+        return async_client
+
+
+def set_async_client(client):
+    """
+    Use `client` instead of the configured asyncio client e.g. in tests, pass None to restore it
+    """
+    global _async_client_override
+    _async_client_override = client
+
+
+def set_client(client):
+    """
+    Use `client` instead of the configured client e.g. in tests, pass None to restore the configured client
+    """
+    global _client_override
+    _client_override = client
+
+
+def reset_client():
+    """
+    Drop the clients so that new ones are created on next use. Called in forked processes, which must not share
+    the connections of their parent.
+    """
+    global _client, _http_client, _async_clients, _local, _lock
+    _client = None
+    _http_client = None
+    _async_clients = weakref.WeakKeyDictionary()
+    _local = threading.local()
+    _lock = threading.Lock()
+
+
+def get_pool_stats() -> dict:
+    """
+    Returns:
+        The number of open, idle and in use connections of the pooled HTTP client, empty if it isn't used yet
+    """
+    pool = getattr(getattr(_http_client, "_transport", None), "_pool", None)
+    if pool is None:
+        return {}
+
+    connections = list(pool.connections)
+    idle = sum(1 for connection in connections if connection.is_idle())
+    return {
+        "connections": len(connections),
+        "idle": idle,
+        "active": len(connections) - idle,
+    }
+
+
+def log_pool_stats(label: str):
+    if stats := get_pool_stats():
+        logger.debug(f"{label}: typesense connection pool {stats}")
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset_client)
+
+
+class LazyClient:
+    """
+    Stands in for the typesense client, every attribute is looked up on `get_client()`
+    """
+
+    def __getattr__(self, name):
+        return getattr(get_client(), name)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}>"
+
+
+client = LazyClient()
@@ -1,8 +1,10 @@
+import asyncio
 import concurrent.futures
 import json
 import logging
 import os
 from datetime import date, datetime, time
+from itertools import chain, islice
 from typing import List
 
 from django.core.exceptions import FieldError
@@ -13,6 +15,42 @@ from typesense.exceptions import TypesenseClientError
 from django_typesense.exceptions import BatchUpdateError, UnorderedQuerySetError
 
 logger = logging.getLogger(__name__)
+# the largest `per_page` typesense accepts
+TYPESENSE_MAX_HITS_PER_PAGE = 250
+
+
+def iter_pk_chunks(queryset: QuerySet, chunk_size: int = 1024):
+    """Yields the primary keys of a queryset in chunks using keyset pagination so that
+    the full list of primary keys is never held in memory.
+
+    Parameters
+    ----------
+    queryset : QuerySet
+        The Django objects QuerySet to walk through.
+    chunk_size : int
+        The maximum number of primary keys per chunk. Defaults to 1024.
+
+    Yields
+    ------
+    list
+        The primary keys of the next chunk in ascending order.
+    """
+
+    queryset = queryset.order_by("pk")
+    last_pk = None
+
+    while True:
+        chunk_queryset = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        pks = list(chunk_queryset.values_list("pk", flat=True)[:chunk_size])
+        if not pks:
+            return
+
+        yield pks
+
+        if len(pks) < chunk_size:
+            return
+
+        last_pk = pks[-1]
 
 
 def update_batch(documents_queryset: QuerySet, collection_class, batch_no: int) -> None:
@@ -84,6 +122,8 @@ def bulk_update_typesense_records(
     """
 
     from django_typesense.mixins import TypesenseQuerySet
+    from django_typesense.registry import registry
+    from django_typesense.typesense_client import log_pool_stats
 
     if not isinstance(records_queryset, TypesenseQuerySet):
         logger.error(
@@ -101,7 +141,7 @@ def bulk_update_typesense_records(
                 "Please provide an ordered objects."
             )
 
-    collection_class = records_queryset.model.collection_class
+    collection_class = registry.get_collection_class(records_queryset.model)
     paginator = Paginator(records_queryset, batch_size)
 
     with concurrent.futures.ThreadPoolExecutor(max_workers=num_threads) as executor:
@@ -117,58 +157,456 @@ def bulk_update_typesense_records(
         for future in concurrent.futures.as_completed(futures):
             future.result()
 
+    log_pool_stats(f"Updated {paginator.count} {records_queryset.model.__name__} records")
+
+
+async def abulk_update_typesense_records(
+    records_queryset: QuerySet,
+    batch_size: int = 1024,
+    concurrency: int = 8,
+) -> None:
+    """Asyncio version of `bulk_update_typesense_records`. The batches are read from the
+    database in a worker thread while up to `concurrency` imports are in flight.
+
+    Parameters
+    ----------
+    records_queryset : QuerySet
+        The Django objects QuerySet to update. It must be a `TypesenseModelMixin` subclass.
+    batch_size : int
+        The number of objects to be indexed in a single run. Defaults to 1024.
+    concurrency : int
+        The maximum number of concurrent import requests. Defaults to 8.
+
+    Returns
+    -------
+    None
+
+    Raises
+    ------
+    BatchUpdateError
+        Raised when an error occurs during updating typesense collection.
+    """
+
+    from asgiref.sync import sync_to_async
+
+    from django_typesense.cache import search_cache
+    from django_typesense.mixins import TypesenseQuerySet
+    from django_typesense.registry import registry
+    from django_typesense.typesense_client import get_async_client
+
+    if not isinstance(records_queryset, TypesenseQuerySet):
+        logger.error(
+            f"The objects for {records_queryset.model.__name__} does not use TypesenseQuerySet "
+            f"as it's manager. Please update the model manager for the class to use Typesense."
+        )
+        return
+
+    collection_class = registry.get_collection_class(records_queryset.model)
+    documents = get_async_client().collections[collection_class.schema_name].documents
+    pk_chunks = iter_pk_chunks(records_queryset, batch_size)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    def get_batch():
+        pks = next(pk_chunks, None)
+        if pks is None:
+            return None
+        return collection_class(records_queryset.filter(pk__in=pks), many=True).data
+
+    async def update_batch(batch, batch_no):
+        try:
+            responses = await documents.import_(batch, {"action": "emplace"})
+        finally:
+            semaphore.release()
+
+        failure_responses = [response for response in responses if not response["success"]]
+        if failure_responses:
+            raise BatchUpdateError(
+                f"An Error occurred during the bulk update: {failure_responses}"
+            )
+        logger.debug(f"Batch {batch_no} Updated with {len(batch)} records ✓")
+
+    tasks = []
+    try:
+        while True:
+            await semaphore.acquire()
+            batch = await sync_to_async(get_batch)()
+            if not batch:
+                semaphore.release()
+                if batch is None:
+                    break
+                continue
+            tasks.append(asyncio.create_task(update_batch(batch, len(tasks) + 1)))
+
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        search_cache.invalidate(collection_class.schema_name)
+
+
+def map_chunks(func, items, chunk_size: int = 1024, num_threads: int = 1) -> list:
+    """Calls `func` on consecutive chunks of `items`. The items are consumed lazily so
+    that querysets and generators are never fully materialized.
+
+    Parameters
+    ----------
+    func : callable
+        Called with a list of at most `chunk_size` items.
+    items : Iterable
+        The items to process.
+    chunk_size : int
+        The maximum number of items per chunk. Defaults to 1024.
+    num_threads : int
+        The number of threads that will be used. Defaults to 1 i.e. chunks are processed sequentially.
+
+    Returns
+    -------
+    list
+        The results of `func` for every chunk.
+    """
 
-def bulk_delete_typesense_records(document_ids: list, collection_name: str) -> None:
+    iterator = iter(items)
+    chunks = iter(lambda: list(islice(iterator, chunk_size)), [])
+
+    if num_threads <= 1:
+        return [func(chunk) for chunk in chunks]
+
+    results = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=num_threads) as executor:
+        futures = set()
+        for chunk in chunks:
+            # Bound the chunks in flight so that the items are still consumed lazily
+            if len(futures) >= num_threads * 2:
+                done, futures = concurrent.futures.wait(
+                    futures, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                results.extend(future.result() for future in done)
+            futures.add(executor.submit(func, chunk))
+
+        results.extend(future.result() for future in concurrent.futures.as_completed(futures))
+
+    return results
+
+
+def get_ids_filter(document_ids) -> str:
+    """Builds the `filter_by` expression matching the given document ids"""
+    return f"id:[{','.join(map(str, document_ids))}]"
+
+
+def bulk_delete_typesense_records(
+    document_ids,
+    collection_name: str,
+    batch_size: int = 1024,
+    num_threads: int = 1,
+) -> None:
     """This method deletes Typesense records for objects .delete() calls
     from Typesense mixin subclasses.
 
     Parameters
     ----------
-    document_ids : list
-        The list of document IDs to be deleted.
+    document_ids : Iterable
+        The document IDs to be deleted. A QuerySet of the indexed model can be passed
+        to stream its primary keys instead.
     collection_name : str
         The collection name to delete the documents from.
+    batch_size : int
+        The number of documents deleted per request. Defaults to 1024.
+    num_threads : int
+        The number of threads that will be used. Defaults to 1.
 
     Returns
     -------
     None
     """
 
-    from django_typesense.typesense_client import client
+    from django_typesense.cache import search_cache
+    from django_typesense.typesense_client import client, log_pool_stats
+
+    if isinstance(document_ids, QuerySet):
+        document_ids = chain.from_iterable(iter_pk_chunks(document_ids, batch_size))
+
+    def delete_chunk(chunk):
+        try:
+            client.collections[collection_name].documents.delete(
+                {"filter_by": get_ids_filter(chunk)}
+            )
+        except TypesenseClientError as error:
+            logger.error(
+                f"Could not delete the documents IDs {chunk}\nError: {error}"
+            )
 
     try:
-        client.collections[collection_name].documents.delete(
-            {"filter_by": f"id:{document_ids}"}
-        )
-    except TypesenseClientError as error:
-        logger.error(
-            f"Could not delete the documents IDs {document_ids}\nError: {error}"
-        )
+        map_chunks(delete_chunk, document_ids, batch_size, num_threads)
+    finally:
+        search_cache.invalidate(collection_name)
+    log_pool_stats(f"Deleted documents from {collection_name}")
+
+
+def get_projection_parameters(
+    include_fields: List[str] = None, exclude_fields: List[str] = None, highlight: bool = True
+) -> dict:
+    """
+    Get the search parameters that trim the documents of the hits, the `id` is always returned
+
+    Args:
+        include_fields: the only fields to return
+        exclude_fields: the fields not to return
+        highlight: whether to return the highlights of the matched fields
+
+    Returns:
+        The typesense search parameters
+    """
+    parameters = {}
+    if include_fields is not None:
+        include_fields = list(include_fields)
+        if "id" not in include_fields:
+            include_fields.insert(0, "id")
+        parameters["include_fields"] = ",".join(include_fields)
+
+    if exclude_fields:
+        parameters["exclude_fields"] = ",".join(field for field in exclude_fields if field != "id")
+
+    if not highlight:
+        parameters["highlight_fields"] = "none"
+        parameters["enable_highlight_v1"] = False
+
+    return parameters
+
+
+def get_projection(collection_name, projection: str) -> dict:
+    """
+    Returns:
+        The search parameters of the projection of the collection with the schema name `collection_name`
+    """
+    from django_typesense.registry import registry
+
+    return registry.collections[collection_name].get_projection(projection)
+
+
+def resolve_projection(search: dict, common_parameters: dict) -> dict:
+    """
+    Replace the `projection` of a search of a multi search with its parameters
+    """
+    if "projection" not in search:
+        return search
+
+    search = dict(search)
+    collection_name = search.get("collection", common_parameters.get("collection"))
+    return {**get_projection(collection_name, search.pop("projection")), **search}
 
 
-def typesense_search(collection_name, **kwargs):
+def typesense_search(collection_name, projection: str = None, **kwargs):
     """
     Perform a search on the specified collection using the parameters provided.
 
     Args:
         collection_name: the schema name of the collection to perform the search on
+        projection: the name of one of the `projections` of the collection, its parameters are added to the search
         **kwargs: typesense search parameters
 
     Returns:
         A list of the typesense results
     """
 
-    from django_typesense.typesense_client import client
+    from django_typesense.cache import normalize_parameters, search_cache
+    from django_typesense.routing import route
+    from django_typesense.singleflight import singleflight
 
     if not collection_name:
         return
 
     search_parameters = {}
+    if projection is not None:
+        search_parameters.update(get_projection(collection_name, projection))
 
     for key, value in kwargs.items():
         search_parameters.update({key: value})
 
-    return client.collections[collection_name].documents.search(search_parameters)
+    def search():
+        return route(
+            lambda client: client.collections[collection_name].documents.search(search_parameters)
+        )
+
+    if search_cache.enabled:
+        results, cache_key = search_cache.get(collection_name, search_parameters)
+        if results is not None:
+            return results
+
+        def search_and_cache():
+            results = search()
+            search_cache.set(cache_key, results)
+            return results
+
+    else:
+        search_and_cache = search
+
+    # Identical searches in flight are made once
+    flight_key = (collection_name, normalize_parameters(search_parameters))
+    return singleflight.do(flight_key, [collection_name], search_and_cache)
+
+
+def get_error_class(code: int):
+    """
+    Returns:
+        The typesense exception raised for the HTTP status `code`
+    """
+    from typesense import exceptions
+
+    error_classes = {
+        400: exceptions.RequestMalformed,
+        401: exceptions.RequestUnauthorized,
+        403: exceptions.RequestForbidden,
+        404: exceptions.ObjectNotFound,
+        409: exceptions.ObjectAlreadyExists,
+        422: exceptions.ObjectUnprocessable,
+        500: exceptions.ServerError,
+        503: exceptions.ServiceUnavailable,
+    }
+    return error_classes.get(code, TypesenseClientError)
+
+
+def typesense_multi_search(searches: List[dict], **common_parameters) -> List[dict]:
+    """
+    Perform several searches in a single request.
+
+    Args:
+        searches: the typesense search parameters of each search, including the `collection` to search
+        **common_parameters: typesense search parameters shared by all the searches
+
+    Returns:
+        The typesense results of each search, in order
+
+    Raises:
+        TypesenseClientError: the error of the first search that failed
+    """
+
+    from django_typesense.cache import normalize_parameters, search_cache
+    from django_typesense.routing import route
+    from django_typesense.singleflight import singleflight
+
+    searches = [resolve_projection(search, common_parameters) for search in searches]
+    results = [None] * len(searches)
+    cache_keys = {}
+
+    if search_cache.enabled:
+        for index, search in enumerate(searches):
+            search_parameters = {**common_parameters, **search}
+            collection_name = search_parameters.pop("collection")
+            results[index], cache_keys[index] = search_cache.get(
+                collection_name, search_parameters
+            )
+
+    # Only the searches missing from the cache are sent
+    missing = [index for index, result in enumerate(results) if result is None]
+    if not missing:
+        return results
+
+    missing_searches = {"searches": [searches[index] for index in missing]}
+    response = singleflight.do(
+        ("multi_search", normalize_parameters([missing_searches, common_parameters])),
+        {search.get("collection", common_parameters.get("collection")) for search in searches},
+        lambda: route(lambda client: client.multi_search.perform(missing_searches, common_parameters)),
+    )
+
+    for index, result in zip(missing, response["results"]):
+        if "error" in result:
+            error_class = get_error_class(result.get("code"))
+            raise error_class(f"[Errno {result.get('code')}] {result['error']}")
+
+        results[index] = result
+        if index in cache_keys:
+            search_cache.set(cache_keys[index], result)
+
+    return results
+
+
+def get_cursor_parameters(collection_class, search_parameters: dict, after=None, reverse: bool = False) -> dict:
+    """
+    Get the search parameters of the hits following a cursor, in the order of the collection's cursor field.
+
+    Args:
+        collection_class: the collection searched, it must have a `cursor_field`
+        search_parameters: typesense search parameters, their `sort_by` may only be on the cursor field
+        after: the cursor value of the last hit already seen
+        reverse: get the hits preceding the cursor instead, in reverse order
+
+    Returns:
+        The typesense search parameters
+    """
+    cursor_field = collection_class.get_cursor_field()
+    sort_by = search_parameters.get("sort_by") or f"{cursor_field}:asc"
+    if sort_by not in (f"{cursor_field}:asc", f"{cursor_field}:desc"):
+        raise ValueError(f"Hits walked with a cursor are sorted by `{cursor_field}`, not `{sort_by}`")
+
+    descending = sort_by.endswith(":desc") != reverse
+    parameters = {**search_parameters, "sort_by": f"{cursor_field}:{'desc' if descending else 'asc'}"}
+
+    if after is not None:
+        filter_by = f"{cursor_field}:{'<' if descending else '>'}{int(after)}"
+        if current_filter_by := search_parameters.get("filter_by"):
+            filter_by = f"({current_filter_by}) && {filter_by}"
+        parameters["filter_by"] = filter_by
+
+    return parameters
+
+
+def iter_search_hits(
+    collection_class, batch_size: int = TYPESENSE_MAX_HITS_PER_PAGE, after=None, **search_parameters
+):
+    """
+    Walk every hit of a search. Each request asks for the first page of the hits following the last one seen
+    on the collection's cursor field, so deep hits are as fast to get as the first ones and aren't limited by
+    `page * per_page`.
+
+    Args:
+        collection_class: the collection to search, it must have a `cursor_field`
+        batch_size: the number of hits requested at a time
+        after: start after the hit with this cursor value
+        **search_parameters: typesense search parameters, `sort_by` may only be on the cursor field
+
+    Returns:
+        An iterator over the typesense hits
+    """
+    cursor_field = collection_class.get_cursor_field()
+    batch_size = min(batch_size, TYPESENSE_MAX_HITS_PER_PAGE)
+
+    # the cursor is read from the documents
+    include_fields = search_parameters.get("include_fields")
+    if include_fields and cursor_field not in include_fields.split(","):
+        search_parameters["include_fields"] = f"{include_fields},{cursor_field}"
+
+    while True:
+        parameters = get_cursor_parameters(collection_class, search_parameters, after)
+        results = typesense_search(
+            collection_class.schema_name, **{**parameters, "page": 1, "per_page": batch_size}
+        )
+        hits = results["hits"]
+        yield from hits
+
+        if len(hits) < batch_size or len(hits) == results["found"]:
+            return
+
+        after = hits[-1]["document"][cursor_field]
+
+
+async def atypesense_search(collection_name, **kwargs):
+    """
+    Asyncio version of `typesense_search`, it doesn't block the event loop.
+
+    Args:
+        collection_name: the schema name of the collection to perform the search on
+        **kwargs: typesense search parameters
+
+    Returns:
+        A list of the typesense results
+    """
+
+    from django_typesense.typesense_client import get_async_client
+
+    if not collection_name:
+        return
+
+    return await get_async_client().collections[collection_name].documents.search(kwargs)
 
 
 def get_unix_timestamp(datetime_object) -> int:
@@ -209,28 +647,118 @@ def get_unix_timestamp(datetime_object) -> int:
     return timestamp
 
 
-def export_documents(
-    collection_name,
+def get_export_parameters(
     filter_by: str = None,
     include_fields: List[str] = None,
     exclude_fields: List[str] = None,
-) -> List[dict]:
-    from django_typesense.typesense_client import client
-
+) -> dict:
     params = {}
     if filter_by is not None:
         params["filter_by"] = filter_by
 
     if include_fields is not None:
-        params["include_fields"] = include_fields
+        params["include_fields"] = ",".join(include_fields)
 
     if exclude_fields is not None:
-        params["exclude_fields"] = exclude_fields
+        params["exclude_fields"] = ",".join(exclude_fields)
+
+    return params
 
-    if not params:
-        params = None
 
-    jsonlist = (
-        client.collections[collection_name].documents.export(params=params).splitlines()
+def iter_export_documents(
+    collection_name,
+    filter_by: str = None,
+    include_fields: List[str] = None,
+    exclude_fields: List[str] = None,
+    batch_size: int = None,
+):
+    """
+    Export the documents of a collection without loading the whole export in memory. The export is read from
+    the streamed response and decoded line by line.
+
+    Args:
+        collection_name: the schema name of the collection to export
+        filter_by: only export the documents matching this typesense filter
+        include_fields: the fields to export
+        exclude_fields: the fields not to export
+        batch_size: yield lists of up to `batch_size` documents instead of single documents
+
+    Returns:
+        An iterator over the exported documents, or over lists of documents if `batch_size` is given
+    """
+    documents = _iter_export_lines(
+        collection_name, get_export_parameters(filter_by, include_fields, exclude_fields)
+    )
+    documents = map(json.loads, documents)
+
+    if not batch_size:
+        yield from documents
+        return
+
+    while batch := list(islice(documents, batch_size)):
+        yield batch
+
+
+def _iter_export_lines(collection_name, params: dict):
+    """
+    Stream the lines of an export with the pooled HTTP client. The node, the api key and the `additional_headers` are
+    those of the current client, see `set_client`. A node that fails before the export starts is marked unhealthy
+    and the export is retried on the next one, up to `num_retries` times. An export that fails midway is not retried.
+    """
+    from time import sleep
+    from urllib.parse import quote
+
+    import httpx
+    from typesense import exceptions
+
+    from django_typesense.typesense_client import client, get_http_client
+
+    http_client = get_http_client()
+    if http_client is None:
+        # the installed typesense client reads the whole export
+        export = client.collections[collection_name].documents.export(params or None)
+        yield from export.splitlines()
+        return
+
+    api_call = client.api_call
+    config = api_call.config
+    headers = {"X-TYPESENSE-API-KEY": config.api_key, **config.additional_headers}
+    endpoint = f"/collections/{quote(collection_name, safe='')}/documents/export"
+
+    for attempt in range(config.num_retries + 1):
+        node = api_call.node_manager.get_node()
+        streaming = False
+        try:
+            with http_client.stream("GET", node.url() + endpoint, params=params, headers=headers) as response:
+                if not response.is_success:
+                    response.read()
+                    try:
+                        message = response.json().get("message", response.text)
+                    except ValueError:
+                        message = response.text
+                    error_class = get_error_class(response.status_code)
+                    raise error_class(f"[Errno {response.status_code}] {message}")
+
+                api_call.node_manager.set_node_health(node, is_healthy=True)
+                streaming = True
+                for line in response.iter_lines():
+                    if line:
+                        yield line
+                return
+        except (httpx.TransportError, exceptions.ServerError, exceptions.ServiceUnavailable) as error:
+            if streaming or attempt == config.num_retries:
+                raise
+            api_call.node_manager.set_node_health(node, is_healthy=False)
+            logger.debug(f"Exporting {collection_name} from {node.url()} failed, retrying: {error}")
+            sleep(config.retry_interval_seconds)
+
+
+def export_documents(
+    collection_name,
+    filter_by: str = None,
+    include_fields: List[str] = None,
+    exclude_fields: List[str] = None,
+) -> List[dict]:
+    return list(
+        iter_export_documents(collection_name, filter_by, include_fields, exclude_fields)
     )
-    return list(map(json.loads, jsonlist))
@@ -0,0 +1,118 @@
+import asyncio
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+
+from django_typesense.exceptions import BatchUpdateError
+from django_typesense.typesense_client import get_async_client, reset_client, set_async_client
+from django_typesense.utils import abulk_update_typesense_records, atypesense_search
+from tests.collections import SongCollection
+from tests.models import Genre, Song
+
+
+class TestAsyncTypesense(TestCase):
+    def setUp(self):
+        genre = Genre.objects.create(name="genre")
+        songs = [
+            Song(title=f"song {index}", genre=genre, duration=timedelta(minutes=3), description="")
+            for index in range(5)
+        ]
+        with mock.patch("django_typesense.collections.client"):
+            self.songs = Song.objects.bulk_create(songs)
+
+        self.async_client = mock.MagicMock()
+        self.documents = self.async_client.collections[SongCollection.schema_name].documents
+        self.documents.search = mock.AsyncMock(return_value={"found": 0, "hits": []})
+        self.documents.import_ = mock.AsyncMock(
+            side_effect=lambda documents, params: [{"success": True}] * len(documents)
+        )
+        self.documents.delete = mock.AsyncMock(return_value={"num_deleted": 2})
+        self.documents.__getitem__.return_value.update = mock.AsyncMock()
+        set_async_client(self.async_client)
+        self.addCleanup(set_async_client, None)
+
+    async def test_atypesense_search(self):
+        results = await atypesense_search(SongCollection.schema_name, q="song", query_by="title")
+
+        self.assertEqual(results, {"found": 0, "hits": []})
+        self.documents.search.assert_awaited_once_with({"q": "song", "query_by": "title"})
+
+    async def test_aupdate(self):
+        await SongCollection(Song.objects.all(), many=True).aupdate()
+        (documents, params), _ = self.documents.import_.call_args
+        self.assertEqual(len(documents), 5)
+        self.assertEqual(params, {"action": "emplace"})
+
+        song = self.songs[0]
+        await SongCollection(song, update_fields=["title"]).aupdate()
+        self.documents.__getitem__.assert_called_with(str(song.pk))
+        self.documents.__getitem__.return_value.update.assert_awaited_once_with(
+            {"title": song.title}
+        )
+
+    async def test_adelete(self):
+        response = await SongCollection(Song.objects.all(), many=True).adelete(
+            batch_size=2, concurrency=2
+        )
+
+        self.assertEqual(response, {"num_deleted": 6})
+        self.assertEqual(self.documents.delete.await_count, 3)
+
+        await SongCollection().adelete(filter_by="genre_id:=1")
+        self.documents.delete.assert_awaited_with({"filter_by": "genre_id:=1", "batch_size": 1024})
+
+    async def test_abulk_update_typesense_records(self):
+        await abulk_update_typesense_records(Song.objects.all(), batch_size=2, concurrency=2)
+
+        batches = [call.args[0] for call in self.documents.import_.await_args_list]
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 1])
+        self.assertEqual(
+            sorted(int(document["id"]) for batch in batches for document in batch),
+            [song.pk for song in self.songs],
+        )
+
+    async def test_abulk_update_failures(self):
+        self.documents.import_.side_effect = None
+        self.documents.import_.return_value = [{"success": False, "error": "error"}]
+
+        with self.assertRaises(BatchUpdateError):
+            await abulk_update_typesense_records(Song.objects.all(), batch_size=2)
+
+
+class TestAsyncClientPerEventLoop(TestCase):
+    def test_client_per_event_loop(self):
+        reset_client()
+        self.addCleanup(reset_client)
+
+        async def get_clients():
+            return get_async_client(), get_async_client()
+
+        with mock.patch(
+            "django_typesense.typesense_client.create_async_client",
+            side_effect=lambda http_client=None: mock.Mock(),
+        ):
+            first, second = asyncio.run(get_clients())
+            other_loop_client, _ = asyncio.run(get_clients())
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, other_loop_client)
+
+    def test_client_is_closed_with_its_loop(self):
+        reset_client()
+        self.addCleanup(reset_client)
+        http_client = mock.Mock(aclose=mock.AsyncMock())
+
+        async def get_client():
+            return get_async_client()
+
+        with mock.patch(
+            "django_typesense.typesense_client.create_async_http_client", return_value=http_client
+        ), mock.patch("django_typesense.typesense_client.create_async_client"):
+            loop = asyncio.new_event_loop()
+            loop.run_until_complete(get_client())
+            http_client.aclose.assert_not_awaited()
+            loop.close()
+
+        http_client.aclose.assert_awaited_once()
+        self.assertTrue(loop.is_closed())
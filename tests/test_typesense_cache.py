@@ -0,0 +1,97 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from django_typesense.cache import search_cache
+from django_typesense.utils import (
+    bulk_delete_typesense_records,
+    typesense_multi_search,
+    typesense_search,
+)
+from tests.collections import SongCollection
+
+
+@override_settings(TYPESENSE_CACHE={"alias": "default", "timeout": 60})
+@mock.patch("django_typesense.typesense_client.client")
+class TestSearchCache(TestCase):
+    def setUp(self):
+        cache.clear()
+        search_cache.reset_stats()
+        self.schema_name = SongCollection.schema_name
+
+    def search(self, **search_parameters):
+        return typesense_search(self.schema_name, q="song", query_by="title", **search_parameters)
+
+    def test_results_are_cached(self, mocked_client):
+        search = mocked_client.collections[self.schema_name].documents.search
+        search.return_value = {"found": 1, "hits": []}
+
+        self.assertEqual(self.search(), {"found": 1, "hits": []})
+        self.assertEqual(self.search(), {"found": 1, "hits": []})
+        # the parameters are normalized
+        typesense_search(self.schema_name, query_by="title", q="song")
+
+        search.assert_called_once()
+        self.assertEqual(search_cache.stats, {"hits": 2, "misses": 1})
+
+        self.search(page=2)
+        self.assertEqual(search.call_count, 2)
+
+    @mock.patch("django_typesense.collections.client")
+    def test_writes_invalidate_the_collection(self, mocked_collections_client, mocked_client):
+        search = mocked_client.collections[self.schema_name].documents.search
+        search.return_value = {"found": 1, "hits": []}
+
+        self.search()
+        SongCollection(data=[{"id": "1", "title": "song"}]).update()
+        self.search()
+        self.assertEqual(search.call_count, 2)
+
+        bulk_delete_typesense_records(["1"], self.schema_name)
+        self.search()
+        self.assertEqual(search.call_count, 3)
+
+        typesense_search("other", q="song", query_by="title")
+        SongCollection(data=[{"id": "1", "title": "song"}]).upsert()
+        typesense_search("other", q="song", query_by="title")
+        self.assertEqual(search_cache.stats["hits"], 1)
+
+    def test_max_entry_size(self, mocked_client):
+        search = mocked_client.collections[self.schema_name].documents.search
+        search.return_value = {"found": 1, "hits": [{"document": {"title": "x" * 1000}}]}
+
+        with override_settings(TYPESENSE_CACHE={"max_entry_size": 100}):
+            self.search()
+            self.search()
+
+        self.assertEqual(search.call_count, 2)
+
+    def test_multi_search_only_sends_misses(self, mocked_client):
+        search = mocked_client.collections[self.schema_name].documents.search
+        search.return_value = {"found": 1, "hits": []}
+        self.search()
+
+        perform = mocked_client.multi_search.perform
+        perform.return_value = {"results": [{"found": 2, "hits": []}]}
+        results = typesense_multi_search(
+            [
+                {"collection": self.schema_name, "q": "song"},
+                {"collection": self.schema_name, "q": "other"},
+            ],
+            query_by="title",
+        )
+
+        self.assertEqual(results, [{"found": 1, "hits": []}, {"found": 2, "hits": []}])
+        perform.assert_called_once_with(
+            {"searches": [{"collection": self.schema_name, "q": "other"}]}, {"query_by": "title"}
+        )
+
+    def test_disabled(self, mocked_client):
+        search = mocked_client.collections[self.schema_name].documents.search
+        with override_settings(TYPESENSE_CACHE=None):
+            self.search()
+            self.search()
+
+        self.assertEqual(search.call_count, 2)
+        self.assertEqual(search_cache.stats, {"hits": 0, "misses": 0})
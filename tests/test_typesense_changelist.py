@@ -0,0 +1,482 @@
+import json
+from datetime import date
+from unittest import mock
+
+from django.contrib.admin import AdminSite
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.templatetags.admin_list import date_hierarchy
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured, PermissionDenied
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import path, reverse
+
+from django_typesense.admin import TypesenseSearchAdminMixin
+from django_typesense.cache import search_cache
+from django_typesense.exceptions import TooManyResultsError
+from django_typesense.filters import TypesenseFacetListFilter
+from django_typesense.utils import get_unix_timestamp
+from tests.collections import SongCollection
+from tests.factories import SongFactory
+from tests.models import Song
+
+
+class SongAdmin(TypesenseSearchAdminMixin):
+    list_display = ["title"]
+
+
+site = AdminSite(name="admin")
+site.register(Song, SongAdmin)
+urlpatterns = [path("admin/", site.urls)]
+
+
+@mock.patch("django_typesense.typesense_client.client")
+class TestTypesenseChangeList(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.model_admin = SongAdmin(Song, AdminSite())
+        self.user = User.objects.create_superuser("admin", "admin@example.com", "password")
+
+    def get_changelist(self, path):
+        request = RequestFactory().get(path)
+        request.user = self.user
+        return self.model_admin.get_changelist_instance(request)
+
+    def test_searches_are_made_in_one_request(self, mocked_client):
+        perform = mocked_client.multi_search.perform
+        perform.return_value = {
+            "results": [
+                {"found": 1, "hits": [{"document": {"id": "1", "title": "Hey Jude"}}]},
+                {"found": 20, "hits": []},
+            ]
+        }
+
+        changelist = self.get_changelist("/?q=jude&genre_id__in=1,2")
+
+        perform.assert_called_once()
+        searches, common_parameters = perform.call_args.args
+        self.assertEqual(
+            [search["collection"] for search in searches["searches"]],
+            [SongCollection.schema_name] * 2,
+        )
+        self.assertEqual(searches["searches"][0]["q"], "jude")
+        self.assertEqual(searches["searches"][0]["filter_by"], "genre_id:=[1,2]")
+        self.assertEqual(searches["searches"][1]["q"], "*")
+        mocked_client.collections.__getitem__.assert_not_called()
+
+        self.assertEqual(changelist.result_count, 1)
+        self.assertEqual(changelist.full_result_count, 20)
+        self.assertEqual(changelist.result_list[0].title, "Hey Jude")
+
+    def test_overridden_search_results_are_still_used(self, mocked_client):
+        perform = mocked_client.multi_search.perform
+        perform.return_value = {"results": [{"found": 20, "hits": []}]}
+
+        class LegacySongAdmin(SongAdmin):
+            def get_typesense_search_results(self, request, search_term, *args, **kwargs):
+                return {"found": 1, "hits": [{"document": {"id": "1", "title": search_term}}]}
+
+        self.model_admin = LegacySongAdmin(Song, AdminSite())
+        with self.assertWarns(DeprecationWarning):
+            changelist = self.get_changelist("/?q=jude")
+
+        # only the total is left to the batched searches
+        searches = perform.call_args.args[0]["searches"]
+        self.assertEqual([search["q"] for search in searches], ["*"])
+        self.assertEqual(changelist.result_count, 1)
+        self.assertEqual(changelist.full_result_count, 20)
+        self.assertEqual(changelist.result_list[0].title, "jude")
+
+    def test_hits_are_trimmed_to_the_displayed_fields(self, mocked_client):
+        perform = mocked_client.multi_search.perform
+        perform.return_value = {"results": [{"found": 0, "hits": []}, {"found": 0, "hits": []}]}
+
+        self.get_changelist("/?q=jude")
+        search = perform.call_args.args[0]["searches"][0]
+        self.assertEqual(search["include_fields"], "id,title")
+        self.assertEqual(search["highlight_fields"], "none")
+
+        # the fields used by other columns are unknown
+        with mock.patch.object(SongAdmin, "list_display", ["title", "__str__"]):
+            self.get_changelist("/?q=jude")
+        search = perform.call_args.args[0]["searches"][0]
+        self.assertNotIn("include_fields", search)
+
+    @override_settings(TYPESENSE_COUNT_CACHE_TIMEOUT=10)
+    def test_full_result_count_is_cached(self, mocked_client):
+        perform = mocked_client.multi_search.perform
+        perform.side_effect = lambda searches, common_parameters: {
+            "results": [{"found": 20, "hits": []} for _ in searches["searches"]]
+        }
+
+        self.get_changelist("/")
+        searches = perform.call_args.args[0]["searches"]
+        self.assertEqual(len(searches), 2)
+        self.assertEqual(searches[1]["per_page"], 0)
+
+        changelist = self.get_changelist("/?q=jude")
+        self.assertEqual(len(perform.call_args.args[0]["searches"]), 1)
+        self.assertEqual(changelist.full_result_count, 20)
+
+        # writes invalidate the count
+        search_cache.invalidate(SongCollection.schema_name)
+        self.get_changelist("/?q=jude")
+        self.assertEqual(len(perform.call_args.args[0]["searches"]), 2)
+
+    def test_full_result_count_is_not_cached_by_default(self, mocked_client):
+        perform = mocked_client.multi_search.perform
+        perform.side_effect = lambda searches, common_parameters: {
+            "results": [{"found": 20, "hits": []} for _ in searches["searches"]]
+        }
+
+        self.get_changelist("/")
+        self.get_changelist("/?q=jude")
+        self.assertEqual(len(perform.call_args.args[0]["searches"]), 2)
+
+        # writes don't touch the cache
+        search_cache.invalidate(SongCollection.schema_name)
+        self.assertIsNone(cache.get(f"django_typesense:version:{SongCollection.schema_name}"))
+
+    def test_full_result_count_is_not_counted_when_hidden(self, mocked_client):
+        perform = mocked_client.multi_search.perform
+        perform.return_value = {"results": [{"found": 1, "hits": []}]}
+
+        with mock.patch.object(SongAdmin, "show_full_result_count", False):
+            changelist = self.get_changelist("/?q=jude")
+
+        self.assertEqual(len(perform.call_args.args[0]["searches"]), 1)
+        self.assertIsNone(changelist.full_result_count)
+
+
+@mock.patch("django_typesense.typesense_client.client")
+class TestTypesenseFacetListFilter(TestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(SongCollection.genre_name, "facet", True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.model_admin = SongAdmin(Song, AdminSite())
+        self.model_admin.list_filter = [TypesenseFacetListFilter.for_field("genre_name", title="genre")]
+        self.model_admin.show_full_result_count = False
+        self.user = User.objects.create_superuser("admin", "admin@example.com", "password")
+
+    def get_changelist(self, path):
+        request = RequestFactory().get(path)
+        request.user = self.user
+        return self.model_admin.get_changelist_instance(request)
+
+    def get_results(self, counts):
+        return {
+            "found": 2,
+            "hits": [],
+            "facet_counts": [
+                {
+                    "field_name": "genre_name",
+                    "counts": [{"value": value, "count": count} for value, count in counts],
+                }
+            ],
+        }
+
+    def test_choices_are_the_facet_counts(self, mocked_client):
+        perform = mocked_client.multi_search.perform
+        perform.return_value = {"results": [self.get_results([("Rock", 2), ("Jazz", 1)])]}
+
+        with self.assertNumQueries(0):
+            changelist = self.get_changelist("/")
+            choices = list(changelist.filter_specs[0].choices(changelist))
+
+        search = perform.call_args.args[0]["searches"][0]
+        self.assertEqual(search["facet_by"], "genre_name")
+        self.assertEqual(search["max_facet_values"], 20)
+        self.assertEqual(
+            [choice["display"] for choice in choices], ["All", "Rock (2)", "Jazz (1)"]
+        )
+        self.assertTrue(choices[0]["selected"])
+
+    def test_counts_of_the_filter_in_use_ignore_its_value(self, mocked_client):
+        perform = mocked_client.multi_search.perform
+        perform.return_value = {
+            "results": [self.get_results([("Rock", 2)]), self.get_results([("Rock", 2), ("Jazz", 1)])]
+        }
+
+        changelist = self.get_changelist("/?genre_name=Rock&q=love")
+
+        page_search, facet_search = perform.call_args.args[0]["searches"]
+        self.assertEqual(page_search["filter_by"], "genre_name:=`Rock`")
+        self.assertNotIn("facet_by", page_search)
+        self.assertEqual(facet_search["filter_by"], "")
+        self.assertEqual(facet_search["facet_by"], "genre_name")
+        self.assertEqual((facet_search["q"], facet_search["per_page"]), ("love", 0))
+
+        choices = list(changelist.filter_specs[0].choices(changelist))
+        self.assertEqual([choice["display"] for choice in choices], ["All", "Rock (2)", "Jazz (1)"])
+        self.assertTrue(choices[1]["selected"])
+
+    def test_queryset(self, mocked_client):
+        perform = mocked_client.multi_search.perform
+        perform.return_value = {"results": [self.get_results([]), self.get_results([])]}
+        changelist = self.get_changelist("/?genre_name=Rock")
+
+        queryset = changelist.filter_specs[0].queryset(None, Song.objects.all())
+        self.assertIn('"tests_genre"."name" = Rock', str(queryset.query))
+
+    def test_invalid_values_are_incorrect_lookups(self, mocked_client):
+        self.model_admin.list_filter = [TypesenseFacetListFilter.for_field("genre_id")]
+        request = RequestFactory().get("/?genre_id=abc")
+        request.user = self.user
+
+        with mock.patch.object(SongCollection.genre_id, "facet", True):
+            response = self.model_admin.changelist_view(request)
+            with self.assertRaises(IncorrectLookupParameters):
+                self.get_changelist("/?genre_id=abc")
+
+            mocked_client.multi_search.perform.return_value = {"results": [self.get_results([])] * 2}
+            filter_spec = self.get_changelist("/?genre_id=1").filter_specs[0]
+            filter_spec.used_parameters["genre_id"] = "abc"
+            with self.assertRaises(IncorrectLookupParameters):
+                filter_spec.queryset(None, Song.objects.all())
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.url, "/?e=1")
+
+    def test_field_must_be_a_facet(self, mocked_client):
+        with mock.patch.object(SongCollection.genre_name, "facet", False):
+            with self.assertRaises(ImproperlyConfigured):
+                self.get_changelist("/")
+
+
+@mock.patch("django_typesense.typesense_client.client")
+class TestTypesenseDateHierarchy(TestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(SongCollection.release_date, "facet", True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.model_admin = SongAdmin(Song, AdminSite())
+        self.model_admin.date_hierarchy = "release_date"
+        self.model_admin.typesense_date_hierarchy_years = range(2019, 2022)
+        self.model_admin.show_full_result_count = False
+        self.user = User.objects.create_superuser("admin", "admin@example.com", "password")
+
+    def get_changelist(self, path, counts):
+        perform = self.mocked_client.multi_search.perform
+        perform.return_value = {
+            "results": [
+                {
+                    "found": 3,
+                    "hits": [],
+                    "facet_counts": [
+                        {
+                            "field_name": "release_date",
+                            "counts": [{"value": label, "count": count} for label, count in counts.items()],
+                        }
+                    ],
+                }
+            ]
+        }
+        request = RequestFactory().get(path)
+        request.user = self.user
+        changelist = self.model_admin.get_changelist_instance(request)
+        return changelist, perform.call_args.args[0]["searches"][0]
+
+    def test_years(self, mocked_client):
+        self.mocked_client = mocked_client
+        with self.assertNumQueries(0):
+            changelist, search = self.get_changelist("/", {"d20190101": 0, "d20200101": 3, "d20210101": 1})
+            hierarchy = date_hierarchy(changelist)
+
+        timestamps = [get_unix_timestamp(date(year, 1, 1)) for year in range(2019, 2023)]
+        self.assertEqual(
+            search["facet_by"],
+            f"release_date(d20190101:[{timestamps[0]}, {timestamps[1]}], "
+            f"d20200101:[{timestamps[1]}, {timestamps[2]}], d20210101:[{timestamps[2]}, {timestamps[3]}])",
+        )
+        self.assertEqual([choice["title"] for choice in hierarchy["choices"]], ["2020", "2021"])
+
+    def test_selected_year(self, mocked_client):
+        self.mocked_client = mocked_client
+        changelist, search = self.get_changelist("/?release_date__year=2020", {"d20200301": 2})
+
+        self.assertEqual(
+            search["filter_by"],
+            f"release_date:>={get_unix_timestamp(date(2020, 1, 1))} && "
+            f"release_date:<{get_unix_timestamp(date(2021, 1, 1))}",
+        )
+        self.assertEqual(search["facet_by"].count(":["), 12)
+        self.assertEqual([choice["title"] for choice in date_hierarchy(changelist)["choices"]], ["March 2020"])
+
+    def test_selected_day(self, mocked_client):
+        self.mocked_client = mocked_client
+        changelist, search = self.get_changelist(
+            "/?release_date__year=2020&release_date__month=3&release_date__day=2", {}
+        )
+
+        self.assertNotIn("facet_by", search)
+        self.assertEqual(
+            search["filter_by"],
+            f"release_date:>={get_unix_timestamp(date(2020, 3, 2))} && "
+            f"release_date:<{get_unix_timestamp(date(2020, 3, 3))}",
+        )
+
+
+@mock.patch("django_typesense.typesense_client.client")
+class TestTypesenseChangeListActions(TestCase):
+    def setUp(self):
+        cache.clear()
+        with mock.patch("django_typesense.collections.client"):
+            self.songs = SongFactory.create_batch(4)
+        self.model_admin = SongAdmin(Song, AdminSite())
+        self.model_admin.show_full_result_count = False
+        self.user = User.objects.create_superuser("admin", "admin@example.com", "password")
+
+    def get_action_queryset(self, mocked_client, path, data):
+        mocked_client.multi_search.perform.return_value = {"results": [{"found": 0, "hits": []}]}
+        request = RequestFactory().post(path, data)
+        request.user = self.user
+        changelist = self.model_admin.get_changelist_instance(request)
+        return changelist.get_queryset(request)
+
+    @mock.patch("django_typesense.admin.iter_export_documents")
+    def test_select_across_exports_the_matching_ids(self, mocked_export, mocked_client):
+        mocked_export.return_value = iter([{"id": str(song.pk)} for song in self.songs[:2]])
+
+        queryset = self.get_action_queryset(
+            mocked_client, "/?genre_id__in=1,2", {"action": "delete_selected", "select_across": "1"}
+        )
+
+        self.assertCountEqual(queryset, self.songs[:2])
+        mocked_export.assert_called_once_with(
+            SongCollection.schema_name, filter_by="genre_id:=[1,2]", include_fields=["id"]
+        )
+
+    @mock.patch("django_typesense.admin.typesense_search")
+    def test_select_across_pages_through_the_search(self, mocked_search, mocked_client):
+        mocked_search.side_effect = [
+            {"found": 260, "hits": [{"document": {"id": str(self.songs[0].pk)}}] * 250},
+            {"found": 260, "hits": [{"document": {"id": str(self.songs[1].pk)}}] * 10},
+        ]
+
+        queryset = self.get_action_queryset(
+            mocked_client, "/?q=love", {"action": "delete_selected", "select_across": "1"}
+        )
+
+        self.assertCountEqual(queryset, self.songs[:2])
+        self.assertEqual([call.kwargs["page"] for call in mocked_search.call_args_list], [1, 2])
+        self.assertEqual(mocked_search.call_args.kwargs["q"], "love")
+        self.assertEqual(mocked_search.call_args.kwargs["include_fields"], "id")
+
+    @mock.patch("django_typesense.admin.iter_export_documents")
+    def test_select_across_without_search_or_filters(self, mocked_export, mocked_client):
+        queryset = self.get_action_queryset(mocked_client, "/", {"action": "delete_selected", "select_across": "1"})
+
+        self.assertCountEqual(queryset, self.songs)
+        mocked_export.assert_not_called()
+
+    @mock.patch("django_typesense.admin.iter_export_documents")
+    def test_select_across_is_bounded(self, mocked_export, mocked_client):
+        read = []
+
+        def export(*args, **kwargs):
+            for pk in range(1000):
+                read.append(pk)
+                yield {"id": str(pk)}
+
+        mocked_export.side_effect = export
+        self.model_admin.typesense_action_max_results = 300
+
+        with self.assertRaises(TooManyResultsError):
+            self.get_action_queryset(
+                mocked_client, "/?genre_id__in=1,2", {"action": "delete_selected", "select_across": "1"}
+            )
+
+        # the stream is left once the limit is exceeded
+        self.assertEqual(len(read), 500)
+
+    @override_settings(ROOT_URLCONF="tests.test_typesense_changelist")
+    @mock.patch("django_typesense.admin.iter_export_documents")
+    def test_actions_beyond_the_limit_are_aborted(self, mocked_export, mocked_client):
+        mocked_export.return_value = iter([{"id": str(song.pk)} for song in self.songs])
+        mocked_client.multi_search.perform.return_value = {"results": [{"found": 4, "hits": []}] * 2}
+        self.client.force_login(self.user)
+        url = reverse("admin:tests_song_changelist") + "?genre_id__in=1,2"
+
+        with mock.patch.object(site._registry[Song], "typesense_action_max_results", 2):
+            response = self.client.post(
+                url,
+                {
+                    "action": "delete_selected",
+                    "select_across": "1",
+                    "index": "0",
+                    ACTION_CHECKBOX_NAME: [self.songs[0].pk],
+                },
+            )
+
+        self.assertRedirects(response, url, fetch_redirect_response=False)
+        self.assertEqual(Song.objects.count(), 4)
+        self.assertIn("at most 2 search results", str(list(response.wsgi_request._messages)[0]))
+
+    @mock.patch("django_typesense.admin.iter_export_documents")
+    def test_selected_rows_are_not_searched(self, mocked_export, mocked_client):
+        queryset = self.get_action_queryset(
+            mocked_client,
+            "/?q=love",
+            {"action": "delete_selected", "select_across": "0", "_selected_action": [self.songs[0].pk]},
+        )
+
+        self.assertCountEqual(queryset, self.songs)
+        mocked_export.assert_not_called()
+
+
+@override_settings(ROOT_URLCONF="tests.test_typesense_changelist")
+@mock.patch("django_typesense.typesense_client.client")
+class TestTypesenseSearchView(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.model_admin = site._registry[Song]
+        self.user = User.objects.create_superuser("admin", "admin@example.com", "password")
+
+    def search(self, path, user=None):
+        request = RequestFactory().get(path)
+        request.user = user or self.user
+        return self.model_admin.typesense_search_view(request)
+
+    def test_returns_the_rows_of_the_results(self, mocked_client):
+        with mock.patch("django_typesense.collections.client"):
+            song = SongFactory(title="Hey Jude")
+
+        perform = mocked_client.multi_search.perform
+        perform.return_value = {
+            "results": [
+                {"found": 1, "hits": [{"document": {"id": str(song.pk), "title": "Hey Jude"}}]},
+                {"found": 20, "hits": []},
+            ]
+        }
+
+        response = self.search("/admin/tests/song/typesense-search/?q=jude")
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertEqual(data["result_count"], 1)
+        self.assertEqual(data["full_result_count"], 20)
+        self.assertEqual(len(data["rows"]), 1)
+        self.assertIn("Hey Jude", data["rows"][0])
+        self.assertIn(f"/admin/tests/song/{song.pk}/change/", data["rows"][0])
+        self.assertEqual(perform.call_args.args[0]["searches"][0]["q"], "jude")
+
+    def test_invalid_lookup_parameters(self, mocked_client):
+        with mock.patch.object(SongAdmin, "get_changelist_instance", side_effect=IncorrectLookupParameters):
+            response = self.search("/admin/tests/song/typesense-search/?q=jude&unknown=1")
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_requires_the_view_permission(self, mocked_client):
+        user = User.objects.create_user("user", "user@example.com", "password", is_staff=True)
+        with self.assertRaises(PermissionDenied):
+            self.search("/admin/tests/song/typesense-search/?q=jude", user=user)
+        mocked_client.multi_search.perform.assert_not_called()
+
+    def test_url(self, mocked_client):
+        self.assertEqual(reverse("admin:tests_song_typesense_search"), "/admin/tests/song/typesense-search/")
@@ -0,0 +1,115 @@
+import os
+import threading
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+
+from django_typesense import typesense_client
+from django_typesense.typesense_client import (
+    client,
+    get_client,
+    get_http_client,
+    get_pool_stats,
+    reset_client,
+    set_client,
+)
+
+
+class TestTypesenseClientFactory(TestCase):
+    def setUp(self):
+        reset_client()
+        self.addCleanup(reset_client)
+        patcher = mock.patch(
+            "django_typesense.typesense_client.create_client", side_effect=lambda: mock.Mock()
+        )
+        self.create_client = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_client_is_created_on_first_use(self):
+        self.create_client.assert_not_called()
+
+        collections = client.collections
+        self.assertIs(collections, get_client().collections)
+        self.assertIs(get_client(), get_client())
+        self.create_client.assert_called_once()
+
+    def test_reset_client(self):
+        first_client = get_client()
+        reset_client()
+        self.assertIsNot(get_client(), first_client)
+
+    @override_settings(TYPESENSE_CLIENT_PER_THREAD=True)
+    def test_client_per_thread(self):
+        clients = []
+        thread = threading.Thread(target=lambda: clients.append(get_client()))
+        thread.start()
+        thread.join()
+
+        self.assertIs(get_client(), get_client())
+        self.assertIsNot(get_client(), clients[0])
+
+    def test_set_client(self):
+        fake_client = mock.Mock()
+        set_client(fake_client)
+        self.addCleanup(set_client, None)
+
+        self.assertIs(client.collections, fake_client.collections)
+        self.create_client.assert_not_called()
+
+        set_client(None)
+        self.assertIsNot(get_client(), fake_client)
+
+    @skipUnless(hasattr(os, "fork"), "requires os.fork")
+    def test_client_is_reset_in_forked_processes(self):
+        get_client()
+        read_fd, write_fd = os.pipe()
+
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            os.write(write_fd, b"1" if typesense_client._client is None else b"0")
+            os._exit(0)
+
+        os.close(write_fd)
+        os.waitpid(pid, 0)
+        with os.fdopen(read_fd, "rb") as pipe:
+            self.assertEqual(pipe.read(), b"1")
+
+
+class TestTypesenseConnectionPool(TestCase):
+    def setUp(self):
+        reset_client()
+        self.addCleanup(reset_client)
+
+    def test_clients_share_the_pool(self):
+        with override_settings(TYPESENSE_CLIENT_PER_THREAD=True):
+            clients = []
+            thread = threading.Thread(target=lambda: clients.append(get_client()))
+            thread.start()
+            thread.join()
+
+            self.assertIsNot(get_client(), clients[0])
+            self.assertIs(get_client().api_call._client, clients[0].api_call._client)
+            self.assertIs(get_client().api_call._client, get_http_client())
+
+    def test_pool_settings(self):
+        with override_settings(
+            TYPESENSE={
+                **settings.TYPESENSE,
+                "max_connections": 16,
+                "keepalive_expiry_seconds": 30,
+                "connect_retries": 2,
+            }
+        ):
+            pool = get_http_client()._transport._pool
+
+        self.assertEqual(pool._max_connections, 16)
+        self.assertEqual(pool._max_keepalive_connections, 16)
+        self.assertEqual(pool._keepalive_expiry, 30)
+        self.assertEqual(pool._retries, 2)
+
+    def test_pool_stats(self):
+        self.assertEqual(get_pool_stats(), {})
+        get_http_client()
+        self.assertEqual(get_pool_stats(), {"connections": 0, "idle": 0, "active": 0})
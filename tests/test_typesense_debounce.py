@@ -0,0 +1,138 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from django_typesense.debounce import Debouncer
+from tests.collections import SongCollection
+from tests.factories import SongFactory
+from tests.models import Song
+
+
+@mock.patch("django_typesense.debounce.client")
+class TestDebouncer(TestCase):
+    def setUp(self):
+        self.debouncer = Debouncer()
+        self.schema_name = SongCollection.schema_name
+
+    def tearDown(self):
+        for timer in self.debouncer._timers.values():
+            timer.cancel()
+
+    def test_writes_are_collapsed(self, mocked_client):
+        self.debouncer.add(self.schema_name, [{"id": "1", "number_of_views": 1}], 60)
+        self.debouncer.add(self.schema_name, [{"id": "1", "number_of_views": 2}], 60)
+        self.debouncer.add(self.schema_name, [{"id": "1", "number_of_comments": 5}], 60)
+        self.debouncer.add(self.schema_name, [{"id": "2", "number_of_views": 7}], 60)
+
+        mocked_client.collections[self.schema_name].documents.import_.assert_not_called()
+        self.debouncer.flush(self.schema_name)
+
+        import_ = mocked_client.collections[self.schema_name].documents.import_
+        import_.assert_called_once_with(
+            [
+                {"id": "1", "number_of_views": 2, "number_of_comments": 5},
+                {"id": "2", "number_of_views": 7},
+            ],
+            {"action": "emplace"},
+        )
+        self.assertEqual(self.debouncer._timers, {})
+
+    def test_pop_removes_pending_documents(self, mocked_client):
+        self.debouncer.add(self.schema_name, [{"id": "1", "number_of_views": 1}], 60)
+
+        self.assertEqual(
+            self.debouncer.pop(self.schema_name, ["1", "2"]),
+            {"1": {"id": "1", "number_of_views": 1}},
+        )
+        self.debouncer.flush(self.schema_name)
+        mocked_client.collections[self.schema_name].documents.import_.assert_not_called()
+
+    def test_failed_documents_are_logged(self, mocked_client):
+        import_ = mocked_client.collections[self.schema_name].documents.import_
+        import_.return_value = [{"success": True}, {"success": False, "error": "Bad value"}]
+        self.debouncer.add(self.schema_name, [{"id": "1"}, {"id": "2", "number_of_views": "a"}], 60)
+
+        with self.assertLogs("django_typesense.debounce", "ERROR") as logs:
+            self.debouncer.flush(self.schema_name)
+
+        self.assertIn("Could not write 1 debounced documents", logs.output[0])
+
+    def test_reset_drops_pending_documents(self, mocked_client):
+        self.debouncer.add(self.schema_name, [{"id": "1", "number_of_views": 1}], 60)
+        timer = self.debouncer._timers[self.schema_name]
+
+        self.debouncer.reset()
+        timer.cancel()
+        self.debouncer.flush()
+        mocked_client.collections[self.schema_name].documents.import_.assert_not_called()
+
+        # new writes are scheduled again
+        self.debouncer.add(self.schema_name, [{"id": "1", "number_of_views": 2}], 60)
+        self.assertIn(self.schema_name, self.debouncer._timers)
+
+
+class TestCollectionDebounceWindow(TestCase):
+    @mock.patch.object(SongCollection, "debounce_window", 5)
+    @mock.patch.object(SongCollection, "debounce_fields", ["number_of_views"])
+    def test_list_of_fields_use_the_collection_window(self):
+        self.assertEqual(SongCollection.get_debounce_window(["id", "number_of_views"]), 5)
+        self.assertEqual(SongCollection.get_debounce_window(["id", "title"]), 0)
+        self.assertEqual(SongCollection.get_debounce_window(["id"]), 0)
+
+    @mock.patch.object(
+        SongCollection, "debounce_fields", {"number_of_views": 5, "number_of_comments": 2}
+    )
+    def test_shortest_window_is_used(self):
+        self.assertEqual(
+            SongCollection.get_debounce_window(["number_of_views", "number_of_comments"]), 2
+        )
+
+    @mock.patch("django_typesense.collections.debouncer")
+    @mock.patch.object(SongCollection, "debounce_fields", {"number_of_views": 5})
+    def test_update_is_debounced(self, mocked_debouncer):
+        data = [{"id": "1", "number_of_views": 3}]
+        SongCollection(data=data).update()
+        mocked_debouncer.add.assert_called_once_with(SongCollection.schema_name, data, 5)
+
+
+@mock.patch("django_typesense.debounce.client")
+@mock.patch("django_typesense.collections.client")
+@mock.patch.object(SongCollection, "debounce_fields", {"number_of_views": 60})
+class TestDebouncedDeletes(TestCase):
+    def setUp(self):
+        self.debouncer = Debouncer()
+        patcher = mock.patch("django_typesense.collections.debouncer", self.debouncer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(lambda: [timer.cancel() for timer in self.debouncer._timers.values()])
+        self.schema_name = SongCollection.schema_name
+
+    def test_deleted_documents_are_not_written(self, mocked_client, mocked_debounce_client):
+        SongCollection(data=[{"id": "1", "number_of_views": 3}]).update()
+        SongCollection(data=[{"id": "1"}, {"id": "2"}], many=True).delete()
+
+        self.debouncer.flush(self.schema_name)
+        mocked_debounce_client.collections[self.schema_name].documents.import_.assert_not_called()
+
+    def test_deleted_rows_are_not_written(self, mocked_client, mocked_debounce_client):
+        with self.captureOnCommitCallbacks(execute=True):
+            song = SongFactory()
+        song.number_of_views += 1
+        with self.captureOnCommitCallbacks(execute=True):
+            song.save(update_fields=["number_of_views"])
+        self.assertIn(str(song.pk), self.debouncer._pending[self.schema_name])
+
+        song.delete()
+
+        self.debouncer.flush(self.schema_name)
+        mocked_debounce_client.collections[self.schema_name].documents.import_.assert_not_called()
+
+    def test_pending_documents_are_written_before_a_filtered_delete(self, mocked_client, mocked_debounce_client):
+        import_ = mocked_debounce_client.collections[self.schema_name].documents.import_
+        import_.return_value = [{"success": True}]
+        SongCollection(data=[{"id": "1", "number_of_views": 3}]).update()
+
+        SongCollection(data=[{"id": "1"}], many=True).delete(filter_by="genre_id:=1")
+
+        import_.assert_called_once()
+        self.assertEqual(self.debouncer._pending, {})
@@ -0,0 +1,89 @@
+from datetime import date
+from unittest import mock
+
+from django.test import TestCase
+
+from django_typesense.utils import get_unix_timestamp
+from tests.collections import SongCollection
+
+
+@mock.patch("django_typesense.collections.client")
+class TestTypesenseCollectionAggregate(TestCase):
+    def setUp(self):
+        for field_name in ("genre_name", "genre_id", "release_date"):
+            patcher = mock.patch.object(SongCollection.get_field(field_name), "facet", True)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_aggregate(self, mocked_client):
+        search = mocked_client.collections[SongCollection.schema_name].documents.search
+        release_date = date(2023, 3, 23)
+        search.return_value = {
+            "found": 12,
+            "hits": [],
+            "facet_counts": [
+                {
+                    "field_name": "genre_name",
+                    "counts": [{"count": 8, "value": "rock"}, {"count": 4, "value": "jazz"}],
+                    "stats": {"total_values": 2},
+                },
+                {
+                    "field_name": "genre_id",
+                    "counts": [{"count": 8, "value": "1"}, {"count": 4, "value": "2"}],
+                    "stats": {"min": 1, "max": 2, "avg": 1.33, "sum": 16.0, "total_values": 2},
+                },
+                {
+                    "field_name": "release_date",
+                    "counts": [],
+                    "stats": {
+                        "min": get_unix_timestamp(release_date),
+                        "max": get_unix_timestamp(release_date),
+                    },
+                },
+            ],
+        }
+
+        aggregates = SongCollection.aggregate(
+            ["genre_name", "genre_id", "release_date"], filter_by="library_ids:=1"
+        )
+
+        search.assert_called_once_with(
+            {
+                "q": "*",
+                "query_by": SongCollection.query_by_fields,
+                "per_page": 0,
+                "filter_by": "library_ids:=1",
+                "facet_by": "genre_name,genre_id,release_date",
+                "max_facet_values": 10,
+            }
+        )
+        self.assertEqual(
+            aggregates,
+            {
+                "count": 12,
+                "genre_name__counts": {"rock": 8, "jazz": 4},
+                "genre_id__counts": {1: 8, 2: 4},
+                "genre_id__min": 1,
+                "genre_id__max": 2,
+                "genre_id__avg": 1.33,
+                "genre_id__sum": 16.0,
+                "release_date__counts": {},
+                "release_date__min": release_date,
+                "release_date__max": release_date,
+            },
+        )
+
+    def test_count_only(self, mocked_client):
+        search = mocked_client.collections[SongCollection.schema_name].documents.search
+        search.return_value = {"found": 3, "hits": []}
+
+        self.assertEqual(SongCollection.aggregate(), {"count": 3})
+        self.assertNotIn("facet_by", search.call_args.args[0])
+
+    def test_fields_must_be_faceted(self, mocked_client):
+        with self.assertRaisesMessage(ValueError, "facet=True"):
+            SongCollection.aggregate(["title"])
+        with self.assertRaisesMessage(ValueError, "not a field"):
+            SongCollection.aggregate(["duration"])
+
+        mocked_client.collections.__getitem__.assert_not_called()
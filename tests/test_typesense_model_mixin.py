@@ -1,9 +1,14 @@
+from datetime import date, timedelta
+from unittest import mock
+
+from django.db.models import F
 from django.test import TestCase
 
-from django_typesense.mixins import TypesenseManager
+from django_typesense.mixins import TypesenseManager, TypesenseQuerySet
+from django_typesense.utils import get_unix_timestamp
 
 from tests.factories import ArtistFactory, GenreFactory, SongFactory
-from tests.models import Song
+from tests.models import Artist, Genre, Song
 from tests.utils import get_document
 
 
@@ -33,7 +38,8 @@ class TestTypeSenseMixin(TestCase):
         self.assertNotEqual(song_document["genre_name"], self.song.genre.name)
         self.assertEqual(self.song.genre.name, genre_name)
 
-        Song.objects.get_queryset().update()
+        with self.captureOnCommitCallbacks(execute=True):
+            Song.objects.get_queryset().update()
         song_document = get_document(schema_name, self.song.pk)
         self.assertEqual(song_document["genre_name"], genre_name)
         self.assertEqual(song_document["genre_name"], self.song.genre.name)
@@ -47,3 +53,177 @@ class TestTypeSenseMixin(TestCase):
 
         song_document = get_document(schema_name, self.song.pk)
         self.assertIsNone(song_document)
+
+
+def without_computed_fields():
+    """
+    Leave out the collection fields read from properties or methods, which can't be derived from the updated values
+    """
+    sources = {
+        field_name: attname for field_name, attname in Song.get_typesense_field_sources().items() if attname
+    }
+    return mock.patch.object(Song, "get_typesense_field_sources", return_value=sources)
+
+
+@mock.patch("django_typesense.collections.client")
+@mock.patch.object(TypesenseQuerySet, "typesense_batch_size", 2)
+class TestTypesenseQuerySetUpdate(TestCase):
+    def setUp(self):
+        genre = Genre.objects.create(name="genre")
+        self.songs = [
+            Song.objects.create(
+                title=f"song {index}",
+                genre=genre,
+                number_of_views=index,
+                duration=timedelta(minutes=3),
+                description="",
+            )
+            for index in range(3)
+        ]
+        self.schema_name = Song.collection_class.schema_name
+
+    def test_literal_values_are_pushed_without_reading_rows(self, mocked_client):
+        documents = mocked_client.collections[self.schema_name].documents
+
+        # two chunks of primary keys and two updates
+        with without_computed_fields(), self.captureOnCommitCallbacks(execute=True), self.assertNumQueries(4):
+            updated = Song.objects.all().update(number_of_views=0)
+
+        self.assertEqual(updated, 3)
+        self.assertFalse(Song.objects.filter(number_of_views__gt=0).exists())
+        documents.import_.assert_called_once_with(
+            [
+                {"id": str(self.songs[0].pk), "number_of_views": 0},
+                {"id": str(self.songs[1].pk), "number_of_views": 0},
+            ],
+            {"action": "emplace"},
+        )
+        documents.__getitem__.assert_called_with(str(self.songs[2].pk))
+        documents.__getitem__.return_value.update.assert_called_once_with(
+            {"number_of_views": 0}
+        )
+
+    def test_expressions_are_read_back(self, mocked_client):
+        documents = mocked_client.collections[self.schema_name].documents
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Song.objects.filter(number_of_views__gte=1).update(
+                number_of_views=F("number_of_views") + 10
+            )
+
+        documents.import_.assert_called_once()
+        imported = documents.import_.call_args[0][0]
+        self.assertCountEqual(
+            imported,
+            [
+                {"id": str(self.songs[1].pk), "number_of_views": 11, "artist_names": [], "library_ids": []},
+                {"id": str(self.songs[2].pk), "number_of_views": 12, "artist_names": [], "library_ids": []},
+            ],
+        )
+
+    def test_computed_fields_are_read_back(self, mocked_client):
+        documents = mocked_client.collections[self.schema_name].documents
+        artist = Artist.objects.create(name="M83")
+        self.songs[0].artists.add(artist)
+        documents.reset_mock()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Song.objects.filter(pk=self.songs[0].pk).update(number_of_views=0)
+
+        # the property and method backed fields may depend on the updated values
+        documents.__getitem__.return_value.update.assert_called_once_with(
+            {"number_of_views": 0, "artist_names": ["M83"], "library_ids": []}
+        )
+
+    def test_unindexed_fields_are_not_sent(self, mocked_client):
+        documents = mocked_client.collections[self.schema_name].documents
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Song.objects.all().update(description="new description")
+
+        documents.import_.assert_not_called()
+        documents.__getitem__.return_value.update.assert_not_called()
+
+    def test_literal_values_are_converted(self, mocked_client):
+        documents = mocked_client.collections[self.schema_name].documents
+
+        with without_computed_fields(), self.captureOnCommitCallbacks(execute=True):
+            Song.objects.filter(pk=self.songs[0].pk).update(release_date="2023-01-01")
+
+        self.assertEqual(Song.objects.get(pk=self.songs[0].pk).release_date, date(2023, 1, 1))
+        documents.__getitem__.return_value.update.assert_called_once_with(
+            {"release_date": get_unix_timestamp(date(2023, 1, 1))}
+        )
+
+    def test_documents_are_written_after_commit(self, mocked_client):
+        documents = mocked_client.collections[self.schema_name].documents
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            Song.objects.all().update(number_of_views=0)
+
+        documents.import_.assert_not_called()
+        self.assertEqual(len(callbacks), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Song.objects.all().update(number_of_views=1)
+
+        documents.import_.assert_called_once()
+
+
+@mock.patch("django_typesense.collections.client")
+@mock.patch.object(TypesenseQuerySet, "typesense_batch_size", 2)
+class TestTypesenseQuerySetBulkWrites(TestCase):
+    def setUp(self):
+        self.genre = Genre.objects.create(name="genre")
+        self.schema_name = Song.collection_class.schema_name
+
+    def build_songs(self, count):
+        return [
+            Song(
+                title=f"song {index}",
+                genre=self.genre,
+                duration=timedelta(minutes=3),
+                description="",
+            )
+            for index in range(count)
+        ]
+
+    def test_bulk_create_indexes_new_records(self, mocked_client):
+        import_ = mocked_client.collections[self.schema_name].documents.import_
+        import_.return_value = [{"success": True}]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            songs = Song.objects.bulk_create(self.build_songs(3))
+
+        self.assertEqual(import_.call_count, 2)
+        documents, params = import_.call_args_list[0][0]
+        self.assertEqual(params, {"action": "create"})
+        self.assertEqual([document["id"] for document in documents], [str(songs[0].pk), str(songs[1].pk)])
+        self.assertEqual(documents[0]["title"], "song 0")
+        self.assertEqual(import_.call_args_list[1][0][0][0]["id"], str(songs[2].pk))
+
+    def test_bulk_update_sends_updated_fields(self, mocked_client):
+        songs = Song.objects.bulk_create(self.build_songs(2))
+        import_ = mocked_client.collections[self.schema_name].documents.import_
+        import_.return_value = [{"success": True}]
+        for song in songs:
+            song.number_of_views = 7
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Song.objects.bulk_update(songs, ["number_of_views"])
+
+        import_.assert_called_once_with(
+            [
+                {"id": str(songs[0].pk), "number_of_views": 7, "artist_names": [], "library_ids": []},
+                {"id": str(songs[1].pk), "number_of_views": 7, "artist_names": [], "library_ids": []},
+            ],
+            {"action": "emplace"},
+        )
+
+    def test_bulk_update_of_unindexed_fields(self, mocked_client):
+        songs = Song.objects.bulk_create(self.build_songs(2))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Song.objects.bulk_update(songs, ["description"])
+
+        mocked_client.collections[self.schema_name].documents.import_.assert_not_called()
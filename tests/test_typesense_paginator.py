@@ -0,0 +1,131 @@
+import re
+from datetime import timedelta
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase
+
+from django_typesense.fields import TypesenseBigIntegerField
+from django_typesense.paginator import TypesenseCursorPaginator
+from django_typesense.utils import iter_search_hits
+from tests.collections import SongCollection
+from tests.models import Genre, Song
+
+
+class TestTypesenseCursorPaginator(TestCase):
+    def setUp(self):
+        genre = Genre.objects.create(name="genre")
+        songs = [
+            Song(title=f"song {index}", genre=genre, duration=timedelta(minutes=3), description="")
+            for index in range(7)
+        ]
+        with mock.patch("django_typesense.collections.client"):
+            self.songs = Song.objects.bulk_create(songs)
+
+        sort_id = TypesenseBigIntegerField(sort=True, value="pk")
+        for patcher in (
+            mock.patch.object(SongCollection, "sort_id", sort_id, create=True),
+            mock.patch.object(SongCollection, "cursor_field", "sort_id"),
+            mock.patch("django_typesense.search.typesense_search", side_effect=self.search),
+            mock.patch("django_typesense.utils.typesense_search", side_effect=self.search),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.searches = []
+
+    def search(self, collection_name, page=1, per_page=10, sort_by="", filter_by="", **kwargs):
+        self.searches.append({"page": page, "per_page": per_page, "sort_by": sort_by, "filter_by": filter_by})
+        pks = sorted((song.pk for song in self.songs), reverse=sort_by.endswith(":desc"))
+        if match := re.search(r"sort_id:([<>])(\d+)", filter_by):
+            operator, cursor = match.group(1), int(match.group(2))
+            pks = [pk for pk in pks if (pk > cursor if operator == ">" else pk < cursor)]
+
+        start = (page - 1) * per_page
+        return {
+            "found": len(pks),
+            "hits": [{"document": {"id": str(pk), "sort_id": pk}} for pk in pks[start : start + per_page]],
+        }
+
+    def test_pages(self):
+        paginator = TypesenseCursorPaginator(Song.objects.typesense(q="song"), 3)
+
+        page = paginator.page()
+        self.assertEqual(list(page), self.songs[:3])
+        self.assertFalse(page.has_previous())
+        self.assertEqual(page.next_cursor, self.songs[2].pk)
+
+        page = paginator.page(after=page.next_cursor)
+        self.assertEqual(list(page), self.songs[3:6])
+        self.assertEqual(self.searches[-1]["filter_by"], f"sort_id:>{self.songs[2].pk}")
+        self.assertEqual(self.searches[-1]["page"], 1)
+
+        last_page = paginator.page(after=page.next_cursor)
+        self.assertEqual(list(last_page), self.songs[6:])
+        self.assertFalse(last_page.has_next())
+
+        previous_page = paginator.page(before=last_page.previous_cursor)
+        self.assertEqual(list(previous_page), self.songs[3:6])
+        self.assertEqual(previous_page.next_cursor, self.songs[5].pk)
+        self.assertEqual(previous_page.previous_cursor, self.songs[3].pk)
+
+        first_page = paginator.page(before=previous_page.previous_cursor)
+        self.assertEqual(list(first_page), self.songs[:3])
+        self.assertFalse(first_page.has_previous())
+
+    def test_page_positions(self):
+        paginator = TypesenseCursorPaginator(Song.objects.typesense(q="song"), 3)
+        self.assertEqual(paginator.num_pages, 3)
+        self.assertEqual(list(paginator.page_range), [1, 2, 3])
+
+        page = paginator.page()
+        self.assertEqual((page.number, page.start_index(), page.end_index()), (1, 1, 3))
+
+        page = paginator.page(after=page.next_cursor)
+        self.assertEqual((page.number, page.start_index(), page.end_index()), (2, 4, 6))
+
+        last_page = paginator.page(after=page.next_cursor)
+        self.assertEqual((last_page.number, last_page.start_index(), last_page.end_index()), (3, 7, 7))
+
+        previous_page = paginator.page(before=last_page.previous_cursor)
+        self.assertEqual((previous_page.number, previous_page.start_index(), previous_page.end_index()), (2, 4, 6))
+
+    def test_descending_pages(self):
+        paginator = TypesenseCursorPaginator(Song.objects.typesense(q="song", sort_by="sort_id:desc"), 4)
+
+        page = paginator.page()
+        self.assertEqual(list(page), self.songs[:2:-1])
+        self.assertEqual(list(paginator.page(after=page.next_cursor)), self.songs[2::-1])
+        self.assertEqual(self.searches[-1]["filter_by"], f"sort_id:<{self.songs[3].pk}")
+
+    def test_get_page_with_invalid_cursor(self):
+        paginator = TypesenseCursorPaginator(Song.objects.typesense(q="song"), 3)
+        self.assertEqual(list(paginator.get_page(after="last")), self.songs[:3])
+
+    def test_unsupported_sorting(self):
+        paginator = TypesenseCursorPaginator(Song.objects.typesense(q="song", sort_by="title:asc"), 3)
+        with self.assertRaises(ValueError):
+            paginator.page()
+
+    def test_cursor_field_is_required(self):
+        with mock.patch.object(SongCollection, "cursor_field", ""):
+            with self.assertRaises(ImproperlyConfigured):
+                SongCollection.get_cursor_field()
+
+        with mock.patch.object(SongCollection, "cursor_field", "title"):
+            with self.assertRaises(ImproperlyConfigured):
+                SongCollection.get_cursor_field()
+
+    def test_iterator(self):
+        with self.assertNumQueries(3):
+            songs = list(Song.objects.typesense(q="song").iterator(chunk_size=3))
+
+        self.assertEqual(songs, self.songs)
+        self.assertEqual(len(self.searches), 3)
+        self.assertEqual(self.searches[-1]["filter_by"], f"sort_id:>{self.songs[5].pk}")
+
+    def test_iter_search_hits(self):
+        hits = list(iter_search_hits(SongCollection, batch_size=4, q="song", filter_by="genre_id:=1"))
+
+        self.assertEqual([hit["document"]["sort_id"] for hit in hits], [song.pk for song in self.songs])
+        self.assertEqual(self.searches[-1]["filter_by"], f"(genre_id:=1) && sort_id:>{self.songs[3].pk}")
@@ -0,0 +1,140 @@
+from datetime import date, timedelta
+from unittest import mock
+
+from django.core.exceptions import EmptyResultSet
+from django.db.models import Q
+from django.test import TestCase
+
+from django_typesense.exceptions import UnsupportedFilterError
+from django_typesense.mixins import bulk_deleted_pks
+from django_typesense.query import compile_filter_by, compile_queryset_filter_by
+from django_typesense.signals import pre_delete_typesense_models
+from django_typesense.utils import get_unix_timestamp
+from tests.collections import SongCollection
+from tests.models import Genre, Song
+
+
+class TestCompileFilterBy(TestCase):
+    def test_lookups(self):
+        self.assertEqual(compile_filter_by(SongCollection), "")
+        self.assertEqual(
+            compile_filter_by(SongCollection, genre_id__gte=2, title="Hey Jude"),
+            "(genre_id:>=2 && title:=`Hey Jude`)",
+        )
+        self.assertEqual(compile_filter_by(SongCollection, pk__in=[1, 2]), "id:=[1,2]")
+        self.assertEqual(compile_filter_by(SongCollection, library_ids=3), "library_ids:=3")
+        self.assertEqual(
+            compile_filter_by(SongCollection, genre_id__range=(1, 5)), "genre_id:[1..5]"
+        )
+
+        release_date = date(2023, 1, 1)
+        self.assertEqual(
+            compile_filter_by(SongCollection, release_date__lt=release_date),
+            f"release_date:<{get_unix_timestamp(release_date)}",
+        )
+
+    def test_q_objects(self):
+        self.assertEqual(
+            compile_filter_by(SongCollection, Q(genre_id=1) | Q(title__in=["a", "b"])),
+            "(genre_id:=1 || title:=[`a`,`b`])",
+        )
+
+    def test_negations_are_pushed_down(self):
+        self.assertEqual(
+            compile_filter_by(SongCollection, ~Q(genre_id__in=[1, 2])), "genre_id:!=[1,2]"
+        )
+        self.assertEqual(
+            compile_filter_by(SongCollection, ~Q(Q(pk=1) | Q(genre_id__lt=5))),
+            "(id:!=1 && genre_id:>=5)",
+        )
+        self.assertEqual(
+            compile_filter_by(SongCollection, ~Q(genre_id__range=(1, 5), title="a")),
+            "((genre_id:<1 || genre_id:>5) || title:!=`a`)",
+        )
+
+    def test_empty_in(self):
+        with self.assertRaises(EmptyResultSet):
+            compile_filter_by(SongCollection, pk__in=[])
+
+        self.assertEqual(compile_filter_by(SongCollection, ~Q(pk__in=[])), "")
+        self.assertEqual(compile_filter_by(SongCollection, Q(pk__in=[]) | Q(pk=1)), "id:=1")
+
+    def test_unsupported_filters(self):
+        for kwargs in [
+            {"title__contains": "a"},
+            {"title__gt": "a"},
+            {"genre_name__isnull": True},
+            {"number_of_views": 1},  # not indexed
+            {"duration": 1},  # not in the collection
+            {"title": "`"},
+            {"title": None},
+        ]:
+            with self.subTest(kwargs=kwargs), self.assertRaises(UnsupportedFilterError):
+                compile_filter_by(SongCollection, **kwargs)
+
+
+class TestCompileQuerySetFilterBy(TestCase):
+    def test_translatable_filters(self):
+        queryset = Song.objects.filter(genre__in=[1, 2]).exclude(pk=4)
+        self.assertEqual(compile_queryset_filter_by(queryset), "(genre_id:=[1,2] && id:!=4)")
+        self.assertEqual(compile_queryset_filter_by(Song.objects.filter(genre=3)), "genre_id:=3")
+
+    def test_untranslatable_filters(self):
+        for index, queryset in enumerate([
+            Song.objects.filter(genre__name="rock"),
+            Song.objects.filter(artists=1),
+            Song.objects.filter(release_date__year=2023),
+            Song.objects.filter(number_of_views=1),
+            Song.objects.filter(pk__in=[]),
+            Song.objects.filter(pk=1)[:1],
+        ]):
+            with self.subTest(index=index):
+                self.assertIsNone(compile_queryset_filter_by(queryset))
+
+    @mock.patch("django_typesense.collections.client")
+    def test_queryset_delete_by_filter(self, mocked_client):
+        genre = Genre.objects.create(name="genre")
+        song = Song.objects.create(
+            title="song", genre=genre, duration=timedelta(minutes=3), description=""
+        )
+        delete = mocked_client.collections[SongCollection.schema_name].documents.delete
+
+        Song.objects.filter(genre=genre).delete()
+
+        # the pre_delete signal doesn't delete the documents again
+        delete.assert_called_once_with({"filter_by": f"genre_id:={genre.pk}", "batch_size": 1024})
+        self.assertFalse(Song.objects.filter(pk=song.pk).exists())
+
+        # single deletes still go through the signal
+        song = Song.objects.create(
+            title="song", genre=genre, duration=timedelta(minutes=3), description=""
+        )
+        song.delete()
+        self.assertEqual(delete.call_count, 2)
+
+    @mock.patch("django_typesense.collections.client")
+    def test_only_the_deleted_rows_skip_the_signal(self, mocked_client):
+        genre = Genre.objects.create(name="genre")
+        songs = [
+            Song.objects.create(title="song", genre=genre, duration=timedelta(minutes=3), description="")
+            for _ in range(2)
+        ]
+        delete = mocked_client.collections[SongCollection.schema_name].documents.delete
+
+        # e.g. rows of the same model deleted by cascade, through a self-referencing foreign key
+        token = bulk_deleted_pks.set({Song: {songs[0].pk}})
+        try:
+            pre_delete_typesense_models(Song, songs[0])
+            delete.assert_not_called()
+            pre_delete_typesense_models(Song, songs[1])
+        finally:
+            bulk_deleted_pks.reset(token)
+
+        delete.assert_called_once_with({"filter_by": f"id:[{songs[1].pk}]"})
+
+    def test_debounced_fields_are_not_translated(self):
+        queryset = Song.objects.filter(title="song")
+        self.assertEqual(compile_queryset_filter_by(queryset), "title:=`song`")
+        with mock.patch.object(SongCollection, "debounce_fields", ["title"]):
+            self.assertIsNone(compile_queryset_filter_by(queryset))
+        self.assertEqual(compile_queryset_filter_by(Song.objects.filter(genre=3)), "genre_id:=3")
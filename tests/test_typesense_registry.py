@@ -0,0 +1,30 @@
+from django.db.models.signals import m2m_changed, post_save, pre_delete
+from django.test import TestCase
+
+from django_typesense.registry import registry
+from tests.collections import SongCollection
+from tests.models import Artist, Genre, Library, Song
+
+
+class TestTypesenseRegistry(TestCase):
+    def test_indexed_models_are_registered(self):
+        self.assertIn(Song, registry)
+        self.assertNotIn(Genre, registry)
+        self.assertEqual(registry.get_collection_class(Song), SongCollection)
+        self.assertIsNone(registry.get_collection_class(Artist))
+        self.assertEqual(registry.collections, {SongCollection.schema_name: SongCollection})
+
+    def test_through_models(self):
+        self.assertEqual(
+            registry.get_through_models(),
+            {Song.artists.through, Library.songs.through},
+        )
+
+    def test_signals_are_connected_to_indexed_models_only(self):
+        self.assertTrue(post_save.has_listeners(Song))
+        self.assertTrue(pre_delete.has_listeners(Song))
+        self.assertTrue(m2m_changed.has_listeners(Song.artists.through))
+        self.assertTrue(m2m_changed.has_listeners(Library.songs.through))
+
+        self.assertFalse(post_save.has_listeners(Genre))
+        self.assertFalse(pre_delete.has_listeners(Library))
@@ -0,0 +1,143 @@
+import threading
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+from typesense.exceptions import ObjectNotFound, ServiceUnavailable
+
+from django_typesense.routing import SearchRouter
+from django_typesense.utils import typesense_search
+
+NODES = [
+    {"host": "node1", "port": "8108", "protocol": "http"},
+    {"host": "node2", "port": "8108", "protocol": "http"},
+    {"host": "node3", "port": "8108", "protocol": "http"},
+]
+NAMES = ["http://node1:8108", "http://node2:8108", "http://node3:8108"]
+
+
+@override_settings(
+    TYPESENSE={**settings.TYPESENSE, "nodes": NODES}, TYPESENSE_ROUTING={"ewma_alpha": 0.5}
+)
+class TestSearchRouter(SimpleTestCase):
+    def setUp(self):
+        self.router = SearchRouter()
+        patcher = mock.patch("typesense.Client", side_effect=lambda config, **kwargs: mock.MagicMock(config=config))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.clients = self.router.get_clients()
+
+    def search(self, client):
+        return client.config["nodes"][0]["host"]
+
+    def test_node_clients(self):
+        self.assertEqual(list(self.clients), NAMES)
+        self.assertEqual(self.clients[NAMES[1]].config["nodes"], [NODES[1]])
+        self.assertEqual(self.clients[NAMES[1]].config["num_retries"], 0)
+
+    def test_fastest_node_is_used(self):
+        for name, ewma in zip(NAMES, [0.2, 0.05, 0.1]):
+            self.router.nodes[name].ewma = ewma
+
+        self.assertEqual(self.router.call(self.search), "node2")
+        self.assertEqual(self.router.stats["nodes"][NAMES[1]]["requests"], 1)
+
+    def test_failover(self):
+        def search(client):
+            if client is self.clients[NAMES[0]]:
+                raise ServiceUnavailable("unavailable")
+            return self.search(client)
+
+        self.assertEqual(self.router.call(search), "node2")
+        stats = self.router.stats["nodes"][NAMES[0]]
+        self.assertEqual(stats["errors"], 1)
+        self.assertFalse(stats["healthy"])
+        # unhealthy nodes are tried last
+        self.assertEqual(self.router.get_ranked_nodes()[-1], NAMES[0])
+
+    def test_client_errors_are_not_retried(self):
+        search = mock.Mock(side_effect=ObjectNotFound("not found"))
+
+        with self.assertRaises(ObjectNotFound):
+            self.router.call(search)
+
+        search.assert_called_once()
+        self.assertTrue(self.router.stats["nodes"][NAMES[0]]["healthy"])
+
+    def test_hedging(self):
+        hedged = threading.Event()
+        self.addCleanup(hedged.set)
+
+        def search(client):
+            if client is self.clients[NAMES[0]]:
+                # the node fails slowly, the hedge has answered by then
+                hedged.wait(5)
+                raise ServiceUnavailable("unavailable")
+            hedged.set()
+            return self.search(client)
+
+        with override_settings(TYPESENSE_ROUTING={"hedge_after_seconds": 0.01}):
+            self.assertEqual(self.router.call(search), "node2")
+
+        stats = self.router.stats
+        self.assertEqual(stats["hedged"], 1)
+        self.assertEqual(stats["nodes"][NAMES[1]]["hedges_won"], 1)
+
+    def test_first_response_is_used(self):
+        answered = threading.Event()
+        self.addCleanup(answered.set)
+
+        def search(client):
+            if client is self.clients[NAMES[0]]:
+                # the node is slow but healthy, the caller doesn't wait for it
+                answered.wait(5)
+            return self.search(client)
+
+        with override_settings(TYPESENSE_ROUTING={"hedge_after_seconds": 0.01}):
+            self.assertEqual(self.router.call(search), "node2")
+            answered.set()
+
+        self.assertEqual(self.router.stats["hedged"], 1)
+        self.assertEqual(self.router.stats["nodes"][NAMES[1]]["hedges_won"], 1)
+
+    def test_fast_responses_are_not_hedged(self):
+        with override_settings(TYPESENSE_ROUTING={"hedge_after_seconds": 5}):
+            self.assertEqual(self.router.call(self.search), "node1")
+
+        self.assertEqual(self.router.stats["hedged"], 0)
+        self.assertEqual(self.router.stats["nodes"][NAMES[1]]["requests"], 0)
+
+    def test_requests_are_not_queued(self):
+        self.router._busy_workers = 16
+        threads = []
+
+        def search(client):
+            threads.append(threading.current_thread())
+            return self.search(client)
+
+        with override_settings(TYPESENSE_ROUTING={"hedge_after_seconds": 0}):
+            self.assertEqual(self.router.call(search), "node1")
+
+        # made on the calling thread when every thread of the pool is busy
+        self.assertEqual(threads, [threading.current_thread()])
+        self.assertEqual(self.router.stats["hedged"], 0)
+
+    def test_reset_replaces_the_lock(self):
+        # another thread may hold the lock when the process forks
+        self.router._lock.acquire()
+        self.router.reset()
+
+        self.assertEqual(self.router.stats, {"hedged": 0, "nodes": {}})
+
+    @mock.patch("django_typesense.typesense_client.client")
+    def test_typesense_search_is_routed(self, mocked_client):
+        with mock.patch("django_typesense.routing.router", self.router):
+            typesense_search("songs", q="song")
+
+        self.clients[NAMES[0]].collections["songs"].documents.search.assert_called_once_with({"q": "song"})
+        mocked_client.collections.__getitem__.assert_not_called()
+
+    def test_disabled_with_a_single_node(self):
+        with override_settings(TYPESENSE={**settings.TYPESENSE, "nodes": NODES[:1]}):
+            self.assertFalse(self.router.enabled)
+        self.assertTrue(self.router.enabled)
@@ -0,0 +1,146 @@
+import copy
+import pickle
+from datetime import date, timedelta
+from unittest import mock
+
+from django.test import TestCase
+
+from django_typesense.collections import TypesenseResult
+from django_typesense.search import TypesenseSearchQuerySet
+from tests.collections import SongCollection
+from tests.models import Genre, Song
+
+
+class TestTypesenseSearchQuerySet(TestCase):
+    def setUp(self):
+        genre = Genre.objects.create(name="genre")
+        songs = [
+            Song(title=f"song {index}", genre=genre, duration=timedelta(minutes=3), description="")
+            for index in range(6)
+        ]
+        with mock.patch("django_typesense.collections.client"):
+            self.songs = Song.objects.bulk_create(songs)
+        # typesense ranks the songs in reverse
+        self.ranked_ids = [str(song.pk) for song in reversed(self.songs)]
+
+        patcher = mock.patch("django_typesense.search.typesense_search", side_effect=self.search)
+        self.mocked_search = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def search(self, collection_name, page=1, per_page=10, **kwargs):
+        start = (page - 1) * per_page
+        return {
+            "found": len(self.ranked_ids),
+            "hits": [{"document": {"id": _id}} for _id in self.ranked_ids[start : start + per_page]],
+        }
+
+    def test_manager_method(self):
+        results = Song.objects.typesense(q="song", filter_by="number_of_views:>0")
+        self.assertIsInstance(results, TypesenseSearchQuerySet)
+        self.assertEqual(results.search_parameters["query_by"], Song.collection_class.query_by_fields)
+        self.mocked_search.assert_not_called()
+
+    def test_results_are_in_rank_order(self):
+        with self.assertNumQueries(1):
+            results = list(Song.objects.typesense(q="song"))
+
+        self.assertEqual(results, list(reversed(self.songs)))
+
+    def test_slicing_maps_to_pages(self):
+        results = list(Song.objects.typesense(q="song")[2:4])
+
+        self.assertEqual(results, [self.songs[3], self.songs[2]])
+        self.mocked_search.assert_called_once()
+        _, kwargs = self.mocked_search.call_args
+        self.assertEqual((kwargs["page"], kwargs["per_page"]), (2, 2))
+
+    def test_unaligned_slices(self):
+        results = list(Song.objects.typesense(q="song")[1:4])
+        self.assertEqual(results, [self.songs[4], self.songs[3], self.songs[2]])
+
+        self.assertEqual(Song.objects.typesense(q="song")[0], self.songs[5])
+
+    def test_count_uses_found(self):
+        self.assertEqual(Song.objects.typesense(q="song").count(), 6)
+        self.assertEqual(Song.objects.typesense(q="song")[4:10].count(), 2)
+        _, kwargs = self.mocked_search.call_args
+        self.assertEqual(kwargs["per_page"], 0)
+
+    def test_filter(self):
+        results = Song.objects.typesense(q="song", filter_by="genre_id:=1").filter(
+            pk__in=[1, 2]
+        )
+        self.assertEqual(results.search_parameters["filter_by"], "(genre_id:=1) && id:=[1,2]")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(list(Song.objects.typesense(q="song").filter(pk__in=[])), [])
+        self.mocked_search.assert_not_called()
+
+    def test_queryset_passthrough(self):
+        results = list(
+            Song.objects.typesense(q="song")
+            .select_related("genre")
+            .only("title", "genre__name")[:2]
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(results[0].genre.name, "genre")
+        self.assertIn("description", results[0].get_deferred_fields())
+
+    def test_results_skip_the_database(self):
+        with self.assertNumQueries(0):
+            results = list(Song.objects.typesense(q="song").results()[:2])
+
+        self.assertIsInstance(results[0], TypesenseResult)
+        self.assertEqual([result.pk for result in results], [int(_id) for _id in self.ranked_ids[:2]])
+
+
+class TestTypesenseResult(TestCase):
+    def setUp(self):
+        self.document = {
+            "id": "1",
+            "title": "Midnight City",
+            "release_date": 1679529600,
+            "artist_names": ["M83"],
+        }
+        self.result = SongCollection.get_results({"hits": [{"document": self.document}]})[0]
+
+    def test_result_class(self):
+        result_class = SongCollection.get_result_class()
+        self.assertIs(result_class, SongCollection.get_result_class())
+        self.assertEqual(result_class.__name__, "SongCollectionResult")
+        self.assertFalse(hasattr(self.result, "__dict__"))
+
+    def test_values_are_converted_lazily(self):
+        self.assertEqual(self.result._values, {})
+        self.assertEqual(self.result.release_date, date.fromtimestamp(1679529600))
+        self.assertEqual(self.result.artist_names, ["M83"])
+        self.assertEqual(self.result.id, "1")
+        self.assertIn("release_date", self.result._values)
+
+        # optional fields missing from the document
+        self.assertIsNone(self.result.number_of_views)
+
+        with self.assertRaises(AttributeError):
+            self.result.description
+
+    def test_pk_has_the_type_of_the_model_pk(self):
+        self.assertEqual(self.result.pk, 1)
+        self.assertEqual(self.result, SongCollection.get_results({"hits": [{"document": {"id": "1"}}]})[0])
+
+    def test_results_can_be_copied_and_pickled(self):
+        self.assertEqual(self.result.title, "Midnight City")
+
+        for copied in (
+            copy.copy(self.result),
+            copy.deepcopy(self.result),
+            pickle.loads(pickle.dumps(self.result)),
+        ):
+            self.assertIs(type(copied), type(self.result))
+            self.assertEqual(copied, self.result)
+            self.assertEqual(copied.title, "Midnight City")
+            self.assertEqual(copied.document, self.document)
+
+    def test_results_are_read_only(self):
+        with self.assertRaises(AttributeError):
+            self.result.title = "Outro"
+        self.assertEqual(self.result.document, self.document)
@@ -1,7 +1,10 @@
+from datetime import timedelta
+from unittest import mock
+
 from django.test import TestCase
 
 from tests.factories import ArtistFactory, GenreFactory, SongFactory
-from tests.models import Artist, Library, Song
+from tests.models import Artist, Genre, Library, Song
 from tests.utils import get_document
 
 
@@ -68,3 +71,102 @@ class TestTypeSenseSignals(TestCase):
         song_document = get_document(schema_name, self.song.pk)
         self.assertIsNotNone(song_document)
         self.assertCountEqual(song_document["library_ids"], self.song.library_ids)
+
+
+@mock.patch("django_typesense.collections.client")
+@mock.patch.object(Song, "typesense_track_changes", True)
+class TestTypesenseChangeTracking(TestCase):
+    def setUp(self):
+        self.genre = Genre.objects.create(name="genre")
+
+    def create_song(self):
+        return Song.objects.create(
+            title="Midnight City",
+            genre=self.genre,
+            duration=timedelta(minutes=4),
+            description="M83",
+        )
+
+    def test_created_records_are_upserted(self, mocked_client):
+        documents = mocked_client.collections[Song.collection_class.schema_name].documents
+
+        with self.captureOnCommitCallbacks(execute=True):
+            song = self.create_song()
+
+        documents.upsert.assert_called_once()
+        self.assertEqual(documents.upsert.call_args[0][0]["id"], str(song.pk))
+        documents.__getitem__.return_value.update.assert_not_called()
+
+    def test_only_changed_fields_are_sent(self, mocked_client):
+        song = Song.objects.get(pk=self.create_song().pk)
+        documents = mocked_client.collections[Song.collection_class.schema_name].documents
+        song.number_of_views = 10
+
+        with self.captureOnCommitCallbacks(execute=True):
+            song.save()
+
+        documents.__getitem__.assert_called_with(str(song.pk))
+        document = documents.__getitem__.return_value.update.call_args[0][0]
+        # properties and methods are always sent since their sources cannot be tracked
+        self.assertCountEqual(
+            document.keys(), ["number_of_views", "artist_names", "library_ids"]
+        )
+        self.assertEqual(document["number_of_views"], 10)
+
+    def test_unchanged_records_are_not_written(self, mocked_client):
+        song = Song.objects.get(pk=self.create_song().pk)
+        documents = mocked_client.collections[Song.collection_class.schema_name].documents
+        song.number_of_views = 10
+
+        with self.captureOnCommitCallbacks(execute=True):
+            song.save()
+        documents.__getitem__.return_value.update.reset_mock()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            song.save()
+
+        documents.__getitem__.return_value.update.assert_not_called()
+
+    def test_in_place_changes_are_detected(self, mocked_client):
+        song = Song.objects.get(pk=self.create_song().pk)
+        # stands in for a JSON or array field
+        song.title = ["Midnight City"]
+        song.reset_typesense_snapshot()
+
+        song.title.append("Reunion")
+
+        self.assertIn("title", song.get_typesense_changed_fields())
+
+
+@mock.patch("django_typesense.collections.client")
+class TestTypesenseM2MChanged(TestCase):
+    def setUp(self):
+        genre = Genre.objects.create(name="genre")
+        with mock.patch("django_typesense.collections.client"):
+            self.songs = [
+                Song.objects.create(
+                    title=f"song {index}", genre=genre, duration=timedelta(minutes=3), description=""
+                )
+                for index in range(2)
+            ]
+        self.library = Library.objects.create(name="album")
+        with mock.patch("django_typesense.collections.client"):
+            self.library.songs.add(*self.songs)
+
+    def test_cleared_rows_are_updated(self, mocked_client):
+        import_ = mocked_client.collections[Song.collection_class.schema_name].documents.import_
+
+        self.library.songs.clear()
+
+        import_.assert_called_once()
+        documents = import_.call_args[0][0]
+        self.assertCountEqual([document["id"] for document in documents], [str(song.pk) for song in self.songs])
+        self.assertEqual([document["library_ids"] for document in documents], [[], []])
+
+    def test_cleared_reverse_relation_is_updated(self, mocked_client):
+        documents = mocked_client.collections[Song.collection_class.schema_name].documents
+
+        self.songs[0].libraries.clear()
+
+        document = documents.__getitem__.return_value.update.call_args[0][0]
+        self.assertEqual(document["library_ids"], [])
@@ -0,0 +1,114 @@
+import threading
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from django_typesense.singleflight import SingleFlight, singleflight
+from django_typesense.utils import typesense_search
+
+
+class TestSingleFlight(SimpleTestCase):
+    def setUp(self):
+        self.singleflight = SingleFlight()
+        self.release = threading.Event()
+
+    def start_callers(self, func, count, key="key"):
+        results = [None] * count
+
+        def call(index):
+            try:
+                results[index] = self.singleflight.do(key, ["songs"], func)
+            except Exception as error:
+                results[index] = error
+
+        threads = [threading.Thread(target=call, args=(index,)) for index in range(count)]
+        for thread in threads:
+            thread.start()
+        return threads, results
+
+    def wait_for_waiters(self, count, key="key"):
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            call = self.singleflight._calls.get(key)
+            if call is not None and call.waiters == count:
+                return
+            time.sleep(0.001)
+        self.fail(f"{count} callers did not join the call")
+
+    def join(self, threads):
+        self.release.set()
+        for thread in threads:
+            thread.join()
+
+    def test_identical_calls_are_coalesced(self):
+        func = mock.Mock(side_effect=lambda: self.release.wait() and {"hits": [1]})
+
+        threads, results = self.start_callers(func, 5)
+        self.wait_for_waiters(4)
+        self.join(threads)
+
+        func.assert_called_once()
+        self.assertEqual(results, [{"hits": [1]}] * 5)
+        # each caller gets its own copy
+        self.assertEqual(len({id(result) for result in results}), 5)
+        self.assertEqual(self.singleflight.coalesced, 4)
+        self.assertEqual(self.singleflight._calls, {})
+
+    def test_errors_are_shared(self):
+        def func():
+            self.release.wait()
+            raise ValueError("error")
+
+        threads, results = self.start_callers(func, 3)
+        self.wait_for_waiters(2)
+        self.join(threads)
+
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+
+    def test_calls_after_a_write_are_not_coalesced(self):
+        func = mock.Mock(side_effect=lambda: self.release.wait() and {"hits": []})
+
+        threads, _ = self.start_callers(func, 1)
+        self.wait_for_waiters(0)
+        self.singleflight.forget("songs")
+        other_threads, _ = self.start_callers(func, 1)
+        self.wait_for_waiters(0)
+        self.join(threads + other_threads)
+
+        self.assertEqual(func.call_count, 2)
+
+    @override_settings(TYPESENSE_SINGLEFLIGHT=False)
+    def test_disabled(self):
+        func = mock.Mock(return_value={"hits": []})
+        self.singleflight.do("key", ["songs"], func)
+        self.singleflight.do("key", ["songs"], func)
+        self.assertEqual(func.call_count, 2)
+
+
+@mock.patch("django_typesense.typesense_client.client")
+class TestTypesenseSearchSingleFlight(SimpleTestCase):
+    def test_typesense_search_is_coalesced(self, mocked_client):
+        release = threading.Event()
+        search = mocked_client.collections["songs"].documents.search
+        search.side_effect = lambda parameters: release.wait() and {"found": 0, "hits": []}
+
+        threads = [
+            threading.Thread(target=typesense_search, args=("songs",), kwargs={"q": "song"})
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            calls = list(singleflight._calls.values())
+            if calls and calls[0].waiters == 2:
+                break
+            time.sleep(0.001)
+
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        search.assert_called_once()
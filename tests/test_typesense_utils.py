@@ -1,22 +1,30 @@
-from datetime import date, datetime, time
+import json
+from datetime import date, datetime, time, timedelta
 from unittest import mock
 
+import httpx
+from django.conf import settings
 from django.db.utils import OperationalError
-from django.test import TestCase
-from typesense.exceptions import TypesenseClientError
+from django.test import TestCase, override_settings
+from typesense.exceptions import ObjectNotFound, TypesenseClientError
 
 from django_typesense.exceptions import BatchUpdateError, UnorderedQuerySetError
+from django_typesense.typesense_client import create_client, set_client
 from django_typesense.utils import (
     bulk_delete_typesense_records,
     bulk_update_typesense_records,
+    export_documents,
     get_unix_timestamp,
+    iter_export_documents,
+    map_chunks,
+    typesense_multi_search,
     typesense_search,
     update_batch,
 )
 
 from tests.collections import SongCollection
 from tests.factories import ArtistFactory, SongFactory
-from tests.models import Artist, Song
+from tests.models import Artist, Genre, Song
 from tests.utils import get_document
 
 
@@ -141,6 +149,57 @@ class TestBulkDeleteTypesenseRecords(TestCase):
             self.assertEqual(song_document["title"], song.title)
 
 
+class TestChunkedDeletes(TestCase):
+    def test_map_chunks(self):
+        items = (item for item in range(10))
+        self.assertEqual(map_chunks(list, items, chunk_size=4), [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]])
+
+        results = map_chunks(sum, range(100), chunk_size=10, num_threads=3)
+        self.assertEqual(len(results), 10)
+        self.assertEqual(sum(results), sum(range(100)))
+
+    @mock.patch("django_typesense.typesense_client.client")
+    def test_bulk_delete_typesense_records_in_chunks(self, mocked_client):
+        bulk_delete_typesense_records(["1", "2", "3"], "songs", batch_size=2)
+
+        delete = mocked_client.collections["songs"].documents.delete
+        self.assertEqual(
+            delete.call_args_list,
+            [
+                mock.call({"filter_by": "id:[1,2]"}),
+                mock.call({"filter_by": "id:[3]"}),
+            ],
+        )
+
+    @mock.patch("django_typesense.collections.client")
+    def test_queryset_deletes_stream_primary_keys(self, mocked_client):
+        songs = [
+            Song.objects.create(
+                title=f"song {index}",
+                genre=Genre.objects.create(name="genre"),
+                duration=timedelta(minutes=3),
+                description="",
+            )
+            for index in range(3)
+        ]
+        delete = mocked_client.collections[SongCollection.schema_name].documents.delete
+        delete.return_value = {"num_deleted": 2}
+        collection = SongCollection(Song.objects.all(), many=True)
+
+        # only the primary keys are read, the documents are not serialized
+        with self.assertNumQueries(2):
+            response = collection.delete(batch_size=2)
+
+        self.assertEqual(response, {"num_deleted": 4})
+        self.assertEqual(
+            delete.call_args_list,
+            [
+                mock.call({"filter_by": f"id:[{songs[0].pk},{songs[1].pk}]"}),
+                mock.call({"filter_by": f"id:[{songs[2].pk}]"}),
+            ],
+        )
+
+
 class TestTypesenseSearch(TestCase):
     def setUp(self):
         self.collection_name = Song.collection_class.schema_name
@@ -167,6 +226,145 @@ class TestTypesenseSearch(TestCase):
     #     self.assertIsNone(results)
 
 
+class TestSearchProjections(TestCase):
+    def setUp(self):
+        projections = {"list": {"include_fields": ["title"], "highlight": False}}
+        patcher = mock.patch.object(SongCollection, "projections", projections)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @mock.patch("django_typesense.typesense_client.client")
+    def test_typesense_search_with_projection(self, mocked_client):
+        typesense_search(SongCollection.schema_name, projection="list", q="song")
+
+        search = mocked_client.collections.__getitem__.return_value.documents.search
+        search.assert_called_once_with(
+            {
+                "include_fields": "id,title",
+                "highlight_fields": "none",
+                "enable_highlight_v1": False,
+                "q": "song",
+            }
+        )
+
+    def test_unknown_projection(self):
+        with self.assertRaises(ValueError):
+            SongCollection.get_projection("detail")
+
+        with mock.patch.object(SongCollection, "projections", {"list": {"include_fields": ["lyrics"]}}):
+            with self.assertRaises(ValueError):
+                SongCollection.get_projection("list")
+
+
+@mock.patch("django_typesense.typesense_client.client")
+class TestTypesenseMultiSearch(TestCase):
+    def test_multi_search(self, mocked_client):
+        results = [{"found": 1, "hits": []}, {"found": 2, "hits": []}]
+        mocked_client.multi_search.perform.return_value = {"results": results}
+        searches = [{"collection": "songs", "q": "a"}, {"collection": "artists", "q": "b"}]
+
+        self.assertEqual(typesense_multi_search(searches, query_by="title"), results)
+        mocked_client.multi_search.perform.assert_called_once_with(
+            {"searches": searches}, {"query_by": "title"}
+        )
+
+    def test_no_searches(self, mocked_client):
+        self.assertEqual(typesense_multi_search([]), [])
+        mocked_client.multi_search.perform.assert_not_called()
+
+    def test_failed_search(self, mocked_client):
+        mocked_client.multi_search.perform.return_value = {
+            "results": [{"found": 0, "hits": []}, {"code": 404, "error": "Not found."}]
+        }
+
+        with self.assertRaisesMessage(ObjectNotFound, "Not found."):
+            typesense_multi_search([{"collection": "songs"}, {"collection": "missing"}])
+
+
+class TestIterExportDocuments(TestCase):
+    def setUp(self):
+        self.requests = []
+        self.documents = [{"id": str(index), "title": f"Song {index}"} for index in range(5)]
+
+        def handler(request):
+            self.requests.append(request)
+            if request.url.path != "/collections/songs/documents/export":
+                return httpx.Response(404, json={"message": "Not Found"})
+
+            body = "\n".join(json.dumps(document) for document in self.documents)
+            # a stream of small chunks, lines are split across them
+            chunks = [body[index : index + 7].encode() for index in range(0, len(body), 7)]
+            return httpx.Response(200, content=iter(chunks))
+
+        self.handler = handler
+        self.http_client = httpx.Client(transport=httpx.MockTransport(handler))
+        patcher = mock.patch(
+            "django_typesense.typesense_client.get_http_client", return_value=self.http_client
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_iter_export_documents(self):
+        documents = iter_export_documents("songs", filter_by="id:>1", include_fields=["id", "title"])
+        self.assertEqual(list(documents), self.documents)
+
+        request = self.requests[0]
+        self.assertEqual(request.url.host, "localhost")
+        self.assertEqual(request.headers["X-TYPESENSE-API-KEY"], "sample_key")
+        self.assertEqual(
+            dict(request.url.params), {"filter_by": "id:>1", "include_fields": "id,title"}
+        )
+
+    def test_iter_export_documents_batches(self):
+        batches = list(iter_export_documents("songs", batch_size=2))
+        self.assertEqual(batches, [self.documents[:2], self.documents[2:4], self.documents[4:]])
+
+    def test_export_documents(self):
+        self.assertEqual(export_documents("songs"), self.documents)
+
+    def test_iter_export_documents_error(self):
+        with self.assertRaises(ObjectNotFound):
+            list(iter_export_documents("missing"))
+        self.assertEqual(len(self.requests), 1)
+
+    def test_iter_export_documents_headers(self):
+        typesense_settings = {**settings.TYPESENSE, "additional_headers": {"X-Tenant": "songs"}}
+        with override_settings(TYPESENSE=typesense_settings):
+            set_client(create_client())
+        self.addCleanup(set_client, None)
+
+        list(iter_export_documents("songs"))
+
+        self.assertEqual(self.requests[0].headers["X-Tenant"], "songs")
+
+    def test_iter_export_documents_failover(self):
+        typesense_settings = {
+            **settings.TYPESENSE,
+            "nodes": [
+                {"host": "node1", "port": "8108", "protocol": "http"},
+                {"host": "node2", "port": "8108", "protocol": "http"},
+            ],
+            "num_retries": 1,
+            "retry_interval_seconds": 0,
+        }
+        handler = self.handler
+
+        def failing_handler(request):
+            if request.url.host == "node1":
+                self.requests.append(request)
+                raise httpx.ConnectError("Connection refused")
+            return handler(request)
+
+        self.http_client._transport = httpx.MockTransport(failing_handler)
+        with override_settings(TYPESENSE=typesense_settings):
+            set_client(create_client())
+        self.addCleanup(set_client, None)
+
+        self.assertEqual(list(iter_export_documents("songs")), self.documents)
+
+        self.assertEqual([request.url.host for request in self.requests], ["node1", "node2"])
+
+
 class TestGetUnixTimestamp(TestCase):
     def test_get_unix_timestamp_datetime(self):
         now = datetime(year=2023, month=11, day=23, hour=16, minute=20, second=00)